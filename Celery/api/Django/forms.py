@@ -2,7 +2,7 @@
 
 from typing import Any, Dict, List
 
-from .requests import (AggregatorRequests, CopyBaseRequests,
+from .requests import (AggregatorRequests, BonusesRequests, CopyBaseRequests,
                        QuestModerationAttemptRequests, UserRequests)
 
 
@@ -54,3 +54,14 @@ class DjangoAPIForms(CopyBaseMethods, UserMethods):
     
     def __init__(self):
         super().__init__()
+
+
+class BonusesMethods:
+    
+    def __init__(self):
+        self.api = BonusesRequests()
+
+    def sweep_expired(
+        self,
+        ) -> Dict:
+        return self.api.sweep_expired()
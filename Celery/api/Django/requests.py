@@ -72,4 +72,7 @@ class QuestModerationAttemptRequests(DjangoAPI):
         return self._make_request("GET", "/quest-moderation-attempt/delete_old_quest/")
 
 
+class BonusesRequests(DjangoAPI):
 
+    def sweep_expired(self) -> Optional[Dict]:
+        return self._make_request("PATCH", "/bonuses/sweep_expired/")
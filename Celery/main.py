@@ -27,7 +27,7 @@ app = Celery(
 
 DEBUG = False
 
-# NOTE celery -A main worker -Q copy_base,continue_registration,quest_attempts,aggregation-pipeline -l info
+# NOTE celery -A main worker -Q copy_base,continue_registration,quest_attempts,aggregation-pipeline,bonuses_sweep -l info
 # NOTE celery -A main beat -l info
 app.conf.beat_schedule = {
     'daily-db-backup': {
@@ -61,5 +61,13 @@ app.conf.beat_schedule = {
             'queue': 'aggregation_pipeline',
             'expires': 3600  # Задача исчезнет, если не взята в работу за пол часа
         }
+    },
+    'bonuses-sweep': {
+        'task': 'utils.tasks.sweep_expired_bonuses_task',
+        'schedule': crontab(minute='*/1'),
+        'options': {
+            'queue': 'bonuses_sweep',
+            'expires': 60
+        }
     }
 }
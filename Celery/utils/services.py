@@ -1,7 +1,8 @@
 import datetime
 
-from api.Django.forms import (AggregatorMethods, CopyBaseMethods,
-                              QuestModerationAttemptMethods, UserMethods)
+from api.Django.forms import (AggregatorMethods, BonusesMethods,
+                              CopyBaseMethods, QuestModerationAttemptMethods,
+                              UserMethods)
 from api.MainBot import MainBotForms
 from loguru import logger
 from rabbitmq import RabbitMQForms
@@ -81,3 +82,13 @@ def aggregation_pipeline(
     except Exception as e:
         logger.error(f"Backup failed: {e}")
         raise  # Для retry в Celery
+
+def sweep_expired_bonuses(*args, **kwargs) -> None:
+    """Выключаем просроченные бонусы (сбрасывает кэш множителя клика)"""
+    try:
+        result = BonusesMethods().sweep_expired()
+        if result and result.get("deactivated"):
+            logger.info(f"Просроченных бонусов выключено: {result['deactivated']}")
+    except Exception as e:
+        logger.error(f"Bonuses sweep failed: {e}")
+        raise
@@ -4,7 +4,8 @@ import pytz
 from celery import shared_task
 
 from .services import (aggregation_pipeline, auto_reject_old_quest_attempts,
-                       continue_reg_mailing, sync_copy_bd)
+                       continue_reg_mailing, sweep_expired_bonuses,
+                       sync_copy_bd)
 
 
 @shared_task(name='utils.tasks.database_backup_task', bind=True)
@@ -57,3 +58,11 @@ def aggregation_pipeline_task(self):
         self.retry(exc=e, countdown=300, max_retries=10)
 
 
+@shared_task(name='utils.tasks.sweep_expired_bonuses_task', bind=True)
+def sweep_expired_bonuses_task(self):
+    """Плановое выключение просроченных бонусов"""
+    try:
+        sweep_expired_bonuses()
+        
+    except Exception as e:
+        self.retry(exc=e, countdown=60, max_retries=3)
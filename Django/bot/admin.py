@@ -1,5 +1,7 @@
 from datetime import datetime
 
+from bot.service.bonus_cache import ClickBonusCache
+from bot.service.rang_cache import RangLadderCache
 from django import forms
 from django.contrib import admin
 from loguru import logger
@@ -199,7 +201,8 @@ class Lumberjack_GameAdmin(admin.ModelAdmin):
         "_total_currency",
         "game_date",
         "_last_energy_update",
-        "current_grid",
+        "grid_mask",
+        "grid_revealed",
     )
     search_fields = (
         "user__user_id",
@@ -355,6 +358,14 @@ class BonusesAdmin(admin.ModelAdmin):
             del actions["delete_selected"]
         return actions
 
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        ClickBonusCache.publish_invalidation()
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        ClickBonusCache.publish_invalidation()
+
 
 class UseBonusesAdmin(admin.ModelAdmin):
     # Отключаем возможность добавления новых записей
@@ -767,6 +778,18 @@ class RangsAdmin(admin.ModelAdmin):
         "_role",
     )
 
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        RangLadderCache.publish_invalidation()
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        RangLadderCache.publish_invalidation()
+
+    def delete_queryset(self, request, queryset):
+        super().delete_queryset(request, queryset)
+        RangLadderCache.publish_invalidation()
+
 
 class PromocodesForm(forms.ModelForm):
 
@@ -0,0 +1,44 @@
+from bot.models import Lumberjack_Game
+from bot.service import grid
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = "Moves Lumberjack grids from the legacy current_grid matrix to grid_mask"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        self.stdout.write("🔄 Converting Lumberjack grids...")
+
+        batch_size = options["batch_size"]
+        converted = 0
+        batch = []
+        games = (
+            Lumberjack_Game.objects.exclude(current_grid=[])
+            .only("pk", "current_grid", "grid_mask", "grid_revealed")
+            .iterator(chunk_size=batch_size)
+        )
+        for game in games:
+            # NOTE поле уже в новом формате - старое просто очищаем
+            if not game.has_grid:
+                game.grid_mask, game.grid_revealed = grid.from_matrix(
+                    game.current_grid
+                )
+                converted += 1
+            game.current_grid = []
+            batch.append(game)
+
+            if len(batch) >= batch_size:
+                self._save(batch)
+                batch = []
+        self._save(batch)
+
+        self.stdout.write(self.style.SUCCESS(f"  converted: {converted} games"))
+
+    @staticmethod
+    def _save(games):
+        Lumberjack_Game.objects.bulk_update(
+            games, ["grid_mask", "grid_revealed", "current_grid"]
+        )
@@ -0,0 +1,246 @@
+import json
+import random
+import statistics
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from bot.models import GeoHunter, Lumberjack_Game, Sigma_Boosts, Users
+from bot.service.game_state import GameStateService
+from bot.service.grid import GRID_COLS, GRID_ROWS
+from bot.service.rating import RatingService
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client
+
+# NOTE Telegram ID тестовых игроков - вне диапазона настоящих
+USER_ID_BASE = 10**15
+
+ENDPOINTS = {
+    "lumberjack": "/api/v1/lumberjack-games/click/",
+    "geo_hunter": "/api/v1/geo-hunter/answer/",
+}
+
+
+class QueryCounter:
+    """Считает SQL-запросы текущего потока (connection.execute_wrapper)"""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+class Command(BaseCommand):
+    help = (
+        "Load test of game click endpoints with a swarm of simulated players: "
+        "p50/p95/p99 latency, DB queries per click and error rates"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--players", type=int, default=1000)
+        parser.add_argument("--clicks", type=int, default=20, help="Clicks per player")
+        parser.add_argument(
+            "--concurrency", type=int, default=50, help="Players clicking at once"
+        )
+        parser.add_argument(
+            "--game", choices=["lumberjack", "geo_hunter", "both"], default="both"
+        )
+        parser.add_argument(
+            "--think-time", type=float, default=0.0, help="Pause between clicks, sec."
+        )
+        parser.add_argument(
+            "--base-url",
+            default=None,
+            help="Run over HTTP against a deployed API (e.g. http://django:8000); "
+            "by default requests go through the in-process URL router",
+        )
+        parser.add_argument(
+            "--keep", action="store_true", help="Do not delete the test players"
+        )
+
+    def handle(self, *args, **options):
+        self.options = options
+        self.results: Dict[str, List[Tuple[float, int, Optional[int], str]]] = (
+            defaultdict(list)
+        )
+        self.lock = threading.Lock()
+
+        self.stdout.write(f"🚀 Preparing {options['players']} players...")
+        players = self._create_players(options["players"], options["clicks"])
+
+        try:
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=options["concurrency"]) as pool:
+                list(pool.map(self._play, players))
+            elapsed = time.perf_counter() - started
+
+            self._report(elapsed)
+        finally:
+            if not options["keep"]:
+                self.stdout.write("🧹 Removing test players...")
+                GameStateService().drop(players)
+                RatingService().remove_users(
+                    Users.objects.filter(pk__in=players).values_list("user_id", flat=True)
+                )
+                Users.objects.filter(pk__in=players).delete()
+
+    def _create_players(self, count: int, energy: int) -> List[int]:
+        """
+        Игроки с полной энергией на все клики
+        """
+        user_ids = range(USER_ID_BASE, USER_ID_BASE + count)
+        Users.objects.bulk_create(
+            [Users(user_id=user_id) for user_id in user_ids], ignore_conflicts=True
+        )
+        pks = list(
+            Users.objects.filter(user_id__in=user_ids).values_list("pk", flat=True)
+        )
+
+        Sigma_Boosts.objects.filter(user_id__in=pks).delete()
+        Lumberjack_Game.objects.filter(user_id__in=pks).delete()
+        GeoHunter.objects.filter(user_id__in=pks).delete()
+        GameStateService().drop(pks)
+
+        Sigma_Boosts.objects.bulk_create([Sigma_Boosts(user_id=pk) for pk in pks])
+        Lumberjack_Game.objects.bulk_create(
+            [
+                Lumberjack_Game(user_id=pk, current_energy=energy, max_energy=energy)
+                for pk in pks
+            ]
+        )
+        GeoHunter.objects.bulk_create(
+            [GeoHunter(user_id=pk, current_energy=energy, max_energy=energy) for pk in pks]
+        )
+        return pks
+
+    def _payload(self, game: str, user_pk: int) -> Dict:
+        if game == "lumberjack":
+            return {
+                "user_id": user_pk,
+                "energy_in_click": 1,
+                "row": random.randrange(GRID_ROWS),
+                "col": random.randrange(GRID_COLS),
+            }
+        return {
+            "user_id": user_pk,
+            "energy_in_click": 1,
+            "user_choice": random.random() < 0.5,
+        }
+
+    def _play(self, user_pk: int) -> None:
+        """
+        Один игрок: клики идут последовательно, как из бота
+        """
+        client = None
+        if not self.options["base_url"]:
+            host = next((h for h in settings.ALLOWED_HOSTS if h != "*"), "localhost")
+            client = Client(HTTP_HOST=host.lstrip("."))
+
+        games = (
+            list(ENDPOINTS)
+            if self.options["game"] == "both"
+            else [self.options["game"]]
+        )
+        try:
+            for _ in range(self.options["clicks"]):
+                game = random.choice(games)
+                self._click(client, game, self._payload(game, user_pk))
+                if self.options["think_time"]:
+                    time.sleep(self.options["think_time"])
+        finally:
+            connection.close()
+
+    def _click(self, client: Optional[Client], game: str, payload: Dict) -> None:
+        queries = None
+        result = "error"
+        started = time.perf_counter()
+        try:
+            if client:
+                counter = QueryCounter()
+                with connection.execute_wrapper(counter):
+                    response = client.patch(
+                        ENDPOINTS[game], payload, content_type="application/json"
+                    )
+                queries = counter.count
+                status_code = response.status_code
+                data = response.json() if status_code < 500 else {}
+            else:
+                status_code, data = self._http_click(game, payload)
+            if status_code < 400:
+                result = data.get("result", "ok")
+        except Exception as e:
+            status_code = 0
+            result = e.__class__.__name__
+        latency = time.perf_counter() - started
+
+        with self.lock:
+            self.results[game].append((latency, status_code, queries, result))
+
+    def _http_click(self, game: str, payload: Dict) -> Tuple[int, Dict]:
+        request = urllib.request.Request(
+            self.options["base_url"].rstrip("/") + ENDPOINTS[game],
+            data=json.dumps(payload).encode(),
+            headers={"Content-Type": "application/json"},
+            method="PATCH",
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=30) as response:
+                return response.status, json.loads(response.read() or b"{}")
+        except urllib.error.HTTPError as e:
+            return e.code, {}
+
+    @staticmethod
+    def _percentiles(values: List[float]) -> Tuple[float, float, float]:
+        if len(values) < 2:
+            value = values[0] if values else 0.0
+            return value, value, value
+        cuts = statistics.quantiles(values, n=100, method="inclusive")
+        return cuts[49], cuts[94], cuts[98]
+
+    def _report(self, elapsed: float) -> None:
+        total = sum(len(rows) for rows in self.results.values())
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"\n{total} clicks in {elapsed:.1f}s -> {total / elapsed:.0f} clicks/s "
+                f"({self.options['players']} players, "
+                f"concurrency {self.options['concurrency']})"
+            )
+        )
+
+        for game, rows in self.results.items():
+            latencies = [row[0] * 1000 for row in rows]
+            p50, p95, p99 = self._percentiles(latencies)
+            errors = [row for row in rows if not 0 < row[1] < 400]
+            server_errors = [row for row in rows if row[1] == 0 or row[1] >= 500]
+            queries = [row[2] for row in rows if row[2] is not None]
+
+            self.stdout.write(f"\n[{game}] {ENDPOINTS[game]}")
+            self.stdout.write(
+                f"  latency ms: p50 {p50:.1f} | p95 {p95:.1f} | p99 {p99:.1f} "
+                f"| max {max(latencies):.1f}"
+            )
+            self.stdout.write(
+                f"  errors: {len(errors) / len(rows):.2%} "
+                f"(5xx/transport {len(server_errors) / len(rows):.2%})"
+            )
+            if queries:
+                self.stdout.write(
+                    f"  DB queries per click: avg {statistics.mean(queries):.1f} "
+                    f"| max {max(queries)}"
+                )
+
+            outcomes = defaultdict(int)
+            for row in rows:
+                outcomes[row[3] if 0 < row[1] < 400 else f"HTTP {row[1]}"] += 1
+            self.stdout.write(
+                "  results: "
+                + ", ".join(f"{name} {count}" for name, count in sorted(outcomes.items()))
+            )
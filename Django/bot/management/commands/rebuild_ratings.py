@@ -0,0 +1,27 @@
+from bot.service.rating import CATEGORIES, RatingService
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = "Rebuilds rating leaderboards in Redis from Postgres"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "categories",
+            nargs="*",
+            choices=list(CATEGORIES),
+            help="Ratings to rebuild (all by default)",
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write("🔄 Rebuilding ratings...")
+
+        result = RatingService().rebuild(options["categories"] or None)
+
+        for category, size in result.items():
+            if size is None:
+                self.stdout.write(
+                    self.style.WARNING(f"  {category}: rebuild already in progress")
+                )
+            else:
+                self.stdout.write(self.style.SUCCESS(f"  {category}: {size} players"))
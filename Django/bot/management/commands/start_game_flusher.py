@@ -0,0 +1,35 @@
+import time
+
+from bot.service.game_state import FLUSH_BATCH_SIZE, GameStateService
+from django.core.management.base import BaseCommand
+from loguru import logger
+
+
+class Command(BaseCommand):
+    help = "Periodically flushes game state from Redis to Postgres"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--interval", type=float, default=3.0)
+        parser.add_argument("--batch-size", type=int, default=FLUSH_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.SUCCESS("🚀 Starting game state flusher..."))
+
+        service = GameStateService()
+
+        try:
+            while True:
+                try:
+                    flushed = service.flush(batch_size=options["batch_size"])
+                    if flushed:
+                        logger.info(f"Game state flushed: {flushed}")
+                    # NOTE если пачка заполнена - сразу берем следующую
+                    if flushed >= options["batch_size"]:
+                        continue
+                except Exception as e:
+                    logger.error(f"Flusher error: {e}")
+
+                time.sleep(options["interval"])
+
+        except KeyboardInterrupt:
+            self.stdout.write(self.style.WARNING("🛑 Stopping game state flusher..."))
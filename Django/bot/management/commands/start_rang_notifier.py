@@ -0,0 +1,37 @@
+import time
+
+from bot.service.rang import RANG_BATCH_SIZE, RangService
+from django.core.management.base import BaseCommand
+from loguru import logger
+
+
+class Command(BaseCommand):
+    help = "Periodically detects rang-ups and sends notifications to the bot"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--interval", type=float, default=5.0)
+        parser.add_argument("--batch-size", type=int, default=RANG_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.SUCCESS("🚀 Starting rang notifier..."))
+
+        service = RangService()
+
+        try:
+            while True:
+                try:
+                    processed = service.process_rang_ups(
+                        batch_size=options["batch_size"]
+                    )
+                    if processed:
+                        logger.info(f"Rang progress processed: {processed}")
+                    # NOTE если пачка заполнена - сразу берем следующую
+                    if processed >= options["batch_size"]:
+                        continue
+                except Exception as e:
+                    logger.error(f"Rang notifier error: {e}")
+
+                time.sleep(options["interval"])
+
+        except KeyboardInterrupt:
+            self.stdout.write(self.style.WARNING("🛑 Stopping rang notifier..."))
@@ -5,7 +5,9 @@ from datetime import timezone as datetime_timezone
 from typing import Optional, Union
 from zoneinfo import ZoneInfo
 
+from bot.service.quest_cache import ActiveQuestsCache
 from bot.service.rang import RangService
+from bot.service.rating import RatingService
 from django.contrib.contenttypes.fields import GenericForeignKey
 from django.contrib.contenttypes.models import ContentType
 from django.db import models
@@ -159,7 +161,10 @@ class Users(BaseModel):
             self._authorised_at = self._authorised_at.astimezone(datetime_timezone.utc)
         if self._age and self._age.tzinfo != datetime_timezone.utc:
             self._age = self._age.astimezone(datetime_timezone.utc)
+        adding = self._state.adding
         super().save(*args, **kwargs)
+        # NOTE рейтинги (all_starcoins, приглашения) - по факту записи
+        RatingService().user_saved(self, adding, kwargs.get("update_fields"))
 
     @property
     def role_name(self):
@@ -201,20 +206,18 @@ class Users(BaseModel):
 
     @starcoins.setter
     def starcoins(self, value):
-        logger.info(
-            "Change Balance: UserID:{0} |Old Balance:{1} |New Balance:{2} |Edit:{3}".format(
-                self.user_id, self._starcoins, value, self._starcoins - value
-            )
+        # NOTE только новое значение: повышение ранга отслеживает
+        # фоновая задача (RangService.process_rang_ups), не запрос
+        logger.debug(
+            "Change Balance: UserID:{} |Old Balance:{} |New Balance:{}",
+            self.user_id,
+            self._starcoins,
+            value,
         )
 
-        current_rang = self.get_current_rang()
         if self._starcoins < value:
             self.all_starcoins += value - self._starcoins
 
-        previous_rang = self.get_current_rang()
-        if previous_rang and current_rang and previous_rang.level > current_rang.level:
-            self.send_rang_notification(current_rang, previous_rang)
-
         self._starcoins = round(float(value), 4)
 
     def get_current_rang(self) -> Optional["Rangs"]:
@@ -222,19 +225,17 @@ class Users(BaseModel):
         return RangService().get_user_rang(self)
 
     def send_rang_notification(
-        self: "Users", current_rang: "Rangs", previous_rang: "Rangs"
+        self: "Users", old_level: int, new_rang: "Rangs"
     ) -> None:
         """Уведомляем пользователя о повышении"""
         new_quests = (
-            Quests.objects.filter(min_rang_level=previous_rang.level, active=True)
+            Quests.objects.filter(min_rang_level=new_rang.level, active=True)
             .filter(
                 Q(role=self._role) | Q(role__isnull=True)  # ← Явная проверка на NULL
             )
-            .select_related("content_type")
-        )
-        RangService().send_rang_notification(
-            self, current_rang, previous_rang, bool(new_quests)
+            .exists()
         )
+        RangService().send_rang_notification(self, old_level, new_rang, new_quests)
 
     class Meta:
         db_table = "users"
@@ -465,9 +466,21 @@ class Lumberjack_Game(BaseModel):
         default=0, verbose_name="Всего кликов"
     )  # BigIntegerField
     _total_currency = models.FloatField(default=0.0, verbose_name="Всего заработал")
-    current_grid = models.JSONField(default=list)  # Текущее состояние поля 4x5
+    # Поле 4x5: бит ячейки (row * 5 + col) - неоткрытая звезда
+    grid_mask = models.PositiveIntegerField(default=0, verbose_name="Звезды поля")
+    grid_revealed = models.JSONField(
+        default=list, verbose_name="Открытые ячейки"
+    )  # [[ячейка, доход], ...]
+    # NOTE старое поле (матрица 4x5), не используется: перенос в grid_mask /
+    # grid_revealed - команда convert_lumberjack_grids, удалить после переноса
+    current_grid = models.JSONField(default=list, blank=True)
     # clicks_remaining = models.IntegerField(default=0) # Осталось кликов до обновления поля
 
+    @property
+    def has_grid(self) -> bool:
+        """Поле уже сгенерировано"""
+        return bool(self.grid_mask or self.grid_revealed)
+
     @property
     def last_energy_update(self):
         """Геттер: возвращает время в московском часовом поясе"""
@@ -950,6 +963,12 @@ class UseQuests(BaseModel):
     def __str__(self):
         return f"{self.id}"
 
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        RatingService().use_quest_changed(self.user_id)
+        ActiveQuestsCache().invalidate(self.user_id)
+        return result
+
     def save(self, *args, **kwargs):
         # Проверяем, хотим ли мы сохранить без auto_now
         skip_auto_now = kwargs.pop("skip_auto_now", False)
@@ -968,6 +987,9 @@ class UseQuests(BaseModel):
         else:
             super().save(*args, **kwargs)
 
+        RatingService().use_quest_changed(self.user_id)
+        ActiveQuestsCache().invalidate(self.user_id)
+
 
 class QuestModerationAttempt(BaseModel):
     use_quest = models.ForeignKey(
@@ -985,6 +1007,11 @@ class QuestModerationAttempt(BaseModel):
         default="pending",
     )
 
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        # NOTE попытки на модерации занимают выполнения квеста
+        ActiveQuestsCache().invalidate(self.use_quest.user_id)
+
     class Meta:
         db_table = "quest_moderation_attempts"
 
@@ -1059,6 +1086,28 @@ class Rangs(BaseModel):
         )
 
 
+class RangProgress(BaseModel):
+    """
+    Уровень ранга, о котором пользователь уже уведомлен.
+    Отдельная таблица: Users.save() не перезапишет уровень устаревшим
+    """
+    user = models.OneToOneField(
+        Users,
+        on_delete=models.CASCADE,
+        related_name="rang_progress",
+        verbose_name="Игрок",
+    )
+    level = models.IntegerField(default=0, verbose_name="Уровень ранга")
+
+    class Meta:
+        db_table = "rang_progress"
+        verbose_name = "Прогресс ранга"
+        verbose_name_plural = "Прогресс рангов"
+
+    def __str__(self):
+        return f"{self.user_id}: {self.level}"
+
+
 class StarcoinsPromo(BaseModel):
     title = models.CharField(max_length=255, verbose_name="Заголовок")
     description = models.TextField(blank=True, null=True, verbose_name="Описание")
@@ -221,7 +221,7 @@ class LumberjackGameSerializer(BaseSerializer):
 
     class Meta:
         model = Lumberjack_Game
-        fields = "__all__"
+        exclude = ("current_grid",)
 
     def get_last_energy_update(self, obj):
         return obj.last_energy_update  # Используем геттер Django
@@ -0,0 +1,91 @@
+"""Атомарные изменения баланса: одно условное UPDATE вместо чтения и save()"""
+
+from typing import TYPE_CHECKING
+
+from django.db import connection
+
+from .rating import RatingService
+
+if TYPE_CHECKING:
+    from bot.models import Users
+
+
+# NOTE округление как в сеттере Users.starcoins,
+# all_starcoins растет только от пополнений
+CREDIT_SQL = """
+UPDATE users
+SET _starcoins = round((_starcoins + %(amount)s)::numeric, 4)::float,
+    all_starcoins = all_starcoins + GREATEST(%(amount)s, 0)
+WHERE id = %(pk)s
+RETURNING _starcoins, all_starcoins
+"""
+
+DEBIT_SQL = """
+UPDATE users
+SET _starcoins = round((_starcoins - %(amount)s)::numeric, 4)::float
+WHERE id = %(pk)s
+  AND (%(overdraft)s OR _starcoins >= %(amount)s)
+RETURNING _starcoins, all_starcoins
+"""
+
+# NOTE возврат стоимости покупки - не заработок, all_starcoins не трогаем
+REFUND_SQL = """
+UPDATE users
+SET _starcoins = round((_starcoins + %(amount)s)::numeric, 4)::float
+WHERE id = %(pk)s
+RETURNING _starcoins, all_starcoins
+"""
+
+# NOTE отмена награды: снимаем и с баланса, и с заработанного (можно в минус)
+REVOKE_SQL = """
+UPDATE users
+SET _starcoins = round((_starcoins - %(amount)s)::numeric, 4)::float,
+    all_starcoins = all_starcoins - %(amount)s
+WHERE id = %(pk)s
+RETURNING _starcoins, all_starcoins
+"""
+
+
+class BalanceService:
+    """
+    Starcoins меняются одним UPDATE ... RETURNING с условием в WHERE:
+    корректно при параллельных запросах без блокировок и без
+    предварительного чтения. Значения в объекте user обновляются из RETURNING
+    """
+
+    def credit(self, user: "Users", amount: float) -> None:
+        """Начислить"""
+        if self._execute(CREDIT_SQL, user, {"amount": float(amount), "pk": user.pk}):
+            RatingService().starcoins_added(user, float(amount))
+
+    def debit(self, user: "Users", amount: float, overdraft: bool = False) -> bool:
+        """
+        Списать, False - не хватает средств
+        (overdraft - разрешаем уйти в минус, для DEBUG)
+        """
+        return self._execute(
+            DEBIT_SQL,
+            user,
+            {"amount": float(amount), "pk": user.pk, "overdraft": overdraft},
+        )
+
+    def refund(self, user: "Users", amount: float) -> None:
+        """Вернуть списанное (отмена покупки)"""
+        self._execute(REFUND_SQL, user, {"amount": float(amount), "pk": user.pk})
+
+    def revoke(self, user: "Users", amount: float) -> None:
+        """Забрать начисленную награду (отписка от канала и т.п.)"""
+        if self._execute(REVOKE_SQL, user, {"amount": float(amount), "pk": user.pk}):
+            RatingService().starcoins_added(user, -float(amount))
+
+    @staticmethod
+    def _execute(sql: str, user: "Users", params: dict) -> bool:
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            row = cursor.fetchone()
+
+        if not row:
+            return False
+
+        user._starcoins, user.all_starcoins = row
+        return True
@@ -0,0 +1,105 @@
+import threading
+import time
+from typing import Optional
+
+from django.utils import timezone
+from loguru import logger
+from Redis.main import RedisManager
+
+CLICK_BONUS_CHANNEL = "click_bonus_updates"
+CLICK_BONUS_TTL = 60  # сек.
+
+
+class ClickBonusCache:
+    """
+    Множитель активного click_scale бонуса в памяти процесса.
+    Живет CLICK_BONUS_TTL (и не дольше срока бонуса),
+    сбрасывается во всех процессах через Redis pub/sub
+    """
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance._lock = threading.Lock()
+            cls._instance._multiplier = None
+            cls._instance._valid_until = 0.0
+            cls._instance._listener = None
+        return cls._instance
+
+    def multiplier(self) -> Optional[float]:
+        """
+        Множитель дохода за клик или None, если бонуса нет
+        """
+        self._ensure_listener()
+
+        if time.monotonic() < self._valid_until:
+            return self._multiplier
+
+        with self._lock:
+            if time.monotonic() >= self._valid_until:
+                self._multiplier, self._valid_until = self._load()
+            return self._multiplier
+
+    def _load(self) -> tuple:
+        from bot.models import Bonuses
+
+        now = timezone.now()
+        valid_until = time.monotonic() + CLICK_BONUS_TTL
+
+        bonus = (
+            Bonuses.objects.filter(
+                type_bonus="click_scale", active=True, _expires_at__gt=now
+            )
+            .select_related("content_type")
+            .order_by("pk")
+            .first()
+        )
+        if not bonus:
+            return None, valid_until
+
+        # NOTE бонус перестает действовать ровно в свой срок, не дожидаясь чистки
+        left = (bonus._expires_at - now).total_seconds()
+        return bonus.bonus_data.value, min(valid_until, time.monotonic() + left)
+
+    def invalidate(self) -> None:
+        """Сбросить кэш текущего процесса"""
+        self._valid_until = 0.0
+
+    @classmethod
+    def publish_invalidation(cls) -> None:
+        """Сбросить кэш во всех процессах"""
+        cls().invalidate()
+        try:
+            RedisManager().get_redis().publish(CLICK_BONUS_CHANNEL, "invalidate")
+        except Exception as e: # Redis
+            logger.error(f"Click bonus invalidation not published: {e}")
+
+    def _ensure_listener(self) -> None:
+        if self._listener is not None:
+            return
+        with self._lock:
+            if self._listener is None:
+                self._listener = threading.Thread(
+                    target=self._listen, name="click-bonus-listener", daemon=True
+                )
+                self._listener.start()
+
+    def _listen(self) -> None:
+        while True:
+            try:
+                pubsub = RedisManager().get_redis().pubsub(
+                    ignore_subscribe_messages=True
+                )
+                pubsub.subscribe(CLICK_BONUS_CHANNEL)
+                # NOTE пока не подписаны, сообщения могли потеряться
+                self.invalidate()
+                while True:
+                    # NOTE не listen(): у клиента socket_timeout, ждем порциями
+                    message = pubsub.get_message(timeout=1.0)
+                    if message and message["type"] == "message":
+                        self.invalidate()
+            except Exception as e: # Redis
+                logger.error(f"Click bonus listener error: {e}")
+                self.invalidate()
+                time.sleep(3)
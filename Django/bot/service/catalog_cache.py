@@ -0,0 +1,76 @@
+"""Кэш каталогов (квесты, магазин, ранги, бонусы) с ETag"""
+
+import threading
+from typing import Any, Callable, Dict, Tuple
+
+from django.db import transaction
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.http import parse_etags
+from loguru import logger
+from Redis.main import RedisManager
+from rest_framework.renderers import JSONRenderer
+
+CATALOGS = ("quests", "pikmi_shop", "rangs", "bonuses")
+
+
+class CatalogCache:
+    """
+    Готовые JSON-ответы каталогов в памяти процесса.
+    Версия каталога - счетчик в Redis (catalog:version:{name}), его поднимает
+    сохранение/удаление моделей каталога (bot.signals) и изменения остатков.
+    Ответ с той же версией отдается без запросов к БД и сериализации,
+    ETag - версия: на If-None-Match с ней отвечаем 304
+    """
+    VERSION_KEY = "catalog:version:{name}"
+
+    _lock = threading.Lock()
+    _payloads: Dict[Tuple[str, str], Tuple[int, bytes]] = {}
+
+    def version(self, name: str) -> int:
+        version = RedisManager().get_redis().get(self.VERSION_KEY.format(name=name))
+        return int(version) if version else 0
+
+    def bump(self, name: str) -> None:
+        """Новая версия каталога после коммита"""
+        def apply() -> None:
+            try:
+                RedisManager().get_redis().incr(self.VERSION_KEY.format(name=name))
+            except Exception as e: # Redis
+                logger.error(f"Catalog {name} version not bumped: {e}")
+
+        transaction.on_commit(apply)
+
+    def response(
+        self, request: Any, name: str, key: str, build: Callable[[], Any]
+    ) -> HttpResponse:
+        """
+        key - параметры запроса внутри каталога (роль, id),
+        build - данные ответа из БД (вызывается только при смене версии)
+        """
+        try:
+            version = self.version(name)
+        except Exception as e: # Redis
+            logger.error(f"Catalog {name} version not read: {e}")
+            return HttpResponse(
+                JSONRenderer().render(build()), content_type="application/json"
+            )
+
+        etag = f'"{name}:{key}:{version}"'
+        if etag in parse_etags(request.headers.get("If-None-Match", "")):
+            response = HttpResponseNotModified()
+            response["ETag"] = etag
+            return response
+
+        cached = self._payloads.get((name, key))
+        if cached and cached[0] == version:
+            payload = cached[1]
+        else:
+            payload = JSONRenderer().render(build())
+            with self._lock:
+                self._payloads[(name, key)] = (version, payload)
+
+        response = HttpResponse(payload, content_type="application/json")
+        response["ETag"] = etag
+        # NOTE копию клиент хранит, но каждый раз сверяет версию
+        response["Cache-Control"] = "no-cache"
+        return response
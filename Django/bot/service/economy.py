@@ -0,0 +1,122 @@
+"""Экономика игрока: пользователь, бусты и обе игры одним запросом"""
+
+from typing import Any, Dict, NamedTuple, Optional
+
+from django.db.models import Count, FilteredRelation, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from rest_framework import status
+
+from bot.models import GeoHunter, Lumberjack_Game, Sigma_Boosts, Users
+from bot.schemas import boosts_data
+from bot.views.error import RaisesResponse
+
+from .game_state import GameStateService
+
+
+class PlayerEconomy(NamedTuple):
+    user: Users
+    boosts: Sigma_Boosts
+    jack: Lumberjack_Game
+    geo: GeoHunter
+
+    @property
+    def pending_passive_income(self) -> float:
+        """
+        Пассивный доход за полные часы, еще не зачисленный
+        (зачисляет PassiveIncomeService.settle)
+        """
+        level = min(
+            self.boosts.passive_income_level,
+            boosts_data.passive_income_level.max_level(),
+        )
+        if level <= 0:
+            return 0
+        hours = int(
+            (timezone.now() - self.boosts._last_passive_claim).total_seconds() // 3600
+        )
+        return max(hours, 0) * boosts_data.passive_income_level.value_by_level(level)
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Компактная запись: энергия игр, уровни бустов, пассивный доход"""
+        return {
+            "user_id": self.user.pk,
+            "starcoins": self.user.starcoins,
+            "lumberjack_energy": self.jack.current_energy,
+            "lumberjack_max_energy": self.jack.max_energy,
+            "geo_hunter_energy": self.geo.current_energy,
+            "geo_hunter_max_energy": self.geo.max_energy,
+            "income_level": self.boosts.income_level,
+            "energy_capacity_level": self.boosts.energy_capacity_level,
+            "recovery_level": self.boosts.recovery_level,
+            "passive_income_level": self.boosts.passive_income_level,
+            "pending_passive_income": self.pending_passive_income,
+        }
+
+
+class EconomyService:
+    """
+    Все, что нужно игровым эндпоинтам, - одним индексным запросом
+    (users + sigma_boosts + lumberjack_game + geo_hunter через JOIN)
+    вместо четырех get() по четырем таблицам.
+    Энергия игр берется из Redis (GameStateService), если состояние загружено
+    """
+
+    def load(
+        self,
+        pk: Optional[int] = None,
+        user_id: Optional[int] = None,
+        referrals: bool = False,
+    ) -> PlayerEconomy:
+        """
+        referrals - дополнительно user.referral_count (подзапрос в том же SQL)
+        """
+        lookup = {"pk": pk} if pk is not None else {"user_id": user_id}
+        queryset = Users.objects.annotate(
+            jack=FilteredRelation("games"),
+            geo=FilteredRelation("geo_hunter"),
+        ).select_related("boosts", "jack", "geo")
+        if referrals:
+            queryset = queryset.annotate(
+                referral_count=Coalesce(
+                    Subquery(
+                        Users.objects.filter(
+                            referral_user_id=OuterRef("user_id"), authorised=True
+                        )
+                        .order_by()
+                        .values("referral_user_id")
+                        .annotate(count=Count("pk"))
+                        .values("count")
+                    ),
+                    0,
+                )
+            )
+        try:
+            user = queryset.get(**lookup)
+        except Users.DoesNotExist:
+            raise RaisesResponse(
+                data={"error": "User not found"}, status=status.HTTP_404_NOT_FOUND
+            )
+
+        # NOTE недостающие записи создаем как SigmaBoostsViewMethods.get и т.д.
+        try:
+            boosts = user.boosts
+        except Sigma_Boosts.DoesNotExist:
+            boosts = Sigma_Boosts.objects.create(user=user)
+
+        jack = getattr(user, "jack", None) or Lumberjack_Game.objects.create(user=user)
+        geo = getattr(user, "geo", None) or GeoHunter.objects.create(
+            user=user, current_energy=100, max_energy=100
+        )
+        jack.user = geo.user = user
+
+        return PlayerEconomy(user, boosts, jack, geo)
+
+    def snapshot(self, pk: int) -> Dict[str, Any]:
+        """
+        Запись экономики с актуальной энергией из Redis
+        """
+        economy = self.load(pk=pk)
+        GameStateService().overlay(economy.jack)
+        GameStateService().overlay(economy.geo)
+        return economy.as_dict()
@@ -39,3 +39,10 @@ class DuplicateOperationException(BaseServiceException):
     """Дублирующая операция (idempotency error)."""
     def __init__(self, detail: str = "Duplicate operation detected"):
         super().__init__(detail, "duplicate_operation")
+
+
+class FlushLockTimeoutException(BaseServiceException):
+    """Не дождались сброса игрового состояния (занято флашером)."""
+    def __init__(self, user_pks: list):
+        detail = f"Game state flush is busy for users {user_pks}"
+        super().__init__(detail, "flush_lock_timeout")
@@ -0,0 +1,604 @@
+"""Состояние игр (кликер + геохантер) в Redis с отложенной записью в Postgres"""
+
+import json
+import time
+import uuid
+from datetime import datetime
+from datetime import timezone as datetime_timezone
+from enum import Enum
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+from django.db import transaction
+from django.utils import timezone
+from loguru import logger
+from Redis.main import RedisManager
+
+from bot.models import GeoHunter, Lumberjack_Game, Users
+
+from .exceptions import FlushLockTimeoutException
+from .grid import cell_index
+from .rating import RatingService
+
+
+class ClickStatus(str, Enum):
+    """Результат клика"""
+    SUCCESS   = "success"
+    MISS      = "miss"
+    NO_ENERGY = "no_energy"
+    REFRESH   = "refresh"
+
+
+CLICK_STATUSES = {
+    0: ClickStatus.NO_ENERGY,
+    1: ClickStatus.SUCCESS,
+    2: ClickStatus.MISS,
+}
+
+GAME_STATE_TTL = 60 * 60 * 24
+FLUSH_BATCH_SIZE = 500
+FLUSH_LOCK_TTL = 30  # сек.
+FLUSH_LOCK_WAIT = 5  # сек.
+
+# NOTE поля-дельты: копятся в Redis и забираются флашером
+DELTA_FIELDS = (
+    "starcoins_delta",
+    "lj_clicks_delta",
+    "lj_currency_delta",
+    "geo_true_delta",
+    "geo_false_delta",
+    "geo_currency_delta",
+)
+
+# NOTE загружаем состояние только если его еще нет
+LOAD_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    return 0
+end
+redis.call('HSET', KEYS[1], unpack(ARGV, 2))
+redis.call('EXPIRE', KEYS[1], ARGV[1])
+return 1
+"""
+
+# NOTE перезаписываем абсолютные поля только у закэшированного состояния
+SYNC_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return 0
+end
+redis.call('HSET', KEYS[1], unpack(ARGV, 2))
+redis.call('SADD', KEYS[2], ARGV[1])
+return 1
+"""
+
+# NOTE атомарный клик
+# ARGV: own, other, energy_in_click, income, grid_value, counter_field,
+#       now, ttl, user_pk, cell, recovery_seconds
+# cell - бит маски поля (-1 клик без поля)
+# Ответ: {статус, энергия, энергия другой игры}
+# статус: -1 нет состояния, 0 нет энергии, 1 успех, 2 промах по полю
+CLICK_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return {-1, 0, 0}
+end
+local own = ARGV[1]
+local other = ARGV[2]
+local cost = tonumber(ARGV[3])
+local now = tonumber(ARGV[7])
+local recovery = tonumber(ARGV[11])
+
+-- Ленивое восстановление энергии по времени
+for _, prefix in ipairs({own, other}) do
+    local current = tonumber(redis.call('HGET', KEYS[1], prefix .. '_energy'))
+    local maximum = tonumber(redis.call('HGET', KEYS[1], prefix .. '_max_energy'))
+    local last_update = tonumber(redis.call('HGET', KEYS[1], prefix .. '_last_update'))
+    if current < maximum and now >= last_update + recovery then
+        redis.call('HSET', KEYS[1], prefix .. '_energy', maximum)
+    end
+end
+
+local energy = tonumber(redis.call('HGET', KEYS[1], own .. '_energy'))
+local other_energy = tonumber(redis.call('HGET', KEYS[1], other .. '_energy'))
+if energy < cost or energy <= 0 then
+    return {0, energy, other_energy}
+end
+
+local cell = tonumber(ARGV[10])
+if cell >= 0 then
+    local mask = tonumber(redis.call('HGET', KEYS[1], own .. '_grid_mask') or 0)
+    local star = 2 ^ cell
+    if bit.band(mask, star) == 0 then
+        return {2, energy, other_energy}
+    end
+    redis.call('HSET', KEYS[1], own .. '_grid_mask', bit.bxor(mask, star))
+    local revealed = cjson.decode(
+        redis.call('HGET', KEYS[1], own .. '_grid_revealed') or '[]'
+    )
+    table.insert(revealed, {cell, ARGV[5]})
+    redis.call('HSET', KEYS[1], own .. '_grid_revealed', cjson.encode(revealed))
+end
+
+-- Обновляем точку отсчета при полной энергии
+local max_energy = tonumber(redis.call('HGET', KEYS[1], own .. '_max_energy'))
+if energy == max_energy then
+    redis.call('HSET', KEYS[1], own .. '_last_update', ARGV[7], other .. '_last_update', ARGV[7])
+end
+
+energy = redis.call('HINCRBY', KEYS[1], own .. '_energy', -cost)
+if other_energy > 0 then
+    other_energy = redis.call('HINCRBY', KEYS[1], other .. '_energy', -cost)
+end
+
+redis.call('HINCRBY', KEYS[1], ARGV[6], 1)
+if tonumber(ARGV[4]) > 0 then
+    redis.call('HINCRBYFLOAT', KEYS[1], own .. '_currency_delta', ARGV[4])
+    redis.call('HINCRBYFLOAT', KEYS[1], 'starcoins_delta', ARGV[4])
+end
+
+redis.call('EXPIRE', KEYS[1], ARGV[8])
+redis.call('SADD', KEYS[2], ARGV[9])
+return {1, energy, other_energy}
+"""
+
+# NOTE забираем снимок состояния и обнуляем дельты
+CLAIM_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return {}
+end
+local data = redis.call('HGETALL', KEYS[1])
+for i = 1, #ARGV do
+    redis.call('HSET', KEYS[1], ARGV[i], 0)
+end
+return data
+"""
+
+# NOTE снимаем блокировку, только если она наша
+UNLOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+class GameStateService:
+    """
+    Redis хранит актуальное состояние игр пользователя
+    (энергия, поле, счетчики и не записанные starcoins),
+    клики применяются атомарно Lua-скриптом.
+    Postgres догоняет состояние через flush (start_game_flusher)
+    """
+    KEY = "game_state:{user_pk}"
+    DIRTY_KEY = "game_state:dirty"
+    FLUSH_LOCK_KEY = "game_state:flush_lock:{user_pk}"
+    # NOTE поля энергии: их можно менять в Postgres в обход Redis (sync_game)
+    ENERGY_FIELDS = [
+        "current_energy",
+        "max_energy",
+        "_last_energy_update",
+        "updated_at",
+    ]
+
+    _scripts: Dict[str, Any] = {}
+
+    def _script(self, name: str, source: str) -> Any:
+        if name not in self._scripts:
+            self._scripts[name] = (
+                RedisManager().get_redis().register_script(source)
+            )
+        return self._scripts[name]
+
+    def _key(self, user_pk: int) -> str:
+        return self.KEY.format(user_pk=user_pk)
+
+    @staticmethod
+    def _timestamp(value: Optional[datetime]) -> float:
+        return (value or timezone.now()).timestamp()
+
+    @staticmethod
+    def _datetime(value: Union[bytes, str, float]) -> datetime:
+        return datetime.fromtimestamp(float(value), tz=datetime_timezone.utc)
+
+    @staticmethod
+    def _decode(data: Union[Dict, List]) -> Dict[str, str]:
+        if isinstance(data, list):
+            data = dict(zip(data[::2], data[1::2]))
+        return {
+            (k.decode() if isinstance(k, bytes) else k): (
+                v.decode() if isinstance(v, bytes) else str(v)
+            )
+            for k, v in data.items()
+        }
+
+    def _dump_game(
+        self, game: Union[Lumberjack_Game, GeoHunter]
+    ) -> Dict[str, Any]:
+        """
+        Абсолютные поля игры для Redis
+        """
+        prefix = "lj" if isinstance(game, Lumberjack_Game) else "geo"
+        data = {
+            f"{prefix}_game_id": game.pk,
+            f"{prefix}_energy": game.current_energy,
+            f"{prefix}_max_energy": game.max_energy,
+            f"{prefix}_last_update": self._timestamp(game._last_energy_update),
+        }
+        if isinstance(game, Lumberjack_Game):
+            data["lj_grid_mask"] = game.grid_mask
+            data["lj_grid_revealed"] = json.dumps(game.grid_revealed or [])
+        return data
+
+    @staticmethod
+    def _flatten(mapping: Dict[str, Any]) -> List[Any]:
+        args = []
+        for field, value in mapping.items():
+            args.extend((field, value))
+        return args
+
+    def load(
+        self, jack_game: Lumberjack_Game, geo_hunter: GeoHunter
+    ) -> None:
+        """
+        Загружаем состояние из Postgres, если его нет в Redis
+        """
+        mapping = {
+            **self._dump_game(jack_game),
+            **self._dump_game(geo_hunter),
+            **{field: 0 for field in DELTA_FIELDS},
+        }
+        self._script("load", LOAD_SCRIPT)(
+            keys=[self._key(jack_game.user_id)],
+            args=[GAME_STATE_TTL, *self._flatten(mapping)],
+        )
+
+    def get(self, user_pk: int) -> Optional[Dict[str, str]]:
+        data = RedisManager().get_redis().hgetall(self._key(user_pk))
+        return self._decode(data) if data else None
+
+    def overlay(
+        self,
+        game: Union[Lumberjack_Game, GeoHunter],
+        counters: bool = False,
+    ) -> Union[Lumberjack_Game, GeoHunter]:
+        """
+        Подставляем в модель актуальное состояние из Redis
+
+        NOTE counters=True (счетчики и баланс) только для ответа:
+        такую модель нельзя сохранять, иначе дельты запишутся дважды
+        """
+        state = self.get(game.user_id)
+        if not state:
+            return game
+
+        prefix = "lj" if isinstance(game, Lumberjack_Game) else "geo"
+        game.current_energy = int(state[f"{prefix}_energy"])
+        game.max_energy = int(state[f"{prefix}_max_energy"])
+        game._last_energy_update = self._datetime(state[f"{prefix}_last_update"])
+
+        if isinstance(game, Lumberjack_Game):
+            self._apply_grid(game, state)
+            if counters:
+                game.total_clicks += int(state["lj_clicks_delta"])
+        elif counters:
+            game.total_true += int(state["geo_true_delta"])
+            game.total_false += int(state["geo_false_delta"])
+
+        if counters:
+            game.total_currency += float(state[f"{prefix}_currency_delta"])
+            game.user._starcoins += float(state["starcoins_delta"])
+        return game
+
+    def pending_starcoins(self, user_pk: int) -> float:
+        """
+        Еще не записанные в Postgres starcoins
+        """
+        value = RedisManager().get_redis().hget(self._key(user_pk), "starcoins_delta")
+        return float(value) if value else 0.0
+
+    def sync_game(
+        self, game: Union[Lumberjack_Game, GeoHunter], grid: bool = False
+    ) -> None:
+        """
+        Переносим в Redis изменения игры, сделанные напрямую в Postgres
+
+        NOTE только энергию (grid=True - и поле): остальное в модели
+        может отставать от Redis
+        """
+        mapping = self._dump_game(game)
+        mapping.pop("lj_game_id", None)
+        mapping.pop("geo_game_id", None)
+        if not grid:
+            mapping.pop("lj_grid_mask", None)
+            mapping.pop("lj_grid_revealed", None)
+        self._script("sync", SYNC_SCRIPT)(
+            keys=[self._key(game.user_id), self.DIRTY_KEY],
+            args=[game.user_id, *self._flatten(mapping)],
+        )
+
+    def update_grid(
+        self, jack_game: Lumberjack_Game, geo_hunter: GeoHunter, grid_mask: int
+    ) -> None:
+        self.load(jack_game, geo_hunter)
+        jack_game.grid_mask = grid_mask
+        jack_game.grid_revealed = []
+        self.sync_game(jack_game, grid=True)
+
+    def _click(
+        self,
+        jack_game: Lumberjack_Game,
+        geo_hunter: GeoHunter,
+        own: str,
+        energy_in_click: int,
+        income: float,
+        counter_field: str,
+        recovery_seconds: float,
+        cell: int = -1,
+    ) -> Dict[str, Any]:
+        args = [
+            own,
+            "geo" if own == "lj" else "lj",
+            int(energy_in_click),
+            income,
+            str(income),
+            counter_field,
+            self._timestamp(None),
+            GAME_STATE_TTL,
+            jack_game.user_id,
+            int(cell),
+            recovery_seconds,
+        ]
+        keys = [self._key(jack_game.user_id), self.DIRTY_KEY]
+        script = self._script("click", CLICK_SCRIPT)
+
+        self.load(jack_game, geo_hunter)
+        result, energy, other_energy = script(keys=keys, args=args)
+        if result == -1:
+            # NOTE состояние истекло между загрузкой и кликом
+            self.load(jack_game, geo_hunter)
+            result, energy, other_energy = script(keys=keys, args=args)
+
+        return {
+            "status": CLICK_STATUSES.get(result, ClickStatus.NO_ENERGY),
+            "energy": int(energy),
+            "other_energy": int(other_energy),
+        }
+
+    def click_lumberjack(
+        self,
+        jack_game: Lumberjack_Game,
+        geo_hunter: GeoHunter,
+        income: float,
+        energy_in_click: int,
+        recovery_seconds: float,
+        row: int,
+        col: int,
+    ) -> Dict[str, Any]:
+        """
+        Клик в кликере
+        """
+        return self._click(
+            jack_game, geo_hunter, "lj", energy_in_click, income,
+            "lj_clicks_delta", recovery_seconds, cell_index(int(row), int(col)),
+        )
+
+    def click_geohunter(
+        self,
+        jack_game: Lumberjack_Game,
+        geo_hunter: GeoHunter,
+        income: float,
+        energy_in_click: int,
+        recovery_seconds: float,
+        user_choice: bool,
+    ) -> Dict[str, Any]:
+        """
+        Ответ в геохантере
+        """
+        return self._click(
+            jack_game, geo_hunter, "geo", energy_in_click,
+            income if user_choice else 0,
+            "geo_true_delta" if user_choice else "geo_false_delta",
+            recovery_seconds,
+        )
+
+    def _claim(self, user_pks: List[int]) -> Dict[int, Dict[str, str]]:
+        """
+        Забираем снимки состояний с обнуленными дельтами
+        """
+        script = self._script("claim", CLAIM_SCRIPT)
+        pipe = RedisManager().get_redis().pipeline(transaction=False)
+        for user_pk in user_pks:
+            script(keys=[self._key(user_pk)], args=list(DELTA_FIELDS), client=pipe)
+
+        return {
+            user_pk: self._decode(data)
+            for user_pk, data in zip(user_pks, pipe.execute())
+            if data
+        }
+
+    def _rollback(self, snapshots: Dict[int, Dict[str, str]]) -> None:
+        """
+        Возвращаем дельты в Redis, если запись в Postgres не удалась
+        """
+        pipe = RedisManager().get_redis().pipeline(transaction=False)
+        for user_pk, state in snapshots.items():
+            for field in DELTA_FIELDS:
+                if float(state.get(field, 0)):
+                    pipe.hincrbyfloat(self._key(user_pk), field, state[field])
+            pipe.sadd(self.DIRTY_KEY, user_pk)
+        pipe.execute()
+
+    @staticmethod
+    def _apply_game(
+        game: Union[Lumberjack_Game, GeoHunter], state: Dict[str, str], prefix: str
+    ) -> None:
+        game.current_energy = int(state[f"{prefix}_energy"])
+        game.max_energy = int(state[f"{prefix}_max_energy"])
+        game._last_energy_update = GameStateService._datetime(
+            state[f"{prefix}_last_update"]
+        )
+        game.total_currency += float(state[f"{prefix}_currency_delta"])
+        game.updated_at = timezone.now()
+
+    @staticmethod
+    def _apply_grid(jack_game: Lumberjack_Game, state: Dict[str, str]) -> None:
+        jack_game.grid_mask = int(state.get("lj_grid_mask", 0))
+        jack_game.grid_revealed = json.loads(state.get("lj_grid_revealed", "[]"))
+
+    @transaction.atomic
+    def _persist(self, snapshots: Dict[int, Dict[str, str]]) -> None:
+        users = Users.objects.select_for_update().in_bulk(list(snapshots))
+        jack_games = Lumberjack_Game.objects.select_for_update().in_bulk(
+            [int(state["lj_game_id"]) for state in snapshots.values()]
+        )
+        geo_hunters = GeoHunter.objects.select_for_update().in_bulk(
+            [int(state["geo_game_id"]) for state in snapshots.values()]
+        )
+
+        rating = RatingService()
+        for user_pk, state in snapshots.items():
+            starcoins_delta = float(state["starcoins_delta"])
+            user = users.get(user_pk)
+            if user and starcoins_delta:
+                user.starcoins += starcoins_delta
+                rating.starcoins_added(user, starcoins_delta)
+
+            jack_game = jack_games.get(int(state["lj_game_id"]))
+            if jack_game:
+                self._apply_game(jack_game, state, "lj")
+                jack_game.total_clicks += int(state["lj_clicks_delta"])
+                self._apply_grid(jack_game, state)
+                if user:
+                    rating.incr("make_clicks", user.user_id, int(state["lj_clicks_delta"]))
+
+            geo_hunter = geo_hunters.get(int(state["geo_game_id"]))
+            if geo_hunter:
+                self._apply_game(geo_hunter, state, "geo")
+                geo_hunter.total_true += int(state["geo_true_delta"])
+                geo_hunter.total_false += int(state["geo_false_delta"])
+                if user:
+                    rating.incr("guess_country", user.user_id, int(state["geo_true_delta"]))
+
+        game_fields = [
+            "current_energy",
+            "max_energy",
+            "_last_energy_update",
+            "_total_currency",
+            "updated_at",
+        ]
+        Users.objects.bulk_update(users.values(), ["_starcoins", "all_starcoins"])
+        Lumberjack_Game.objects.bulk_update(
+            jack_games.values(), game_fields + ["total_clicks", "grid_mask", "grid_revealed"]
+        )
+        GeoHunter.objects.bulk_update(
+            geo_hunters.values(), game_fields + ["total_true", "total_false"]
+        )
+
+    def drop(self, user_pks: Iterable[int]) -> None:
+        """
+        Удаляем состояние без записи в Postgres (тестовые игроки)
+        """
+        pipe = RedisManager().get_redis().pipeline(transaction=False)
+        for user_pk in user_pks:
+            pipe.delete(self._key(user_pk))
+            pipe.srem(self.DIRTY_KEY, user_pk)
+        pipe.execute()
+
+    def flush(
+        self,
+        user_pks: Optional[Iterable[int]] = None,
+        batch_size: int = FLUSH_BATCH_SIZE,
+    ) -> int:
+        """
+        Записываем накопленные изменения в Postgres пачкой
+
+        user_pks - синхронно сбросить конкретных пользователей
+        (перед списанием средств и т.п.)
+
+        NOTE пользователь сбрасывается под блокировкой: синхронный сброс
+        ждет, пока флашер допишет уже забранные у него дельты в Postgres,
+        не дождавшись за FLUSH_LOCK_WAIT - FlushLockTimeoutException
+        """
+        redis_client = RedisManager().get_redis()
+        token = uuid.uuid4().hex
+
+        if user_pks is None:
+            members = [
+                int(member)
+                for member in redis_client.spop(self.DIRTY_KEY, batch_size) or []
+            ]
+            user_pks = self._lock(members, token)
+            # NOTE занятых синхронным сбросом возвращаем в dirty -
+            # их новые дельты заберет следующий проход
+            busy = set(members) - set(user_pks)
+            if busy:
+                redis_client.sadd(self.DIRTY_KEY, *busy)
+            removed = set(user_pks)
+        else:
+            user_pks = [int(user_pk) for user_pk in user_pks]
+            deadline = time.monotonic() + FLUSH_LOCK_WAIT
+            locked = self._lock(user_pks, token)
+            while len(locked) < len(user_pks) and time.monotonic() < deadline:
+                time.sleep(0.05)
+                locked += self._lock(
+                    [user_pk for user_pk in user_pks if user_pk not in locked], token
+                )
+            if len(locked) < len(user_pks):
+                # NOTE без блокировки списание увидело бы баланс без
+                # дельт, которые флашер еще пишет - отказываем, клиент повторит
+                self._unlock(locked, token)
+                logger.warning(f"Game state flush lock timeout: {user_pks}")
+                raise FlushLockTimeoutException(user_pks)
+
+            pipe = redis_client.pipeline(transaction=False)
+            for user_pk in user_pks:
+                pipe.srem(self.DIRTY_KEY, user_pk)
+            removed = {
+                user_pk for user_pk, hit in zip(user_pks, pipe.execute()) if hit
+            }
+
+        if not user_pks:
+            return 0
+
+        try:
+            # NOTE снимок забираем всегда: пользователя мог вынуть из
+            # dirty флашер - пишем, если остались дельты
+            snapshots = {
+                user_pk: state
+                for user_pk, state in self._claim(user_pks).items()
+                if user_pk in removed
+                or any(float(state.get(field, 0)) for field in DELTA_FIELDS)
+            }
+            if not snapshots:
+                return 0
+
+            try:
+                self._persist(snapshots)
+            except Exception as ex:
+                logger.error(f"Game state flush error: {ex}")
+                self._rollback(snapshots)
+                raise
+
+            return len(snapshots)
+        finally:
+            self._unlock(user_pks, token)
+
+    def _lock(self, user_pks: List[int], token: str) -> List[int]:
+        """Блокировки сброса, возвращает заблокированных"""
+        pipe = RedisManager().get_redis().pipeline(transaction=False)
+        for user_pk in user_pks:
+            pipe.set(
+                self.FLUSH_LOCK_KEY.format(user_pk=user_pk),
+                token,
+                nx=True,
+                ex=FLUSH_LOCK_TTL,
+            )
+        return [user_pk for user_pk, ok in zip(user_pks, pipe.execute()) if ok]
+
+    def _unlock(self, user_pks: List[int], token: str) -> None:
+        script = self._script("unlock", UNLOCK_SCRIPT)
+        pipe = RedisManager().get_redis().pipeline(transaction=False)
+        for user_pk in user_pks:
+            script(
+                keys=[self.FLUSH_LOCK_KEY.format(user_pk=user_pk)],
+                args=[token],
+                client=pipe,
+            )
+        pipe.execute()
@@ -0,0 +1,56 @@
+"""Поле кликера 4x5: битовая маска звезд + открытые доходы"""
+
+import random
+from typing import Any, List, Tuple
+
+GRID_ROWS = 4
+GRID_COLS = 5
+GRID_CELLS = GRID_ROWS * GRID_COLS
+MIN_STARS = 2
+MAX_STARS = 5
+
+
+def cell_index(row: int, col: int) -> int:
+    """
+    Номер ячейки (бит маски), для координат вне поля - GRID_CELLS
+    (такого бита нет, клик будет промахом)
+    """
+    if 0 <= row < GRID_ROWS and 0 <= col < GRID_COLS:
+        return row * GRID_COLS + col
+    return GRID_CELLS
+
+
+def generate_mask() -> int:
+    """
+    Новое поле с фиксированным количеством звезд (от 2 до 5)
+    """
+    mask = 0
+    for cell in random.sample(range(GRID_CELLS), random.randint(MIN_STARS, MAX_STARS)):
+        mask |= 1 << cell
+    return mask
+
+
+def is_valid_mask(mask) -> bool:
+    return (
+        isinstance(mask, int)
+        and not isinstance(mask, bool)
+        and 0 <= mask < 1 << GRID_CELLS
+        and MIN_STARS <= mask.bit_count() <= MAX_STARS
+    )
+
+
+def from_matrix(matrix: List[List[Any]]) -> Tuple[int, List[List[Any]]]:
+    """
+    Старое поле (матрица 4x5: 1 - звезда, строка - открытый доход)
+    в маску звезд и открытые ячейки
+    """
+    mask = 0
+    revealed = []
+    for row, cells in enumerate(matrix[:GRID_ROWS]):
+        for col, value in enumerate(cells[:GRID_COLS]):
+            cell = cell_index(row, col)
+            if isinstance(value, str):
+                revealed.append([cell, value])
+            elif value == 1:
+                mask |= 1 << cell
+    return mask, revealed
@@ -0,0 +1,88 @@
+"""Ленивое начисление пассивного дохода"""
+
+from typing import TYPE_CHECKING
+
+from django.db import connection
+
+from bot.schemas import boosts_data
+
+from .rating import RatingService
+
+if TYPE_CHECKING:
+    from bot.models import Users
+
+
+# NOTE один запрос: сдвигаем last_passive_claim на полные часы
+# и зачисляем доход за них (data-modifying CTE)
+SETTLE_SQL = """
+WITH rates (level, per_hour) AS (VALUES {rates}),
+due AS (
+    SELECT
+        sb.id,
+        floor(extract(epoch FROM now() - sb.last_passive_claim) / 3600)::int AS hours,
+        rates.per_hour
+    FROM sigma_boosts AS sb
+    JOIN rates ON rates.level = LEAST(sb.passive_income_level, %s)
+    WHERE sb.user_id = %s
+        AND sb.passive_income_level > 0
+        AND sb.last_passive_claim <= now() - interval '1 hour'
+    FOR UPDATE OF sb
+),
+claim AS (
+    UPDATE sigma_boosts AS sb
+    SET last_passive_claim = sb.last_passive_claim + make_interval(hours => due.hours)
+    FROM due
+    WHERE sb.id = due.id
+    RETURNING sb.user_id, due.hours * due.per_hour AS income
+)
+UPDATE users AS u
+SET _starcoins = round((u._starcoins + claim.income)::numeric, 4)::float,
+    all_starcoins = u.all_starcoins + claim.income
+FROM claim
+WHERE u.id = claim.user_id AND claim.income > 0
+RETURNING claim.income, u._starcoins, u.all_starcoins
+"""
+
+
+class PassiveIncomeService:
+    """
+    Пассивный доход не начисляется отдельным запросом бота,
+    а досчитывается при чтении пользователя (UserMethods.get)
+    от passive_income_level и last_passive_claim
+    """
+
+    _sql = None
+
+    @classmethod
+    def _settle_sql(cls) -> str:
+        if cls._sql is None:
+            levels = boosts_data.passive_income_level
+            rates = ", ".join(
+                f"({level}, {float(levels.value_by_level(level))})"
+                for level in range(levels.max_level() + 1)
+            )
+            cls._sql = SETTLE_SQL.format(rates=rates)
+        return cls._sql
+
+    def settle(self, user: "Users") -> float:
+        """
+        Зачисляем накопившийся за полные часы доход,
+        возвращаем сколько начислено
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(
+                self._settle_sql(),
+                [boosts_data.passive_income_level.max_level(), user.pk],
+            )
+            row = cursor.fetchone()
+
+        if not row:
+            return 0
+
+        income, starcoins, all_starcoins = row
+        # NOTE повышение ранга заметит RangService.process_rang_ups
+        user._starcoins = starcoins
+        user.all_starcoins = all_starcoins
+        RatingService().starcoins_added(user, income)
+
+        return income
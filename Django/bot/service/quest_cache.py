@@ -0,0 +1,71 @@
+"""Кэш списка доступных квестов пользователя"""
+
+import json
+from datetime import timedelta
+from typing import Any, List, Optional
+
+from django.db import transaction
+from django.utils import timezone
+from loguru import logger
+from Redis.main import RedisManager
+from rest_framework.utils.encoders import JSONEncoder
+
+from .catalog_cache import CatalogCache
+
+ACTIVE_QUESTS_TTL = 300  # сек.
+
+
+class ActiveQuestsCache:
+    """
+    Готовый ответ QuestMethods.active в хэше quests:active:{user_pk},
+    поле - роль, уровень ранга и версия каталога квестов (CatalogCache).
+    Живет до конца суток (UTC) - daily квесты открываются заново -
+    и не дольше ACTIVE_QUESTS_TTL.
+    Сбрасывается при выполнении квеста и отправке на модерацию
+    """
+    KEY = "quests:active:{user_pk}"
+
+    def field(self, user: "Users", rang: "Rangs") -> Optional[str]:  # type: ignore
+        """Поле хэша, None - Redis недоступен (без кэша)"""
+        try:
+            version = CatalogCache().version("quests")
+        except Exception as e: # Redis
+            logger.error(f"Active quests cache not read {user.pk}: {e}")
+            return None
+        return f"{user._role}:{rang.level}:{version}"
+
+    def get(self, user: "Users", field: str) -> Optional[List[Any]]:  # type: ignore
+        try:
+            data = RedisManager().get_redis().hget(
+                self.KEY.format(user_pk=user.pk), field
+            )
+        except Exception as e: # Redis
+            logger.error(f"Active quests cache not read {user.pk}: {e}")
+            return None
+        return json.loads(data) if data else None
+
+    def set(self, user: "Users", field: str, data: List[Any]) -> None:  # type: ignore
+        now = timezone.now()
+        midnight = (now + timedelta(days=1)).replace(
+            hour=0, minute=0, second=0, microsecond=0
+        )
+        ttl = min(ACTIVE_QUESTS_TTL, int((midnight - now).total_seconds()) + 1)
+
+        key = self.KEY.format(user_pk=user.pk)
+        try:
+            pipe = RedisManager().get_redis().pipeline()
+            pipe.hset(key, field, json.dumps(data, cls=JSONEncoder))
+            pipe.expire(key, ttl)
+            pipe.execute()
+        except Exception as e: # Redis
+            logger.error(f"Active quests cache not written {user.pk}: {e}")
+
+    def invalidate(self, user_pk: int) -> None:
+        """Сброс после коммита (выполнение, модерация, откат квеста)"""
+        def apply() -> None:
+            try:
+                RedisManager().get_redis().delete(self.KEY.format(user_pk=user_pk))
+            except Exception as e: # Redis
+                logger.error(f"Active quests cache not invalidated {user_pk}: {e}")
+
+        transaction.on_commit(apply)
@@ -5,40 +5,92 @@ from django.db.models import Q
 from loguru import logger
 from Redis.main import RedisManager
 
+from .rang_cache import RangLadderCache
+
+RANG_BATCH_SIZE = 500
+
 
 class RangService:
 
     def get_user_rang(self, user: "Users") -> Optional["Rangs"]:  # type: ignore
         """Получить текущий ранг пользователя"""
-        from bot.models import Rangs
+        # NOTE без запроса в БД: лестница рангов в памяти процесса, поиск bisect
+        return RangLadderCache().get(user._role, user.all_starcoins)
+
+    def process_rang_ups(self, batch_size: int = RANG_BATCH_SIZE) -> int:
+        """
+        Фоновая проверка повышений ранга: сравниваем all_starcoins
+        с порогами лестницы и уведомленным уровнем (RangProgress).
+        Возвращает сколько пользователей обработано
+        """
+        from bot.models import RangProgress, Users, roles
+
+        ladder = RangLadderCache()
 
-        try:
-            return (
-                Rangs.objects.filter(  # type: ignore
-                    Q(_role=user._role) | Q(_role__isnull=True),
-                    all_starcoins__lte=user.all_starcoins,
+        # NOTE новые пользователи - запоминаем текущий уровень без уведомления
+        new_users = list(
+            Users.objects.filter(rang_progress__isnull=True).only(
+                "pk", "_role", "all_starcoins"
+            )[:batch_size]
+        )
+        RangProgress.objects.bulk_create(
+            [
+                RangProgress(user=user, level=rang.level if rang else 0)
+                for user in new_users
+                for rang in [ladder.get(user._role, user.all_starcoins)]
+            ],
+            ignore_conflicts=True,
+        )
+
+        # NOTE пересекли порог выше уведомленного уровня
+        # (None - пользователи без роли: Q(_role=None) это IS NULL)
+        crossed = Q()
+        for role in {*roles, None}:
+            for threshold, level in ladder.rises(role):
+                crossed |= Q(
+                    _role=role,
+                    all_starcoins__gte=threshold,
+                    rang_progress__level__lt=level,
                 )
-                .order_by("-level")
-                .first()
-            )
-        except Rangs.DoesNotExist:  # type: ignore
-            return None
+        if not crossed:
+            return len(new_users)
+
+        users = list(
+            Users.objects.filter(crossed)
+            .select_related("rang_progress")
+            .only("pk", "user_id", "_role", "all_starcoins", "rang_progress__level")[
+                :batch_size
+            ]
+        )
+        for user in users:
+            new_rang = ladder.get(user._role, user.all_starcoins)
+            old_level = user.rang_progress.level
+            # NOTE сначала фиксируем уровень - уведомление уходит не больше раза
+            if RangProgress.objects.filter(
+                pk=user.rang_progress.pk, level=old_level
+            ).update(level=new_rang.level):
+                try:
+                    user.send_rang_notification(old_level, new_rang)
+                except Exception as e: # Redis
+                    logger.error(f"Rang notification not sent {user.user_id}: {e}")
+
+        return len(new_users) + len(users)
 
     def send_rang_notification(
         self,
         user: "Users",  # type: ignore
-        current_rang: "Rangs",  # type: ignore
-        previous_rang: "Rangs",  # type: ignore
+        old_level: int,
+        new_rang: "Rangs",  # type: ignore
         new_quests: bool,
     ):
         """Отправить уведомление о новом ранге через Redis"""
         redis_client = RedisManager().get_redis()
         notification_data = {
             "user_id": user.user_id,
-            "new_rang_level": previous_rang.level,
-            "new_rang_name": previous_rang.name,
-            "new_rang_emoji": previous_rang.emoji,
-            "old_level": current_rang.level,
+            "new_rang_level": new_rang.level,
+            "new_rang_name": new_rang.name,
+            "new_rang_emoji": new_rang.emoji,
+            "old_level": old_level,
             "all_starcoins": user.all_starcoins,
             "new_quests": new_quests,
         }
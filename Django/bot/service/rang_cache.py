@@ -0,0 +1,128 @@
+import threading
+import time
+from bisect import bisect_right
+from typing import Dict, List, Optional, Tuple
+
+from loguru import logger
+from Redis.main import RedisManager
+
+RANG_LADDER_CHANNEL = "rang_ladder_updates"
+
+
+class RangLadderCache:
+    """
+    Лестница рангов в памяти процесса: по каждой роли отсортированные
+    пороги all_starcoins и лучший ранг на каждом пороге.
+    Ранги меняются раз в сезон через админку - кэш сбрасывается
+    во всех процессах через Redis pub/sub
+    """
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance._lock = threading.Lock()
+            cls._instance._rangs = None
+            cls._instance._ladders = {}
+            cls._instance._listener = None
+        return cls._instance
+
+    def get(self, role: Optional[str], all_starcoins: float) -> Optional["Rangs"]:  # type: ignore
+        """
+        Ранг с наибольшим уровнем среди доступных роли
+        (свои и общие) с порогом не выше all_starcoins
+        """
+        thresholds, best = self._ladder(role)
+        index = bisect_right(thresholds, all_starcoins) - 1
+        return best[index] if index >= 0 else None
+
+    def rises(self, role: Optional[str]) -> List[Tuple[float, int]]:
+        """
+        Пороги, на которых уровень роли растет: (all_starcoins, уровень)
+        """
+        thresholds, best = self._ladder(role)
+        return [
+            (threshold, rang.level)
+            for i, (threshold, rang) in enumerate(zip(thresholds, best))
+            if i == 0 or rang is not best[i - 1]
+        ]
+
+    def _ladder(self, role: Optional[str]) -> Tuple[List[float], List["Rangs"]]:  # type: ignore
+        self._ensure_listener()
+
+        ladder = self._ladders.get(role)
+        if ladder is not None:
+            return ladder
+
+        with self._lock:
+            rangs = self._rangs
+            if rangs is None:
+                rangs = self._rangs = self._load()
+            ladder = self._build(rangs, role)
+            # NOTE если кэш сбросили во время сборки - не сохраняем устаревшее
+            if self._rangs is rangs:
+                self._ladders[role] = ladder
+            return ladder
+
+    @staticmethod
+    def _load() -> List["Rangs"]:  # type: ignore
+        from bot.models import Rangs
+
+        return list(Rangs.objects.order_by("all_starcoins", "level"))
+
+    @staticmethod
+    def _build(
+        rangs: List["Rangs"], role: Optional[str]  # type: ignore
+    ) -> Tuple[List[float], List["Rangs"]]:  # type: ignore
+        thresholds, best = [], []
+        for rang in rangs:
+            if rang._role not in (role, None):
+                continue
+            thresholds.append(rang.all_starcoins)
+            # NOTE на каждом пороге - максимальный уровень из всех пройденных
+            best.append(rang if not best or rang.level > best[-1].level else best[-1])
+        return thresholds, best
+
+    def invalidate(self) -> None:
+        """Сбросить кэш текущего процесса"""
+        with self._lock:
+            self._rangs = None
+            self._ladders = {}
+
+    @classmethod
+    def publish_invalidation(cls) -> None:
+        """Сбросить кэш во всех процессах"""
+        cls().invalidate()
+        try:
+            RedisManager().get_redis().publish(RANG_LADDER_CHANNEL, "invalidate")
+        except Exception as e: # Redis
+            logger.error(f"Rang ladder invalidation not published: {e}")
+
+    def _ensure_listener(self) -> None:
+        if self._listener is not None:
+            return
+        with self._lock:
+            if self._listener is None:
+                self._listener = threading.Thread(
+                    target=self._listen, name="rang-ladder-listener", daemon=True
+                )
+                self._listener.start()
+
+    def _listen(self) -> None:
+        while True:
+            try:
+                pubsub = RedisManager().get_redis().pubsub(
+                    ignore_subscribe_messages=True
+                )
+                pubsub.subscribe(RANG_LADDER_CHANNEL)
+                # NOTE пока не подписаны, сообщения могли потеряться
+                self.invalidate()
+                while True:
+                    # NOTE не listen(): у клиента socket_timeout, ждем порциями
+                    message = pubsub.get_message(timeout=1.0)
+                    if message and message["type"] == "message":
+                        self.invalidate()
+            except Exception as e: # Redis
+                logger.error(f"Rang ladder listener error: {e}")
+                self.invalidate()
+                time.sleep(3)
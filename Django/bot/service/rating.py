@@ -0,0 +1,425 @@
+"""Рейтинги в Redis ZSET: обновляются при записи, читаются за O(log N)"""
+
+import time
+import uuid
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from django.db import transaction
+from django.db.models import Count, Max, Q, Sum
+from loguru import logger
+from Redis.main import RedisManager
+
+# NOTE категория -> знаков после запятой в значении (None - целые)
+CATEGORIES: Dict[str, Optional[int]] = {
+    "daily_login": None,
+    "collect_starcoins": 2,
+    "guess_country": None,
+    "make_clicks": None,
+    "completed_quests": None,
+    "invited_friends": None,
+}
+
+TOP_SIZE = 3
+REBUILD_CHUNK = 5000
+REBUILD_LOCK_TTL = 300  # сек.
+REBUILD_WAIT = 10  # сек.
+
+# KEYS: рейтинг, метка построения, блокировка пересборки, журнал пересборки
+# ARGV: операция, участник, значение, TTL журнала
+# NOTE во время пересборки изменения дописываем в журнал - пересборка
+# применит их к новому рейтингу перед подменой.
+# Пока рейтинг не построен из Postgres, в него самого изменения не пишем -
+# иначе в нем окажутся только недавно активные игроки
+UPDATE_SCRIPT = """
+if redis.call('EXISTS', KEYS[3]) == 1 then
+    redis.call('RPUSH', KEYS[4], ARGV[1], ARGV[2], ARGV[3])
+    redis.call('EXPIRE', KEYS[4], ARGV[4])
+end
+if redis.call('EXISTS', KEYS[2]) == 0 then
+    return nil
+end
+if ARGV[1] == 'incr' then
+    return redis.call('ZINCRBY', KEYS[1], ARGV[3], ARGV[2])
+elseif ARGV[1] == 'set' then
+    return redis.call('ZADD', KEYS[1], ARGV[3], ARGV[2])
+end
+return redis.call('ZREM', KEYS[1], ARGV[2])
+"""
+
+# KEYS: временный ключ, рейтинг, метка построения, журнал, блокировка
+# ARGV: токен пересборки
+# NOTE журнал применяем и подменяем рейтинг атомарно: изменения,
+# пришедшие после, пишутся уже в новый рейтинг. -1 - блокировка потеряна
+SWAP_SCRIPT = """
+if redis.call('GET', KEYS[5]) ~= ARGV[1] then
+    return -1
+end
+local ops = redis.call('LRANGE', KEYS[4], 0, -1)
+for i = 1, #ops, 3 do
+    if ops[i] == 'incr' then
+        redis.call('ZINCRBY', KEYS[1], ops[i + 2], ops[i + 1])
+    elseif ops[i] == 'set' then
+        redis.call('ZADD', KEYS[1], ops[i + 2], ops[i + 1])
+    else
+        redis.call('ZREM', KEYS[1], ops[i + 1])
+    end
+end
+redis.call('DEL', KEYS[4])
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    redis.call('RENAME', KEYS[1], KEYS[2])
+    redis.call('PERSIST', KEYS[2])
+else
+    redis.call('DEL', KEYS[2])
+end
+redis.call('SET', KEYS[3], 1)
+return #ops / 3
+"""
+
+# NOTE снимаем блокировку пересборки, только если она наша
+UNLOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+class RatingService:
+    """
+    Рейтинги по категориям (CATEGORIES) в ZSET rating:{category},
+    участник - Telegram ID, счет - значение показателя.
+    Изменения приходят с пути записи (после коммита транзакции),
+    при отсутствии рейтинг строится из Postgres (rebuild, команда rebuild_ratings)
+    """
+    KEY = "rating:{category}"
+    BUILT_KEY = "rating:{category}:built"
+    LOCK_KEY = "rating:{category}:rebuild_lock"
+    JOURNAL_KEY = "rating:{category}:rebuild_journal"
+
+    _scripts: Dict[str, Any] = {}
+    _dont_go: Dict[str, int] = {}
+
+    def _script(self, name: str = "update", source: str = UPDATE_SCRIPT) -> Any:
+        if name not in self._scripts:
+            self._scripts[name] = RedisManager().get_redis().register_script(source)
+        return self._scripts[name]
+
+    def _keys(self, category: str) -> List[str]:
+        return [
+            self.KEY.format(category=category),
+            self.BUILT_KEY.format(category=category),
+            self.LOCK_KEY.format(category=category),
+            self.JOURNAL_KEY.format(category=category),
+        ]
+
+    def incr(self, category: str, user_id: int, amount: float) -> None:
+        """ZINCRBY после коммита"""
+        if amount:
+            self._update(category, "incr", user_id, amount)
+
+    def set(self, category: str, user_id: int, value: float) -> None:
+        """ZADD после коммита"""
+        self._update(category, "set", user_id, value)
+
+    def remove(self, category: str, user_id: int) -> None:
+        """ZREM после коммита"""
+        self._update(category, "rem", user_id, 0)
+
+    def _update(self, category: str, op: str, user_id: int, value: float) -> None:
+        transaction.on_commit(lambda: self._apply(category, op, user_id, value))
+
+    def _apply(self, category: str, op: str, user_id: int, value: float) -> None:
+        try:
+            self._script()(
+                keys=self._keys(category),
+                args=[op, user_id, value, REBUILD_LOCK_TTL],
+            )
+        except Exception as e: # Redis
+            logger.error(f"Rating {category} not updated {user_id}: {e}")
+
+    def remove_users(self, user_ids: Iterable[int]) -> None:
+        """Убрать пользователей из всех рейтингов (тестовые игроки)"""
+        user_ids = list(user_ids)
+        if not user_ids:
+            return
+        pipe = RedisManager().get_redis().pipeline(transaction=False)
+        for category in CATEGORIES:
+            pipe.zrem(self.KEY.format(category=category), *user_ids)
+        pipe.execute()
+
+    def user_saved(
+        self,
+        user: "Users",  # type: ignore
+        adding: bool,
+        update_fields: Optional[Iterable[str]] = None,
+    ) -> None:
+        """
+        Переносим в рейтинги то, что записало сохранение (без update_fields -
+        все поля): all_starcoins и засчитанное приглашение (авторизованный реферал)
+        """
+        fields = set(update_fields) if update_fields is not None else None
+        if fields is None or "all_starcoins" in fields:
+            self.set("collect_starcoins", user.user_id, user.all_starcoins)
+
+        if (
+            user.referral_user_id
+            and (user.authorised or not adding)
+            and (fields is None or fields & {"authorised", "referral_user_id"})
+        ):
+            self._recount_invited(user.referral_user_id)
+
+    def _recount_invited(self, referer_id: int) -> None:
+        """Приглашения пересчитываем после коммита (подсчет по индексу)"""
+        def apply() -> None:
+            from bot.models import Users
+
+            try:
+                count = Users.objects.filter(
+                    referral_user_id=referer_id, authorised=True
+                ).count()
+            except Exception as e: # DB
+                logger.error(f"Rating invited_friends not updated {referer_id}: {e}")
+                return
+            self._apply("invited_friends", "set", referer_id, count)
+
+        transaction.on_commit(apply)
+
+    def starcoins_added(self, user: "Users", amount: float) -> None:  # type: ignore
+        """
+        all_starcoins изменились мимо save() (UPDATE ... RETURNING, bulk_update)
+        """
+        self.incr("collect_starcoins", user.user_id, amount)
+
+    def use_quest_changed(self, user_pk: int) -> None:
+        """
+        Квест выполнен, сброшен или удален. «Не ухАди» - серия входов
+        (daily_login), остальные квесты - сумма выполнений (completed_quests).
+        Оба значения пересчитываем после коммита одним запросом
+        """
+        def apply() -> None:
+            try:
+                totals = self._quest_totals(user_pk)
+            except Exception as e: # DB
+                logger.error(f"Quest ratings not updated {user_pk}: {e}")
+                return
+            if not totals:
+                return
+
+            user_id = totals["user_id"]
+            self._apply("completed_quests", "set", user_id, totals["completed"] or 0)
+            if totals.get("login") is None:
+                self._apply("daily_login", "rem", user_id, 0)
+            else:
+                self._apply("daily_login", "set", user_id, totals["login"])
+
+        transaction.on_commit(apply)
+
+    def _quest_totals(self, user_pk: int) -> Optional[Dict[str, Any]]:
+        from bot.models import Users
+
+        dont_go_id = self._dont_go_id()
+        totals = {"completed": Sum("user_quests__count_use")}
+        if dont_go_id:
+            dont_go = Q(user_quests__quest_id=dont_go_id)
+            totals = {
+                "completed": Sum("user_quests__count_use", filter=~dont_go),
+                "login": Max("user_quests__count_use", filter=dont_go),
+            }
+        return (
+            Users.objects.filter(pk=user_pk)
+            .annotate(**totals)
+            .values("user_id", *totals)
+            .first()
+        )
+
+    def _dont_go_id(self) -> Optional[int]:
+        """
+        ID квеста «Не ухАди» (кэш процесса)
+
+        NOTE пока квеста нет, не кэшируем - его могут завести в админке
+        """
+        if "id" not in self._dont_go:
+            from bot.models import DailyQuests, Quests
+
+            daily = DailyQuests.objects.filter(title="Не ухАди").first()
+            quest = (
+                Quests.objects.filter(object_id=daily.id, type_quest="daily").first()
+                if daily
+                else None
+            )
+            if not quest:
+                return None
+            self._dont_go["id"] = quest.pk
+        return self._dont_go["id"]
+
+    def board(self, category: str, user_id: int) -> List[Dict[str, Any]]:
+        """
+        Топ TOP_SIZE и место пользователя: для пользователя вне топа -
+        ближайшее место выше и сколько до него не хватает
+        """
+        redis_client = RedisManager().get_redis()
+        key, built_key = self._keys(category)[:2]
+        if not redis_client.exists(built_key):
+            self._ensure_built(category)
+
+        pipe = redis_client.pipeline(transaction=False)
+        pipe.zrevrange(key, 0, TOP_SIZE - 1, withscores=True)
+        pipe.zscore(key, user_id)
+        pipe.zrevrank(key, user_id)
+        pipe.zcard(key)
+        top, score, rank, size = pipe.execute()
+
+        rows: List[Tuple[int, int, float]] = [
+            (place, int(member), value)
+            for place, (member, value) in enumerate(top, start=1)
+        ]
+        my_place = next(
+            (place for place, member, _ in rows if member == user_id), None
+        )
+        if my_place is None:
+            score = score or 0
+            my_place = rank + 1 if rank is not None else size + 1
+            rows.append((my_place, user_id, score))
+
+        next_place = difference = None
+        if my_place > TOP_SIZE:
+            above = redis_client.zrangebyscore(
+                key, f"({score}", "+inf", start=0, num=1, withscores=True
+            )
+            # NOTE при равенстве со всеми выше - место перед пользователем
+            next_score = above[0][1] if above else score
+            next_place = (
+                redis_client.zcount(key, next_score, "+inf") if above else my_place - 1
+            )
+            difference = self._value(category, next_score - score)
+
+        nicknames = self._nicknames([member for _, member, _ in rows])
+        result = []
+        for row_place, member, value in rows:
+            row = {
+                "place": row_place,
+                "nickname": nicknames.get(member, ""),
+                "value": self._value(category, value),
+                "my": member == user_id,
+                "top": row_place <= TOP_SIZE,
+            }
+            if member == user_id and row_place > TOP_SIZE:
+                row["next_place"] = next_place
+                row["difference"] = difference
+            result.append(row)
+        return result
+
+    @staticmethod
+    def _value(category: str, value: float) -> Any:
+        digits = CATEGORIES[category]
+        return int(value) if digits is None else round(value, digits)
+
+    @staticmethod
+    def _nicknames(user_ids: List[int]) -> Dict[int, str]:
+        """Псевдоним или фамилия и имя - одним запросом на весь топ"""
+        from bot.models import Users
+
+        users = Users.objects.filter(user_id__in=user_ids).only(
+            "user_id", "_nickname", "supername", "name"
+        )
+        return {
+            user.user_id: (
+                user.nickname if user._nickname else f"{user.supername} {user.name}"
+            )
+            for user in users
+        }
+
+    def _ensure_built(self, category: str) -> None:
+        """
+        Рейтинг еще не построен (первое чтение): строим сами или,
+        если уже строит другой процесс, ждем не дольше REBUILD_WAIT
+        """
+        if self.rebuild([category])[category] is not None:
+            return
+
+        redis_client = RedisManager().get_redis()
+        built_key = self.BUILT_KEY.format(category=category)
+        deadline = time.monotonic() + REBUILD_WAIT
+        while not redis_client.exists(built_key) and time.monotonic() < deadline:
+            time.sleep(0.1)
+
+    def rebuild(
+        self, categories: Optional[Iterable[str]] = None
+    ) -> Dict[str, Optional[int]]:
+        """
+        Пересобираем рейтинги из Postgres во временный ключ и подменяем
+        (RENAME атомарен - читатели видят старый или новый рейтинг целиком).
+        Пересборка категории - под блокировкой, None - уже идет в другом процессе
+
+        NOTE изменения, пришедшие во время пересборки, копятся в журнале
+        (UPDATE_SCRIPT) и применяются к новому рейтингу при подмене
+        """
+        redis_client = RedisManager().get_redis()
+        result = {}
+        for category in categories or CATEGORIES:
+            key, built_key, lock_key, journal_key = self._keys(category)
+            token = uuid.uuid4().hex
+            if not redis_client.set(lock_key, token, nx=True, ex=REBUILD_LOCK_TTL):
+                result[category] = None
+                continue
+
+            # NOTE свой временный ключ на каждую пересборку
+            tmp_key = f"{key}:rebuild:{token}"
+            try:
+                # NOTE журнал прошлой (упавшей) пересборки и изменения,
+                # закоммиченные до чтения из Postgres, уже не нужны
+                redis_client.delete(journal_key)
+                scores = self._load(category)
+                for start in range(0, len(scores), REBUILD_CHUNK):
+                    pipe = redis_client.pipeline(transaction=False)
+                    pipe.zadd(tmp_key, dict(scores[start : start + REBUILD_CHUNK]))
+                    pipe.expire(tmp_key, REBUILD_LOCK_TTL)
+                    pipe.execute()
+
+                replayed = self._script("swap", SWAP_SCRIPT)(
+                    keys=[tmp_key, key, built_key, journal_key, lock_key],
+                    args=[token],
+                )
+                if replayed == -1:
+                    logger.warning(f"Rating {category} rebuild lock lost")
+                    result[category] = None
+                else:
+                    result[category] = len(scores)
+            finally:
+                redis_client.delete(tmp_key)
+                self._script("unlock", UNLOCK_SCRIPT)(keys=[lock_key], args=[token])
+        return result
+
+    def _load(self, category: str) -> List[Tuple[int, float]]:
+        from bot.models import GeoHunter, Lumberjack_Game, UseQuests, Users
+
+        if category == "daily_login":
+            rows = UseQuests.objects.filter(quest_id=self._dont_go_id()).values_list(
+                "user__user_id", "count_use"
+            )
+        elif category == "collect_starcoins":
+            rows = Users.objects.values_list("user_id", "all_starcoins")
+        elif category == "guess_country":
+            rows = GeoHunter.objects.values_list("user__user_id", "total_true")
+        elif category == "make_clicks":
+            rows = Lumberjack_Game.objects.values_list("user__user_id", "total_clicks")
+        elif category == "completed_quests":
+            rows = (
+                UseQuests.objects.exclude(quest_id=self._dont_go_id())
+                .order_by()
+                .values("user__user_id")
+                .annotate(total=Sum("count_use"))
+                .values_list("user__user_id", "total")
+            )
+        elif category == "invited_friends":
+            rows = (
+                Users.objects.filter(referral_user_id__isnull=False, authorised=True)
+                .order_by()
+                .values("referral_user_id")
+                .annotate(total=Count("pk"))
+                .values_list("referral_user_id", "total")
+            )
+        else:
+            raise ValueError(f"Unknown rating category: {category}")
+
+        return [(user_id, value or 0) for user_id, value in rows.iterator()]
@@ -1,4 +1,40 @@
-from django.db.models.signals import post_save
-from django.dispatch import receiver
+from django.db.models.signals import post_delete, post_save
 
-# from bot.models import Purchases, Users, Sigma_Boosts, Lumberjack_Game
+from bot.models import (
+    AddStarcoinsBonus,
+    Bonuses,
+    ClickScaleBonus,
+    DailyQuests,
+    EnergyRenewalBonus,
+    IdeaQuests,
+    Pikmi_Shop,
+    Quests,
+    Rangs,
+    SubscribeQuest,
+)
+from bot.service.catalog_cache import CatalogCache
+
+# NOTE модель -> каталог (CatalogCache), версия которого меняется при записи
+CATALOG_MODELS = {
+    Quests: "quests",
+    SubscribeQuest: "quests",
+    IdeaQuests: "quests",
+    DailyQuests: "quests",
+    Pikmi_Shop: "pikmi_shop",
+    Rangs: "rangs",
+    Bonuses: "bonuses",
+    AddStarcoinsBonus: "bonuses",
+    ClickScaleBonus: "bonuses",
+    EnergyRenewalBonus: "bonuses",
+}
+
+
+def bump_catalog_version(sender, **kwargs):
+    CatalogCache().bump(CATALOG_MODELS[sender])
+
+
+# NOTE подписываемся только на модели каталогов: общий обработчик
+# отключил бы быстрое каскадное удаление у всех моделей
+for model in CATALOG_MODELS:
+    post_save.connect(bump_catalog_version, sender=model)
+    post_delete.connect(bump_catalog_version, sender=model)
@@ -22,13 +22,15 @@ __all__ = [
     "RatingViewSet",
 ]
 
-from collections import defaultdict
 from datetime import datetime
-from typing import Any, Callable, Dict, List, Optional
 
 import pytz
+from bot.service.catalog_cache import CatalogCache
+from bot.service.economy import EconomyService
 from bot.service.exceptions import DuplicateOperationException
+from bot.service.game_state import GameStateService
 from bot.service.rang import RangService
+from bot.service.rating import RatingService
 from bot.views.analytics import AggregateArchive
 from loguru import logger
 from rest_framework import status
@@ -51,6 +53,7 @@ from .backup import CopyBaseMethods
 from .bonus import BonusesMethods, UseBonusesMethods
 from .codes import CodesMethods
 from .game import (
+    PENDING_ENERGY_LIMIT,
     GeoHunterViewMethods,
     InteractiveGameMethods,
     LumberjackGameViewMethods,
@@ -125,9 +128,8 @@ class SigmaBoostsViewSet(ViewSet, AbstractSigmaBoosts):
         # user_id = QueryData.check_params(request, 'user_id')
 
         user = UserMethods.get(pk=pk)
-        boosts_user = SigmaBoostsViewMethods.get(user=user)
 
-        SigmaBoostsViewMethods.passive_income_calculation(user, boosts_user)
+        SigmaBoostsViewMethods.passive_income_calculation(user)
 
     # PATCH /api/v1/sigma-boosts/upgrade_boost/?user_id=123&name=asdfas
     @action(detail=False, methods=["patch"])  # , url_path='upgrade-boost'
@@ -136,7 +138,10 @@ class SigmaBoostsViewSet(ViewSet, AbstractSigmaBoosts):
         user_id = QueryData.check_params(request, "user_id")
         name = QueryData.check_params(request, "name")
 
-        user = UserMethods.get(pk=user_id)
+        # NOTE перед списанием переносим заработанное в кликере
+        GameStateService().flush(user_pks=[user_id])
+
+        user = UserMethods.get(pk=user_id, settle=True)
         user_boosts = SigmaBoostsViewMethods.get(user=user)
         jack_game = LumberjackGameViewMethods.get(user=user)
         geo_hunter = GeoHunterViewMethods.get(user=user)
@@ -162,10 +167,11 @@ class LumberjackGameViewSet(ViewSet, AbstractGame, AbstractLumberjackGame):
     # GET /api/v1/lumberjack-games/{id}/
     @queue_request
     def retrieve(self, request, pk=None):
-        user = UserMethods.get(user_id=pk)
+        user = UserMethods.get(user_id=pk, settle=True)
         game = LumberjackGameViewMethods.get(user=user)
+        user_boosts = SigmaBoostsViewMethods.get(user=user)
 
-        LumberjackGameViewMethods.retrieve(game)
+        LumberjackGameViewMethods.retrieve(game, user_boosts)
 
     # GET /api/v1/lumberjack-games/active_games/
     @action(detail=False, methods=["get"])
@@ -175,28 +181,36 @@ class LumberjackGameViewSet(ViewSet, AbstractGame, AbstractLumberjackGame):
 
         LumberjackGameViewMethods.active_games(games)
 
+    # GET /api/v1/lumberjack-games/pending_energy/?cursor=0&limit=1000
+    @action(detail=False, methods=["get"])
+    @queue_request
+    def pending_energy(self, request):
+        cursor = request.query_params.get("cursor", 0)
+        limit = request.query_params.get("limit", PENDING_ENERGY_LIMIT)
+
+        LumberjackGameViewMethods.pending_energy(cursor, limit)
+
     # PATCH /api/v1/lumberjack-games/{user_id}/game_state/
     @action(detail=True, methods=["patch"])
     @queue_request
     def game_state(self, request, pk=None):
         # user_id = QueryData.check_params(request, 'user_id')
 
-        user = UserMethods.get(pk=pk)
-        game_user = LumberjackGameViewMethods.get(user=user)
-        user_boosts = SigmaBoostsViewMethods.get(user=user)
+        economy = EconomyService().load(pk=pk)
 
-        LumberjackGameViewMethods.game_state(game_user, user_boosts)
+        LumberjackGameViewMethods.game_state(economy.jack, economy.boosts)
 
     # PATCH /api/v1/lumberjack-games/{game_user_id}/update_grid/
     @action(detail=True, methods=["patch"])  # , url_path='update-grid'
     @queue_request
     def update_grid(self, request, pk=None):
         # game_user_id = QueryData.check_params(request, 'game_user_id')
-        grid = QueryData.check_params(request, "grid")
+        grid_mask = QueryData.check_params(request, "grid_mask")
 
         game_user = LumberjackGameViewMethods.get(pk=pk)
+        game_user_two = GeoHunterViewMethods.get(user=game_user.user)
 
-        LumberjackGameViewMethods.update_grid(game_user, grid)
+        LumberjackGameViewMethods.update_grid(game_user, game_user_two, grid_mask)
 
     # PATCH /api/v1/lumberjack-games/process_click/
     @action(detail=False, methods=["patch"])  # , url_path='process-click'
@@ -207,15 +221,43 @@ class LumberjackGameViewSet(ViewSet, AbstractGame, AbstractLumberjackGame):
         row = QueryData.check_params(request, "row")
         col = QueryData.check_params(request, "col")
 
-        user = UserMethods.get(user_id=user_id)
-        game_user = LumberjackGameViewMethods.get(user=user)
-        boosts_user = SigmaBoostsViewMethods.get(user=user)
-        game_user_two = GeoHunterViewMethods.get(user=user)
+        economy = EconomyService().load(user_id=user_id)
 
         LumberjackGameViewMethods.process_click(
-            user, game_user, game_user_two, boosts_user, energy_in_click, row, col
+            economy.user, economy.jack, economy.geo, economy.boosts,
+            energy_in_click, row, col
         )
 
+    # PATCH /api/v1/lumberjack-games/click/
+    @action(detail=False, methods=["patch"])
+    @queue_request
+    def click(self, request):
+        """
+        Клик или обновление поля + состояние для отрисовки за один запрос
+        """
+        user_id = QueryData.check_params(request, "user_id")
+        energy_in_click = QueryData.check_params(request, "energy_in_click")
+        refresh = bool(request.data.get("refresh", False))
+        # NOTE cells - пачка кликов [[row, col], ...] от коалесера бота
+        cells = request.data.get("cells")
+        row, col = None, None
+        if not refresh and not cells:
+            row = QueryData.check_params(request, "row")
+            col = QueryData.check_params(request, "col")
+
+        # NOTE пользователь, бусты и обе игры - одним запросом
+        economy = EconomyService().load(pk=user_id)
+
+        if cells and not refresh:
+            LumberjackGameViewMethods.click_many(
+                economy.jack, economy.geo, economy.boosts, energy_in_click, cells
+            )
+        else:
+            LumberjackGameViewMethods.click(
+                economy.jack, economy.geo, economy.boosts,
+                energy_in_click, row, col, refresh
+            )
+
     # PATCH /api/v1/lumberjack-games/{game_user_id}/restore_energy/
     @action(detail=True, methods=["patch"])  # , url_path='restore-energy'
     @queue_request
@@ -237,10 +279,11 @@ class GeoHunterGameViewSet(ViewSet, AbstractGame):
     @queue_request
     def retrieve(self, request, pk=None):
         """Получить геохантер"""
-        user = UserMethods.get(user_id=pk)
+        user = UserMethods.get(user_id=pk, settle=True)
         game = GeoHunterViewMethods.get(user=user)
+        user_boosts = SigmaBoostsViewMethods.get(user=user)
 
-        GeoHunterViewMethods.retrieve(game)
+        GeoHunterViewMethods.retrieve(game, user_boosts)
 
     # GET /api/v1/geo-hunter/active_games/
     @action(detail=False, methods=["get"])
@@ -250,17 +293,24 @@ class GeoHunterGameViewSet(ViewSet, AbstractGame):
 
         GeoHunterViewMethods.active_games(games)
 
+    # GET /api/v1/geo-hunter/pending_energy/?cursor=0&limit=1000
+    @action(detail=False, methods=["get"])
+    @queue_request
+    def pending_energy(self, request):
+        cursor = request.query_params.get("cursor", 0)
+        limit = request.query_params.get("limit", PENDING_ENERGY_LIMIT)
+
+        GeoHunterViewMethods.pending_energy(cursor, limit)
+
     # PATCH /api/v1/geo-hunter/{user_id}/game_state/
     @action(detail=True, methods=["patch"])
     @queue_request
     def game_state(self, request, pk=None):
         # user_id = QueryData.check_params(request, 'user_id')
 
-        user = UserMethods.get(pk=pk)
-        game_user = GeoHunterViewMethods.get(user=user)
-        user_boosts = SigmaBoostsViewMethods.get(user=user)
+        economy = EconomyService().load(pk=pk)
 
-        GeoHunterViewMethods.game_state(game_user, user_boosts)
+        GeoHunterViewMethods.game_state(economy.geo, economy.boosts)
 
     # PATCH /api/v1/geo-hunter/process_click/
     @action(detail=False, methods=["patch"])  # , url_path='process-click'
@@ -270,13 +320,29 @@ class GeoHunterGameViewSet(ViewSet, AbstractGame):
         energy_in_click = QueryData.check_params(request, "energy_in_click")
         user_choice = QueryData.check_params(request, "user_choice")
 
-        user = UserMethods.get(pk=user_id)
-        game_user = GeoHunterViewMethods.get(user=user)
-        boosts_user = SigmaBoostsViewMethods.get(user=user)
-        game_user_two = LumberjackGameViewMethods.get(user=user)
+        economy = EconomyService().load(pk=user_id)
 
         GeoHunterViewMethods.process_click(
-            user, game_user, game_user_two, boosts_user, energy_in_click, user_choice
+            economy.user, economy.geo, economy.jack, economy.boosts,
+            energy_in_click, user_choice
+        )
+
+    # PATCH /api/v1/geo-hunter/answer/
+    @action(detail=False, methods=["patch"])
+    @queue_request
+    def answer(self, request):
+        """
+        Ответ + состояние для отрисовки за один запрос
+        """
+        user_id = QueryData.check_params(request, "user_id")
+        energy_in_click = QueryData.check_params(request, "energy_in_click")
+        user_choice = QueryData.check_params(request, "user_choice")
+
+        # NOTE пользователь, бусты и обе игры - одним запросом
+        economy = EconomyService().load(pk=user_id)
+
+        GeoHunterViewMethods.answer(
+            economy.geo, economy.jack, economy.boosts, energy_in_click, user_choice
         )
 
     # PATCH /api/v1/geo-hunter/{game_user_id}/restore_energy/
@@ -313,7 +379,7 @@ class UserViewSet(ViewSet):
         """
         Получить конкретного пользователя по user_id
         """
-        user = UserMethods.get(user_id=pk)
+        user = UserMethods.get(user_id=pk, settle=True)
         serializer = UserSerializer(user)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
@@ -349,6 +415,27 @@ class UserViewSet(ViewSet):
         """
         return UserMethods.banned()
 
+    # GET /api/v1/users/{pk}/economy/
+    @action(detail=True, methods=["get"])
+    @queue_request
+    def economy(self, request, pk=None):
+        """
+        Энергия игр, уровни бустов и накопленный пассивный доход одной записью
+        """
+        return Response(EconomyService().snapshot(pk), status=status.HTTP_200_OK)
+
+    # GET /api/v1/users/{user_id}/context/?username=superuser
+    @action(detail=True, methods=["get"])
+    @queue_request
+    def context(self, request, pk=None):
+        """
+        Контекст пользователя для middleware бота одним запросом
+        (username обновляется, только если изменился)
+        """
+        username = request.query_params.get("username")
+
+        return UserMethods.context(pk, username)
+
     # GET /api/v1/users/{user_id}/referrals/count/
     @action(detail=True, methods=["get"], url_path="referrals/count")
     @queue_request
@@ -587,11 +674,12 @@ class PurchasesViewSet(ViewSet):
         product_id = QueryData.check_params(request, "product_id")
         delivery_data = QueryData.check_params(request, "delivery_data")
         
-        user = UserMethods.get(user_id=user_id)
+        user = UserMethods.get(user_id=user_id, settle=True)
+        if GameStateService().flush(user_pks=[user.pk]):
+            user.refresh_from_db()
         product = Pikmi_ShopMethods.get(pk=product_id)
 
-        Pikmi_ShopMethods.buy(product)
-        PurchasesMethods.create(user, title, description, cost, delivery_data)
+        PurchasesMethods.create(user, product, title, description, cost, delivery_data)
 
     # GET /api/v1/purchases/user_purchases/?completed=False&user_id=456
     @action(detail=False, methods=["get"])
@@ -751,17 +839,25 @@ class PikmiShopViewSet(ViewSet):
     @queue_request
     def list(self, request):
         """Получить все продукты (аналог get_all_products)"""
-        queryset = Pikmi_ShopMethods.all().order_by("_price")
-        serializer = PikmiShopSerializer(queryset, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        return CatalogCache().response(
+            request,
+            "pikmi_shop",
+            "all",
+            lambda: PikmiShopSerializer(
+                Pikmi_ShopMethods.all().order_by("_price"), many=True
+            ).data,
+        )
 
     # GET /api/v1/pikmi-shop/{id}/
     @queue_request
     def retrieve(self, request, pk=None):
         """Получить продукт по ID (аналог get_by_id)"""
-        product = Pikmi_ShopMethods.get(pk=pk)
-        serializer = PikmiShopSerializer(product)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        return CatalogCache().response(
+            request,
+            "pikmi_shop",
+            str(pk),
+            lambda: PikmiShopSerializer(Pikmi_ShopMethods.get(pk=pk)).data,
+        )
 
 
 class WorkKeysViewSet(ViewSet):
@@ -805,10 +901,12 @@ class BonusesViewSet(ViewSet):
     # GET /api/v1/bonuses/{id}/
     @queue_request
     def retrieve(self, request, pk=None):
-        bonus = BonusesMethods.get(pk=pk)
-        serializer = BonusesSerializer(bonus)
-
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        return CatalogCache().response(
+            request,
+            "bonuses",
+            str(pk),
+            lambda: BonusesSerializer(BonusesMethods.get(pk=pk)).data,
+        )
 
     # POST /api/v1/bonuses/
     @queue_request
@@ -852,6 +950,12 @@ class BonusesViewSet(ViewSet):
             type_bonus=type_bonus, expires_at=expires_at, bonus_obj=bonus_obj
         )
 
+    # PATCH /api/v1/bonuses/sweep_expired/
+    @action(detail=False, methods=["patch"])
+    @queue_request
+    def sweep_expired(self, request):
+        BonusesMethods.sweep_expired()
+
     # POST /api/v1/bonuses/claim_bonus/
     @action(detail=False, methods=["post"])  # , url_path='claim-bonus'
     @queue_request
@@ -923,9 +1027,18 @@ class QuestsViewSet(ViewSet):
     # GET /api/v1/quests/
     @queue_request
     def list(self, request):
-        quests = QuestMethods.all().filter(active=True)
-        serializer = QuestsSerializer(quests, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        return CatalogCache().response(
+            request,
+            "quests",
+            "active",
+            lambda: QuestsSerializer(
+                QuestMethods.all()
+                .filter(active=True)
+                .select_related("content_type")
+                .prefetch_related("quest_data"),
+                many=True,
+            ).data,
+        )
 
     # GET /api/v1/quests/get_info/?user_id=asd&quest_id=asd
     @action(detail=False, methods=["get"])
@@ -1076,7 +1189,9 @@ class RangsViewSet(ViewSet):
     def role(self, request):
         role = QueryData.check_params(request, "role")
 
-        return RangsMethods.role(role)
+        return CatalogCache().response(
+            request, "rangs", role, lambda: RangsMethods.role(role)
+        )
 
 
 class QuestModerationAttemptViewSet(ViewSet):
@@ -1236,40 +1351,22 @@ class AggregatorDailyStatsViewSet(ViewSet):
 
 
 class RatingViewSet(ViewSet):
-    
+    """
+    Рейтинги читаются из Redis ZSET (RatingService):
+    топ три и место пользователя без выборки всей таблицы
+    """
+
     # GET /api/v1/rating/daily_login/
     @action(detail=False, methods=["get"])
     @queue_request
     def daily_login(self, request):
         """
-        Делаем запрос к квестам получая трех с наивысшим показателем
-        на квесте с именем «Не ухАди»
-        
-        Если наша цель есть в этом топе, то не делаем отдельный
-        запрос по юзеру
-        
-        Если нету то получаем инфу о квесте «Не ухАди» для нашего
-        пользователя
-        
-        Делаем запрос по каждому пользоватлю из топа (не включая нашего)
-        возвращая только псевдоним, имя и фамилию
+        Серия входов на квесте «Не ухАди»
         """
         user_id = int(QueryData.check_params(request, "user_id"))
-        
-        quest = QuestMethods.get_dont_go()
-        
-        all_daily_login = UseQuestMethods.get_all_daily_login(quest)
-
-        result_data = CollectRatingData().main(
-            user_id,
-            "user__user_id",
-            "count_use",
-            0,
-            all_daily_login
-        )
-        
+
         return Response(
-            data=result_data, 
+            data=RatingService().board("daily_login", user_id),
             status=status.HTTP_200_OK
         )
 
@@ -1279,29 +1376,12 @@ class RatingViewSet(ViewSet):
     @queue_request
     def collect_starcoins(self, request):
         """
-        Получаем топ три по all_starcoins и их
-        псевдоним, имя и фамилию
-        
-        Если нашего пользователя там нет, то совершаем
-        отдельный запрос для него
+        Топ три по all_starcoins
         """
         user_id = int(QueryData.check_params(request, "user_id"))
 
-        list_all_starcoins = UserMethods.get_list_all_starcoins()
-
-        result_data = CollectRatingData(
-            lambda x, y: round((x - y), 2),
-            lambda x: round(x, 2)
-        ).main(
-            user_id,
-            "user_id",
-            "all_starcoins",
-            0,
-            list_all_starcoins
-        )
-        
         return Response(
-            data=result_data, 
+            data=RatingService().board("collect_starcoins", user_id),
             status=status.HTTP_200_OK
         )
 
@@ -1315,18 +1395,8 @@ class RatingViewSet(ViewSet):
         """
         user_id = int(QueryData.check_params(request, "user_id"))
 
-        list_correct_answers = GeoHunterViewMethods.get_list_correct_answers()
-
-        result_data = CollectRatingData().main(
-            user_id,
-            "user__user_id",
-            "total_true",
-            0,
-            list_correct_answers
-        )
-        
         return Response(
-            data=result_data, 
+            data=RatingService().board("guess_country", user_id),
             status=status.HTTP_200_OK
         )
 
@@ -1340,18 +1410,8 @@ class RatingViewSet(ViewSet):
         """
         user_id = int(QueryData.check_params(request, "user_id"))
 
-        list_correct_clicks = LumberjackGameViewMethods.get_list_correct_clicks()
-
-        result_data = CollectRatingData().main(
-            user_id,
-            "user__user_id",
-            "total_clicks",
-            0,
-            list_correct_clicks
-        )
-        
         return Response(
-            data=result_data, 
+            data=RatingService().board("make_clicks", user_id),
             status=status.HTTP_200_OK
         )
 
@@ -1363,38 +1423,11 @@ class RatingViewSet(ViewSet):
         """
         Больше всего выполненных квестов не включая
         «Не ухАди» и те что на модерации
-        
-        # NOTE надо по другому брать данные может быть через записи модерации
         """
         user_id = int(QueryData.check_params(request, "user_id"))
 
-        quest = QuestMethods.get_dont_go()
-
-        raw_data = UseQuestMethods.get_all_completed_quests(quest)
-
-        user_totals = defaultdict(int)
-        for item in raw_data:
-            user_totals[item['user__user_id']] += item['count_use']
-        
-        sorted_users = sorted(user_totals.items(), key=lambda x: x[1], reverse=True)
-        
-        completed_quests = [
-            {
-                'user_id': user_id,
-                'total_count': total
-            } for user_id, total in sorted_users
-        ]
-
-        result_data = CollectRatingData().main(
-            user_id,
-            "user_id",
-            "total_count",
-            0,
-            completed_quests
-        )
-
         return Response(
-            data=result_data, 
+            data=RatingService().board("completed_quests", user_id),
             status=status.HTTP_200_OK
         )
 
@@ -1408,109 +1441,9 @@ class RatingViewSet(ViewSet):
         """
         user_id = int(QueryData.check_params(request, "user_id"))
 
-        referral_ids = UserMethods.get_users_referral_ids()
-        
-        user_totals = defaultdict(int)
-        for referral_data in referral_ids:
-            user_totals[referral_data["referral_user_id"]] += 1
-        
-        sorted_users = sorted(user_totals.items(), key=lambda x: x[1], reverse=True)
-        
-        completed_quests = [
-            {
-                'user_id': user_id,
-                'total_count': total
-            } for user_id, total in sorted_users
-        ]
-
-        result_data = CollectRatingData().main(
-            user_id,
-            "user_id",
-            "total_count",
-            0,
-            completed_quests
-        )
-
         return Response(
-            data=result_data, 
+            data=RatingService().board("invited_friends", user_id),
             status=status.HTTP_200_OK
         )
 
 
-class CollectRatingData:
-
-    def __init__(
-        self,
-        calc_diff: Callable = lambda x, y: x - y,
-        calc_value: Callable = lambda x: x
-        ):
-        self.calc_diff = calc_diff
-        self.calc_value = calc_value
-        self.result_data: List = []
-        self.my_user: bool = False
-        self.pre_value: Optional[Any] = None
-        self.iter_value: Optional[Any] = None
-        self.next_place: int = 1
-
-    def get_user_info(
-        self,
-        place: int,
-        user_id: int,
-        value: Any,
-        find_user: bool = False
-    ) -> None:
-        user = UserMethods.get(user_id=user_id)
-
-        result = {
-            "place": place,
-            "nickname": (
-                user.nickname if user._nickname else 
-                f"{user.supername} {user.name}"
-            ),
-            "value": self.calc_value(value),
-            "my": find_user,
-            "top": place <= 3
-        }
-        
-        if find_user and place > 3:
-            result["next_place"] = self.next_place
-            result["difference"] = self.calc_diff(self.pre_value, value)
-            
-        self.result_data.append(result)
-
-    def main(
-        self,
-        user_id: int,
-        key_name: str,
-        value_name: str,
-        zero_value: int,
-        iterator: List[Dict]
-    ) -> List:
-        for place, completed_quest in enumerate(iterator, start=1):
-            if completed_quest[key_name] == user_id:
-                self.my_user = True
-                self.get_user_info(place, user_id, completed_quest[value_name], True)
-                continue
-            
-            if not self.pre_value or self.iter_value != completed_quest[value_name]:
-                self.next_place = place - 1
-                self.iter_value = iterator[self.next_place][value_name]
-                try:
-                    self.pre_value = iterator[self.next_place-1][value_name]
-                except:
-                    self.pre_value = iterator[self.next_place][value_name]
-            
-            if place > 3:
-                if self.my_user:
-                    break
-                else:
-                    continue
-            
-            self.get_user_info(place, completed_quest[key_name], completed_quest[value_name])
-        else:
-            if not self.my_user:
-                self.get_user_info(place, user_id, zero_value, True)
-        
-        return self.result_data
-
-
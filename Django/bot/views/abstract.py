@@ -61,6 +61,12 @@ class AbstractGame(abc.ABC):
         Получаем все активные игры
         """
 
+    @abc.abstractmethod
+    def pending_energy(self):
+        """
+        Получаем игры, где энергия еще восстанавливается
+        """
+
     @abc.abstractmethod
     def game_state(self):
         """
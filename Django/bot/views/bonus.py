@@ -1,7 +1,13 @@
 from datetime import datetime
 from typing import List, Optional, Union
 
+from bot.service.balance import BalanceService
+from bot.service.bonus_cache import ClickBonusCache
+from bot.service.catalog_cache import CatalogCache
 from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
 from rest_framework import status
 from rest_framework.response import Response
 
@@ -72,10 +78,27 @@ class BonusesMethods:
             type_bonus=type_bonus,
             expires_at=expires_at,
         )
+        ClickBonusCache.publish_invalidation()
         raise RaisesResponse(
             data=BonusesSerializer(bonus).data, status=status.HTTP_201_CREATED
         )
 
+    @classmethod
+    def sweep_expired(cls) -> RaisesResponse:
+        """
+        Выключить просроченные бонусы (по расписанию, а не на клике)
+        """
+        deactivated = Bonuses.objects.filter(
+            active=True, _expires_at__lte=timezone.now()
+        ).update(active=False)
+        if deactivated:
+            ClickBonusCache.publish_invalidation()
+            CatalogCache().bump("bonuses")
+
+        raise RaisesResponse(
+            data={"deactivated": deactivated}, status=status.HTTP_200_OK
+        )
+
 
 class UseBonusesMethods(UserGameMethods):
     @classmethod
@@ -109,19 +132,30 @@ class UseBonusesMethods(UserGameMethods):
             bonus.save()
             raise RaisesResponse(data={"text": "not_active"}, status=status.HTTP_200_OK)
 
-        # Проверяем не получал ли уже пользователь этот бонус
-        if UseBonuses.objects.filter(user=user, bonus=bonus).exists():
-            raise RaisesResponse(
-                data={"text": "already_used"}, status=status.HTTP_200_OK
-            )
-
-        # Начисляем бонус
-        bonus_data.use_quantity += 1
-        user.starcoins += bonus_data.value
-
-        bonus_data.save()
-        user.save()
-        UseBonuses.objects.create(user=user, bonus=bonus)
+        # Начисляем бонус: использование - условным UPDATE, без гонки за остаток
+        with transaction.atomic():
+            # NOTE параллельные получения одним пользователем - по очереди
+            # (блокировка строки пользователя до конца транзакции)
+            Users.objects.select_for_update().only("pk").get(pk=user.pk)
+
+            # Проверяем не получал ли уже пользователь этот бонус
+            if UseBonuses.objects.filter(user=user, bonus=bonus).exists():
+                raise RaisesResponse(
+                    data={"text": "already_used"}, status=status.HTTP_200_OK
+                )
+
+            taken = AddStarcoinsBonus.objects.filter(
+                pk=bonus_data.pk, use_quantity__lt=F("max_quantity")
+            ).update(use_quantity=F("use_quantity") + 1)
+            if taken:
+                BalanceService().credit(user, bonus_data.value)
+                UseBonuses.objects.create(user=user, bonus=bonus)
+                CatalogCache().bump("bonuses")
+
+        if not taken:
+            bonus.active = False
+            bonus.save()
+            raise RaisesResponse(data={"text": "not_active"}, status=status.HTTP_200_OK)
 
         raise RaisesResponse(
             data={"text": f"success_add_starcoins={bonus_data.value}"},
@@ -2,6 +2,9 @@ import abc
 from datetime import datetime
 
 import pytz
+from bot.service.balance import BalanceService
+from django.db import transaction
+from django.db.models import F
 from rest_framework import status
 from rest_framework.response import Response
 
@@ -59,21 +62,38 @@ class PromocodesMethods(CodesAbstract):
                 data={"error": "expires_at"}, status=status.HTTP_200_OK
             )
 
-        if promocode.type_promo == "starcoins":
-            promocode_obj = promocode.promo_data
-            user.starcoins += promocode_obj.reward_starcoins
-            user.save()
-            serializer = StarcoinsPromoSerializer(promocode_obj)
-            _type = "starcoins"
-        else:
+        if promocode.type_promo != "starcoins":
             raise RaisesResponse(
                 data={"error": "Type Promo not found"}, status=status.HTTP_404_NOT_FOUND
             )
 
-        promocode.used_quantity += 1
-        promocode.save()
+        promocode_obj = promocode.promo_data
+        # NOTE активация - условным UPDATE: последний код не уйдет дважды
+        with transaction.atomic():
+            # NOTE параллельные активации одним пользователем - по очереди
+            # (блокировка строки пользователя до конца транзакции)
+            Users.objects.select_for_update().only("pk").get(pk=user.pk)
+
+            # NOTE повторная проверка под блокировкой
+            if UsePromocodes.objects.filter(user=user, promocode=promocode).exists():
+                raise RaisesResponse(
+                    data={"error": "use_promocodes"}, status=status.HTTP_200_OK
+                )
+
+            taken = Promocodes.objects.filter(
+                pk=promocode.pk, used_quantity__lt=F("all_quantity")
+            ).update(used_quantity=F("used_quantity") + 1)
+            if taken:
+                BalanceService().credit(user, promocode_obj.reward_starcoins)
+                UsePromocodes.objects.create(user=user, promocode=promocode)
+
+        if not taken:
+            raise RaisesResponse(
+                data={"error": "all_quantity"}, status=status.HTTP_200_OK
+            )
 
-        UsePromocodes.objects.create(user=user, promocode=promocode)
+        serializer = StarcoinsPromoSerializer(promocode_obj)
+        _type = "starcoins"
 
         raise RaisesResponse(
             data={"data": serializer.data, "type": _type}, status=status.HTTP_200_OK
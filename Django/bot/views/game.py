@@ -1,18 +1,31 @@
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple, Union
+from typing import Dict, List, Optional, Union
 
 import pytz
 from bot.schemas.game import BoostData
+from bot.service import grid
+from bot.service.balance import BalanceService
+from bot.service.bonus_cache import ClickBonusCache
+from bot.service.game_state import ClickStatus, GameStateService
+from bot.service.passive_income import PassiveIncomeService
 from conf.settings import DEBUG
-from django.contrib.contenttypes.models import ContentType
-from django.db.models import Prefetch
+from django.db import transaction
+from django.db.models import (
+    Case,
+    DateTimeField,
+    DurationField,
+    ExpressionWrapper,
+    F,
+    QuerySet,
+    Value,
+    When,
+)
 from django.utils import timezone
 from loguru import logger
 from rest_framework import status
 from rest_framework.response import Response
 
 from ..models import (
-    Bonuses,
     GameData,
     GeoHunter,
     InteractiveGames,
@@ -34,6 +47,9 @@ from .error import RaisesResponse
 
 INTERACTIVE_INVITE_TIME = 10
 
+PENDING_ENERGY_LIMIT = 1000
+
+
 
 class UserGameMethods:
     @classmethod
@@ -52,7 +68,11 @@ class UserGameMethods:
 
         game.current_energy = game.max_energy
         game.last_energy_update = datetime.now()
-        game.save()
+        # NOTE счетчики и поле в модели из Postgres могут отставать
+        # от Redis - пишем и переносим только энергию
+        game.save(update_fields=GameStateService.ENERGY_FIELDS)
+
+        GameStateService().sync_game(game)
 
 
 class SigmaBoostsMethods:
@@ -73,66 +93,6 @@ class SigmaBoostsMethods:
         except Sigma_Boosts.DoesNotExist:
             return Sigma_Boosts.objects.create(user=user)
 
-    @classmethod
-    def _check_passive_income_level(
-        cls, user: Users, boosts_user: Sigma_Boosts
-    ) -> Optional[RaisesResponse]:
-        """
-        Удостоверяемся, что пассивный доход
-        прокачен хоть на один уровень
-        """
-        if boosts_user.passive_income_level == 0:
-            raise RaisesResponse(
-                data={"income": 0, "user": UserSerializer(user).data},
-                status=status.HTTP_200_OK,
-            )
-
-    @classmethod
-    def _calculate_elapsed_hours(
-        cls, user: Users, boosts_user: Sigma_Boosts
-    ) -> Union[RaisesResponse, int]:
-        """
-        Расчитываем сколько часов прошло с последнего
-        зачисления пассивного дохода
-        """
-        now = timezone.now().astimezone(pytz.timezone("Europe/Moscow"))
-        seconds_passed = (now - boosts_user.last_passive_claim).total_seconds()
-        full_hours = int(seconds_passed // 3600)
-
-        if full_hours < 1:
-            raise RaisesResponse(
-                data={"income": 0, "user": UserSerializer(user).data},
-                status=status.HTTP_200_OK,
-            )
-        return full_hours
-
-    @classmethod
-    def _calculate_passive_income(
-        cls, boosts_user: Sigma_Boosts, full_hours: int
-    ) -> float:
-        """
-        Расчитываем доход от пассивки
-        """
-        return full_hours * boosts_data.passive_income_level.value_by_level(
-            boosts_user.passive_income_level
-        )
-
-    @classmethod
-    def _add_passive_income(
-        cls, user: Users, boosts_user: Sigma_Boosts, full_hours: int, income: float
-    ) -> None:
-        """
-        Обновление данных о последнем зачислении пассивного дохода
-        и зачисляем доход пользователю
-        """
-        boosts_user.last_passive_claim = boosts_user.last_passive_claim + timedelta(
-            hours=full_hours
-        )
-        boosts_user.save()
-
-        user.starcoins += income
-        user.save()
-
     @classmethod
     def _check_possibility_upgrade_by_starcoins(
         cls, user: Users, boost_data: BoostData, boost_level: int
@@ -160,27 +120,37 @@ class SigmaBoostsMethods:
         cls, user_boosts: Sigma_Boosts, name: str, boost_level: int
     ) -> None:
         """
-        Проверяем не прокачен ли буст
-        на максимальный уровень
+        Поднимаем уровень буста одним условным UPDATE:
+        если параллельный запрос уже поднял уровень - отказ
 
         Если мы впервые качаем пассивку, то
         выставляем время последнего зачисления
         """
-        if name == "passive_income_level" and user_boosts.passive_income_level == 0:
+        values = {name: boost_level + 1}
+        # NOTE время зачисления трогаем только при первом уровне пассивки:
+        # иначе затрем отметку, которую двигает PassiveIncomeService.settle
+        if name == "passive_income_level" and boost_level == 0:
             user_boosts.last_passive_claim = datetime.now()
-
+            values["_last_passive_claim"] = user_boosts._last_passive_claim
         setattr(user_boosts, name, boost_level + 1)
-        user_boosts.save()
+
+        updated = Sigma_Boosts.objects.filter(
+            pk=user_boosts.pk, **{name: boost_level}
+        ).update(**values)
+        if not updated:
+            raise RaisesResponse(data=False, status=status.HTTP_200_OK)
 
     @classmethod
     def _write_off_money(
         cls, user: Users, boost_data: BoostData, boost_level: int
     ) -> None:
         """
-        Списание средств
+        Списание средств (UPDATE ... WHERE starcoins >= price)
         """
-        user.starcoins -= boost_data.price(boost_level)
-        user.save()
+        if not BalanceService().debit(
+            user, boost_data.price(boost_level), overdraft=DEBUG
+        ):
+            raise RaisesResponse(data=False, status=status.HTTP_200_OK)
 
 
 class SigmaBoostsViewMethods(SigmaBoostsMethods, UserGameMethods, AbstractSigmaBoosts):
@@ -218,15 +188,12 @@ class SigmaBoostsViewMethods(SigmaBoostsMethods, UserGameMethods, AbstractSigmaB
         )
 
     @classmethod
-    def passive_income_calculation(
-        cls, user: Users, boosts_user: Sigma_Boosts
-    ) -> RaisesResponse:
-        cls._check_passive_income_level(user, boosts_user)
-
-        full_hours = cls._calculate_elapsed_hours(user, boosts_user)
-        income = cls._calculate_passive_income(boosts_user, full_hours)
-
-        cls._add_passive_income(user, boosts_user, full_hours, income)
+    def passive_income_calculation(cls, user: Users) -> RaisesResponse:
+        """
+        Явное начисление пассивного дохода
+        (обычно он досчитывается в UserMethods.get)
+        """
+        income = PassiveIncomeService().settle(user)
 
         raise RaisesResponse(
             data={"income": income, "user": UserSerializer(user).data},
@@ -249,8 +216,10 @@ class SigmaBoostsViewMethods(SigmaBoostsMethods, UserGameMethods, AbstractSigmaB
             cls._check_possibility_upgrade_by_starcoins(user, boost_data, boost_level)
         cls._check_possibility_upgrade_by_max_level(boost_data, boost_level)
 
-        cls._upgrade_boost(user_boosts, name, boost_level)
-        cls._write_off_money(user, boost_data, boost_level)
+        # NOTE отказ в любом из UPDATE откатывает оба
+        with transaction.atomic():
+            cls._write_off_money(user, boost_data, boost_level)
+            cls._upgrade_boost(user_boosts, name, boost_level)
 
         if jack_game:
             cls._restore_energy(
@@ -279,43 +248,23 @@ class SigmaBoostsViewMethods(SigmaBoostsMethods, UserGameMethods, AbstractSigmaB
 
 class GameMethods(UserGameMethods):
     @classmethod
-    def _get_active_click_bonuses(cls) -> List[Bonuses]:
-        """
-        Получить QuerySet активных бонусов для кликов
-        """
-        return (
-            Bonuses.objects.filter(
-                type_bonus="click_scale", active=True, _expires_at__gt=timezone.now()
-            )
-            .prefetch_related(
-                Prefetch("content_type", queryset=ContentType.objects.all())
-            )
-            .all()
-        )
-
-    @classmethod
-    def _is_bonus_valid(cls, bonus: Bonuses, current_time: datetime) -> bool:
-        """
-        Проверить валидность бонуса
-        """
-        return bonus.expires_at < current_time
-
-    @classmethod
-    def _deactivate_expired_bonus(cls, bonus: Bonuses) -> None:
+    def _apply_bonus_to_income(cls, base_income: float, multiplier: float) -> float:
         """
-        Деактивировать просроченный бонус
+        Применить бонус к доходу
         """
-        bonus.active = False
-        bonus.save(update_fields=["active"])
+        modified_income = base_income * multiplier
+        return round(modified_income, 3)
 
     @classmethod
-    def _apply_bonus_to_income(cls, base_income: float, bonus: Bonuses) -> float:
+    def _recovery_seconds(cls, user_boosts: Sigma_Boosts) -> float:
         """
-        Применить бонус к доходу
+        Время полного восстановления энергии
         """
-        bonus_data = bonus.bonus_data
-        modified_income = base_income * bonus_data.value
-        return round(modified_income, 3)
+        return timedelta(
+            minutes=boosts_data.recovery_level.value_by_level(
+                user_boosts.recovery_level
+            )
+        ).total_seconds()
 
     @classmethod
     def _get_many_seconds_passed(
@@ -324,64 +273,98 @@ class GameMethods(UserGameMethods):
         time_passed = (
             datetime.now(pytz.timezone("Europe/Moscow")) - game_user.last_energy_update
         )
-        required_delay: timedelta = timedelta(
-            minutes=boosts_data.recovery_level.value_by_level(
-                user_boosts.recovery_level
-            )
-        )
-        return (required_delay - time_passed).total_seconds()
+        return cls._recovery_seconds(user_boosts) - time_passed.total_seconds()
 
     @classmethod
-    def _сheck_overdue_time(
-        cls,
-        game_user: Union[Lumberjack_Game, GeoHunter],
-        first_click: bool,
-        total_seconds: int,
-    ) -> Tuple[bool, int]:
+    def _regenerate_energy(
+        cls, game_user: Union[Lumberjack_Game, GeoHunter], user_boosts: Sigma_Boosts
+    ) -> None:
         """
-        Обрабатываем случай, когда время уже прошло
+        Энергия не восстанавливается фоновыми задачами,
+        а вычисляется при чтении от last_energy_update
+        и буста восстановления
         """
-        if (total_seconds + 30) < 0 and not first_click:
-            total_seconds = 0
-            super()._restore_energy(game_user)
-            return True, total_seconds
-        else:
-            return False, total_seconds
+        if (
+            game_user.current_energy < game_user.max_energy
+            and cls._get_many_seconds_passed(game_user, user_boosts) <= 0
+        ):
+            game_user.current_energy = game_user.max_energy
 
     @classmethod
-    def _build_time_str(cls, total_seconds: int) -> str:
+    def _recovery_duration(cls) -> Case:
         """
-        Получаем строку времени
+        Время восстановления по уровню буста прямо в SQL
+        (повторяет BoostData.value_by_level)
         """
-        hours, remainder = divmod(int(total_seconds), 3600)
-        minutes, seconds = divmod(int(remainder), 60)
-        return f"{hours:02d}:{minutes:02d}:{seconds:02d}"
+        recovery = boosts_data.recovery_level
+        return Case(
+            When(
+                user__boosts__recovery_level__lte=0,
+                then=Value(timedelta(minutes=recovery.value_by_level(0))),
+            ),
+            *[
+                When(
+                    user__boosts__recovery_level=level,
+                    then=Value(timedelta(minutes=recovery.value_by_level(level))),
+                )
+                for level in range(1, recovery.max_level() + 1)
+            ],
+            default=Value(
+                timedelta(minutes=recovery.value_by_level(recovery.max_level()))
+            ),
+            output_field=DurationField(),
+        )
 
     @classmethod
-    def _enough_energy_now(
-        cls, game_user: Union[Lumberjack_Game, GeoHunter], energy_in_click: int
-    ) -> int:
+    def _pending_energy(
+        cls, games: QuerySet, cursor: int, limit: int
+    ) -> RaisesResponse:
         """
-        Проверяет энергию есть ли энергия в игре
+        Игры с неполной энергией и временем ее восстановления.
+        Один запрос (join с Sigma_Boosts), пагинация курсором по pk
         """
-        if game_user.current_energy < energy_in_click:
-            raise RaisesResponse(
-                data={"error": "Not enough energy"}, status=status.HTTP_400_BAD_REQUEST
+        limit = min(max(int(limit), 1), PENDING_ENERGY_LIMIT)
+        rows = list(
+            games.annotate(
+                due_at=ExpressionWrapper(
+                    F("_last_energy_update") + cls._recovery_duration(),
+                    output_field=DateTimeField(),
+                )
             )
+            .filter(
+                pk__gt=int(cursor),
+                current_energy__lt=F("max_energy"),
+                # NOTE энергия, которая уже восстановилась, считается при чтении
+                due_at__gt=timezone.now(),
+            )
+            .order_by("pk")
+            .values_list("pk", "user__user_id", "due_at")[:limit]
+        )
+        raise RaisesResponse(
+            data={
+                "results": [
+                    {"user_id": user_id, "due_at": due_at.timestamp()}
+                    for _, user_id, due_at in rows
+                ],
+                "next_cursor": rows[-1][0] if len(rows) == limit else None,
+            },
+            status=status.HTTP_200_OK,
+        )
 
     @classmethod
-    def _reference_point_last_energy_update(
-        cls,
-        game_user: Union[Lumberjack_Game, GeoHunter],
-        game_user_two: Union[Lumberjack_Game, GeoHunter],
-    ) -> int:
+    def _build_time_str(cls, total_seconds: int) -> str:
         """
-        Обновляем точку отсчета при полной энергии
+        Получаем строку времени
         """
-        if game_user.current_energy == game_user.max_energy:
-            game_user.last_energy_update = datetime.now()
-            game_user_two.last_energy_update = datetime.now()
-            game_user_two.save()
+        hours, remainder = divmod(int(total_seconds), 3600)
+        minutes, seconds = divmod(int(remainder), 60)
+        return f"{hours:02d}:{minutes:02d}:{seconds:02d}"
+
+    @classmethod
+    def _not_enough_energy(cls) -> RaisesResponse:
+        raise RaisesResponse(
+            data={"error": "Not enough energy"}, status=status.HTTP_400_BAD_REQUEST
+        )
 
 
 class GameView(GameMethods):
@@ -389,17 +372,16 @@ class GameView(GameMethods):
     def game_state(
         cls, game_user: Union[Lumberjack_Game, GeoHunter], user_boosts: Sigma_Boosts
     ) -> Response:
+        GameStateService().overlay(game_user)
+        super()._regenerate_energy(game_user, user_boosts)
+
         first_click = game_user.current_energy == game_user.max_energy
 
-        total_seconds = super()._get_many_seconds_passed(game_user, user_boosts)
-        force_update_energy, total_seconds = super()._сheck_overdue_time(
-            game_user, first_click, total_seconds
-        )
+        total_seconds = max(super()._get_many_seconds_passed(game_user, user_boosts), 0)
         time_str = super()._build_time_str(total_seconds)
 
         raise RaisesResponse(
             data={
-                "force_update_energy": force_update_energy,
                 "time_str": time_str,
                 "first_click": first_click,
                 "game_user": (
@@ -416,29 +398,13 @@ class GameView(GameMethods):
         """
         Применяет все активные бонусы к доходу за клик
         """
-        current_time = datetime.now(pytz.timezone("Europe/Moscow"))
-
-        for bonus in super()._get_active_click_bonuses():
-            # Проверяем срок действия
-            if super()._is_bonus_valid(bonus, current_time):
-                super()._deactivate_expired_bonus(bonus)
-                continue
-
-            return super()._apply_bonus_to_income(base_income, bonus)
-        return base_income
+        # NOTE множитель из кэша процесса, просроченные бонусы
+        # выключает плановая чистка (BonusesMethods.sweep_expired)
+        multiplier = ClickBonusCache().multiplier()
+        if multiplier is None:
+            return base_income
 
-    @classmethod
-    def check_energy(
-        cls,
-        game_user: Union[Lumberjack_Game, GeoHunter],
-        game_user_two: Union[Lumberjack_Game, GeoHunter],
-        energy_in_click: int,
-    ) -> int:
-        """
-        Проверяет энергию
-        """
-        super()._enough_energy_now(game_user, energy_in_click)
-        super()._reference_point_last_energy_update(game_user, game_user_two)
+        return super()._apply_bonus_to_income(base_income, multiplier)
 
     @classmethod
     def restore_energy(
@@ -465,57 +431,73 @@ class GameView(GameMethods):
     @classmethod
     def _update_grid(
         cls,
-        game_user: Union[Lumberjack_Game, GeoHunter],
-        grid: Optional[List[List[str]]],
+        game_user: Lumberjack_Game,
+        game_user_two: GeoHunter,
+        grid_mask: int,
     ):
-        game_user.current_grid = grid
-        game_user.save()
+        GameStateService().update_grid(game_user, game_user_two, grid_mask)
 
     @classmethod
-    def _check_grid_format(cls, grid: Optional[List[List[str]]]):
-        if (
-            not isinstance(grid, list)
-            or len(grid) != 4
-            or any(len(row) != 5 for row in grid)
+    def _check_grid_mask(cls, grid_mask: int):
+        if not grid.is_valid_mask(grid_mask):
+            raise RaisesResponse(
+                data={"error": "Grid mask must have 2-5 stars in 4x5 field"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+    @classmethod
+    def _check_cells(cls, cells) -> None:
+        if not (
+            isinstance(cells, list)
+            and 0 < len(cells) <= grid.GRID_CELLS
+            and all(
+                isinstance(cell, (list, tuple))
+                and len(cell) == 2
+                and all(isinstance(value, int) for value in cell)
+                for cell in cells
+            )
         ):
             raise RaisesResponse(
-                data={"error": "Grid must be 4x5 matrix"},
+                data={"error": f"cells must be 1-{grid.GRID_CELLS} [row, col] pairs"},
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
     @classmethod
     def _process_lumberjack_click(
         cls,
-        user: Users,
         game_user: Lumberjack_Game,
         game_user_two: GeoHunter,
+        boosts_user: Sigma_Boosts,
         income_per_click: int,
         energy_in_click: int,
         row: int,
         col: int,
-    ) -> None:
+    ) -> ClickStatus:
         """
         Обрабатывает клик в кликере
-        """
-        game_user.total_clicks += 1
-        game_user.current_grid[row][col] = str(income_per_click)
-        game_user.total_currency += income_per_click
-        game_user.current_energy -= energy_in_click
-        game_user.save()
 
-        if game_user_two.current_energy > 0:
-            game_user_two.current_energy -= energy_in_click
-            game_user_two.save()
-
-        user.starcoins += income_per_click
-        user.save()
+        NOTE клик применяется в Redis, в Postgres
+        его переносит start_game_flusher
+        """
+        result = GameStateService().click_lumberjack(
+            game_user,
+            game_user_two,
+            income_per_click,
+            energy_in_click,
+            super()._recovery_seconds(boosts_user),
+            row,
+            col,
+        )
+        if result["status"] == ClickStatus.NO_ENERGY:
+            super()._not_enough_energy()
+        return result["status"]
 
     @classmethod
     def _process_geohunter_click(
         cls,
-        user: Users,
-        game_user: Lumberjack_Game,
-        game_user_two: GeoHunter,
+        game_user: GeoHunter,
+        game_user_two: Lumberjack_Game,
+        boosts_user: Sigma_Boosts,
         income_per_click: int,
         energy_in_click: int,
         user_choice: bool,
@@ -523,22 +505,66 @@ class GameView(GameMethods):
         """
         Обрабатывает клик в геохантере
         """
-        game_user.current_energy -= energy_in_click
+        result = GameStateService().click_geohunter(
+            game_user_two,
+            game_user,
+            income_per_click,
+            energy_in_click,
+            super()._recovery_seconds(boosts_user),
+            user_choice,
+        )
+        if result["status"] == ClickStatus.NO_ENERGY:
+            super()._not_enough_energy()
 
-        if user_choice:
-            game_user.total_true += 1
-            game_user.total_currency += income_per_click
+        GameStateService().overlay(game_user, counters=True)
 
-            user.starcoins += income_per_click
-            user.save()
-        else:
-            game_user.total_false += 1
+    @classmethod
+    def _prepare_click(
+        cls, game_user: Union[Lumberjack_Game, GeoHunter], user_boosts: Sigma_Boosts
+    ) -> bool:
+        """
+        Актуализируем игру перед кликом
+        """
+        GameStateService().overlay(game_user)
+        super()._regenerate_energy(game_user, user_boosts)
 
-        game_user.save()
+        return game_user.current_energy == game_user.max_energy
 
-        if game_user_two.current_energy > 0:
-            game_user_two.current_energy -= energy_in_click
-            game_user_two.save()
+    @classmethod
+    def _click_state(
+        cls,
+        game_user: Union[Lumberjack_Game, GeoHunter],
+        user_boosts: Sigma_Boosts,
+        result: ClickStatus,
+        first_click: bool,
+        income: float = 0,
+        results: Optional[List[ClickStatus]] = None,
+    ) -> RaisesResponse:
+        """
+        Отдаем все, что нужно боту для отрисовки игры
+
+        NOTE results - статусы каждого клика пачки (click_many)
+        """
+        GameStateService().overlay(game_user, counters=True)
+        super()._regenerate_energy(game_user, user_boosts)
+
+        total_seconds = max(super()._get_many_seconds_passed(game_user, user_boosts), 0)
+
+        raise RaisesResponse(
+            data={
+                "result": result,
+                "results": results or [result],
+                "income": income,
+                "time_str": super()._build_time_str(total_seconds),
+                "first_click": first_click,
+                "game_user": (
+                    LumberjackGameSerializer(game_user).data
+                    if isinstance(game_user, Lumberjack_Game)
+                    else GeoHunterSerializer(game_user).data
+                ),
+            },
+            status=status.HTTP_200_OK,
+        )
 
 
 class LumberjackGameViewMethods(GameView, AbstractLumberjackGame, AbstractGame):
@@ -561,7 +587,11 @@ class LumberjackGameViewMethods(GameView, AbstractLumberjackGame, AbstractGame):
         return Lumberjack_Game.objects.all()
 
     @classmethod
-    def retrieve(cls, game: Lumberjack_Game) -> RaisesResponse:
+    def retrieve(
+        cls, game: Lumberjack_Game, user_boosts: Sigma_Boosts
+    ) -> RaisesResponse:
+        GameStateService().overlay(game, counters=True)
+        super()._regenerate_energy(game, user_boosts)
         raise RaisesResponse(
             LumberjackGameSerializer(game).data, status=status.HTTP_200_OK
         )
@@ -572,6 +602,10 @@ class LumberjackGameViewMethods(GameView, AbstractLumberjackGame, AbstractGame):
             LumberjackGameSerializer(games, many=True).data, status=status.HTTP_200_OK
         )
 
+    @classmethod
+    def pending_energy(cls, cursor: int, limit: int) -> RaisesResponse:
+        super()._pending_energy(cls.all(), cursor, limit)
+
     @classmethod
     def game_state(
         cls, game_user: Lumberjack_Game, user_boosts: Sigma_Boosts
@@ -579,12 +613,17 @@ class LumberjackGameViewMethods(GameView, AbstractLumberjackGame, AbstractGame):
         super().game_state(game_user, user_boosts)
 
     @classmethod
-    def update_grid(cls, game_user: Lumberjack_Game, grid: List[List[str]]) -> Response:
+    def update_grid(
+        cls,
+        game_user: Lumberjack_Game,
+        game_user_two: GeoHunter,
+        grid_mask: int,
+    ) -> Response:
         """
         Обновляет игровое поле пользователя
         """
-        super()._check_grid_format(grid)
-        super()._update_grid(game_user, grid)
+        super()._check_grid_mask(grid_mask)
+        super()._update_grid(game_user, game_user_two, grid_mask)
 
         raise RaisesResponse(
             data=LumberjackGameSerializer(game_user).data, status=status.HTTP_200_OK
@@ -604,17 +643,131 @@ class LumberjackGameViewMethods(GameView, AbstractLumberjackGame, AbstractGame):
         """
         Обрабатывает клик в игре с учетом всех бустов
         """
-        super().check_energy(game_user, game_user_two, energy_in_click)
-
         income_per_click = super().apply_click_bonuses(
             boosts_data.income_level.value_by_level(boosts_user.income_level)
         )
 
-        super()._process_lumberjack_click(
-            user, game_user, game_user_two, income_per_click, energy_in_click, row, col
+        result = super()._process_lumberjack_click(
+            game_user,
+            game_user_two,
+            boosts_user,
+            income_per_click,
+            energy_in_click,
+            row,
+            col,
+        )
+
+        raise RaisesResponse(
+            data=income_per_click if result == ClickStatus.SUCCESS else 0,
+            status=status.HTTP_200_OK,
         )
 
-        raise RaisesResponse(data=income_per_click, status=status.HTTP_200_OK)
+    @classmethod
+    def click(
+        cls,
+        game_user: Lumberjack_Game,
+        game_user_two: GeoHunter,
+        boosts_user: Sigma_Boosts,
+        energy_in_click: int,
+        row: Optional[int],
+        col: Optional[int],
+        refresh: bool = False,
+    ) -> RaisesResponse:
+        """
+        Клик (или обновление поля) за один запрос:
+        проверка энергии, клик, новое поле и состояние для отрисовки
+        """
+        first_click = super()._prepare_click(game_user, boosts_user)
+        income_per_click = 0
+
+        if game_user.current_energy <= 0:
+            result = ClickStatus.NO_ENERGY
+        elif refresh:
+            super()._update_grid(game_user, game_user_two, grid.generate_mask())
+            result = ClickStatus.REFRESH
+        else:
+            # Если поле пустое - сначала генерируем
+            if not game_user.has_grid:
+                super()._update_grid(game_user, game_user_two, grid.generate_mask())
+
+            income_per_click = super().apply_click_bonuses(
+                boosts_data.income_level.value_by_level(boosts_user.income_level)
+            )
+            result = GameStateService().click_lumberjack(
+                game_user,
+                game_user_two,
+                income_per_click,
+                energy_in_click,
+                super()._recovery_seconds(boosts_user),
+                row,
+                col,
+            )["status"]
+
+        super()._click_state(
+            game_user,
+            boosts_user,
+            result,
+            first_click,
+            income_per_click if result == ClickStatus.SUCCESS else 0,
+        )
+
+    @classmethod
+    def click_many(
+        cls,
+        game_user: Lumberjack_Game,
+        game_user_two: GeoHunter,
+        boosts_user: Sigma_Boosts,
+        energy_in_click: int,
+        cells: List[List[int]],
+    ) -> RaisesResponse:
+        """
+        Пачка кликов, накопленных ботом, за один запрос:
+        каждый клик применяется атомарно, состояние отдаем одно
+        """
+        super()._check_cells(cells)
+        first_click = super()._prepare_click(game_user, boosts_user)
+        if not game_user.has_grid:
+            super()._update_grid(game_user, game_user_two, grid.generate_mask())
+
+        income_per_click = super().apply_click_bonuses(
+            boosts_data.income_level.value_by_level(boosts_user.income_level)
+        )
+        recovery_seconds = super()._recovery_seconds(boosts_user)
+
+        results = []
+        for row, col in cells:
+            if results and results[-1] == ClickStatus.NO_ENERGY:
+                # NOTE энергия кончилась - остальные клики не применяем
+                results.append(ClickStatus.NO_ENERGY)
+                continue
+            results.append(
+                GameStateService().click_lumberjack(
+                    game_user,
+                    game_user_two,
+                    income_per_click,
+                    energy_in_click,
+                    recovery_seconds,
+                    row,
+                    col,
+                )["status"]
+            )
+
+        successes = results.count(ClickStatus.SUCCESS)
+        if successes:
+            result = ClickStatus.SUCCESS
+        elif ClickStatus.NO_ENERGY in results:
+            result = ClickStatus.NO_ENERGY
+        else:
+            result = ClickStatus.MISS
+
+        super()._click_state(
+            game_user,
+            boosts_user,
+            result,
+            first_click,
+            income_per_click * successes,
+            results,
+        )
 
     @classmethod
     def restore_energy(
@@ -625,14 +778,6 @@ class LumberjackGameViewMethods(GameView, AbstractLumberjackGame, AbstractGame):
         """
         super().restore_energy(game_user, game_user_two)
 
-    @classmethod
-    def get_list_correct_clicks(cls) -> List[Lumberjack_Game]:
-        return Lumberjack_Game.objects.filter(
-            total_clicks__gte=0
-        ).values(
-            "user__user_id", "total_clicks"
-        ).order_by('-total_clicks', '-updated_at')
-
 
 class GeoHunterViewMethods(GameView, AbstractGame):
     @classmethod
@@ -654,7 +799,9 @@ class GeoHunterViewMethods(GameView, AbstractGame):
         return GeoHunter.objects.all()
 
     @classmethod
-    def retrieve(cls, game: GeoHunter) -> RaisesResponse:
+    def retrieve(cls, game: GeoHunter, user_boosts: Sigma_Boosts) -> RaisesResponse:
+        GameStateService().overlay(game, counters=True)
+        super()._regenerate_energy(game, user_boosts)
         raise RaisesResponse(GeoHunterSerializer(game).data, status=status.HTTP_200_OK)
 
     @classmethod
@@ -663,6 +810,10 @@ class GeoHunterViewMethods(GameView, AbstractGame):
             GeoHunterSerializer(games, many=True).data, status=status.HTTP_200_OK
         )
 
+    @classmethod
+    def pending_energy(cls, cursor: int, limit: int) -> RaisesResponse:
+        super()._pending_energy(cls.all(), cursor, limit)
+
     @classmethod
     def game_state(
         cls, game_user: Sigma_Boosts, user_boosts: Lumberjack_Game
@@ -682,16 +833,14 @@ class GeoHunterViewMethods(GameView, AbstractGame):
         """
         Обрабатывает клик в игре с учетом всех бустов
         """
-        super().check_energy(game_user, game_user_two, energy_in_click)
-
         income_per_click = super().apply_click_bonuses(
             boosts_data.income_level.value_by_level(boosts_user.income_level)
         )
 
         super()._process_geohunter_click(
-            user,
             game_user,
             game_user_two,
+            boosts_user,
             income_per_click,
             energy_in_click,
             user_choice,
@@ -701,6 +850,46 @@ class GeoHunterViewMethods(GameView, AbstractGame):
             GeoHunterSerializer(game_user).data, status=status.HTTP_200_OK
         )
 
+    @classmethod
+    def answer(
+        cls,
+        game_user: GeoHunter,
+        game_user_two: Lumberjack_Game,
+        boosts_user: Sigma_Boosts,
+        energy_in_click: int,
+        user_choice: bool,
+    ) -> RaisesResponse:
+        """
+        Ответ за один запрос:
+        проверка энергии, ответ и состояние для отрисовки
+        """
+        first_click = super()._prepare_click(game_user, boosts_user)
+        income_per_click = 0
+        result = ClickStatus.NO_ENERGY
+
+        if game_user.current_energy > 0:
+            income_per_click = super().apply_click_bonuses(
+                boosts_data.income_level.value_by_level(boosts_user.income_level)
+            )
+            result = GameStateService().click_geohunter(
+                game_user_two,
+                game_user,
+                income_per_click,
+                energy_in_click,
+                super()._recovery_seconds(boosts_user),
+                user_choice,
+            )["status"]
+            if result == ClickStatus.SUCCESS and not user_choice:
+                result = ClickStatus.MISS
+
+        super()._click_state(
+            game_user,
+            boosts_user,
+            result,
+            first_click,
+            income_per_click if result == ClickStatus.SUCCESS else 0,
+        )
+
     @classmethod
     def restore_energy(
         cls, game_user: GeoHunter, game_user_two: Lumberjack_Game
@@ -710,14 +899,6 @@ class GeoHunterViewMethods(GameView, AbstractGame):
         """
         super().restore_energy(game_user, game_user_two)
 
-    @classmethod
-    def get_list_correct_answers(cls) -> List[Dict]:
-        return GeoHunter.objects.filter(
-            total_true__gte=0
-        ).values(
-            "total_true", "user__user_id"
-        ).order_by('-total_true', '-updated_at')
-
 
 # NOTE новая фича
 class InteractiveGameMethods:
@@ -887,8 +1068,7 @@ class InteractiveGameMethods:
             if game_data.user.user_id in winers:
                 game_data.result = "win"
                 game_data.reward_starcoins = reward
-                game.user.starcoins += reward
-                game.user.save()
+                BalanceService().credit(game.user, reward)
             else:
                 game_data.result = "lose"
 
@@ -1,8 +1,12 @@
 from datetime import datetime
 from typing import Any, Dict, List, Optional, Union
 
+from bot.service.balance import BalanceService
+from bot.service.economy import EconomyService
+from bot.service.game_state import GameStateService
+from bot.service.passive_income import PassiveIncomeService
 from django.contrib.contenttypes.models import ContentType
-from django.db.models import Q
+from django.db.models import F, Q
 from django.utils import timezone
 from loguru import logger
 from rest_framework import status
@@ -33,22 +37,33 @@ class UserMethods:
         user_id: Optional[int] = None,
         phone: Optional[str] = None,
         nickname: Optional[str] = None,
+        settle: bool = False,
     ) -> Union[Users, Response]:
-        """Получить пользователя"""
+        """
+        Получить пользователя
+        settle - начислить пассивный доход (эндпоинты, которые
+        показывают или списывают баланс)
+        """
         try:
             if pk is not None:
-                return Users.objects.get(pk=pk)
+                user = Users.objects.get(pk=pk)
             elif user_id is not None:
-                return Users.objects.get(user_id=user_id)
+                user = Users.objects.get(user_id=user_id)
             elif phone is not None:
-                return Users.objects.get(phone=phone)
+                user = Users.objects.get(phone=phone)
             elif nickname is not None:
-                return Users.objects.get(_nickname=nickname)
+                user = Users.objects.get(_nickname=nickname)
+            else:
+                return None
         except Users.DoesNotExist:
             raise RaisesResponse(
                 data={"error": "User not found"}, status=status.HTTP_404_NOT_FOUND
             )
 
+        if settle:
+            PassiveIncomeService().settle(user)
+        return user
+
     @classmethod
     def filter(
         cls,
@@ -101,6 +116,32 @@ class UserMethods:
         count = Users.objects.filter(referral_user_id=pk, authorised=True).count()
         raise RaisesResponse(data=count, status=status.HTTP_200_OK)
 
+    @classmethod
+    def context(cls, user_id: int, username: Optional[str] = None) -> Response:
+        """
+        Все, что нужно боту на апдейт, одним ответом: пользователь
+        и кол-во рефералов (один SQL + начисление пассивки).
+        username пишем, только если он изменился
+        """
+        economy = EconomyService().load(user_id=user_id, referrals=True)
+        user = economy.user
+        PassiveIncomeService().settle(user)
+
+        if username and user.tg_username != username:
+            Users.objects.filter(pk=user.pk).update(tg_username=username)
+            user.tg_username = username
+
+        # NOTE баланс с еще не записанными из кликера starcoins (только для ответа)
+        user._starcoins += GameStateService().pending_starcoins(user.pk)
+
+        raise RaisesResponse(
+            data={
+                "user": UserSerializer(user).data,
+                "referral_count": user.referral_count,
+            },
+            status=status.HTTP_200_OK,
+        )
+
     @classmethod
     def complete_registration(
         cls, user: Users, state_data: Dict, rollback: Optional[bool]
@@ -118,7 +159,8 @@ class UserMethods:
                 game_user.current_energy = (
                     boosts_data.energy_capacity_level.value_by_level(0)
                 )
-                game_user.save()
+                game_user.save(update_fields=GameStateService.ENERGY_FIELDS)
+                GameStateService().sync_game(game_user)
 
         # Обновление данных пользователя
         user.role = state_data["role"]
@@ -139,7 +181,21 @@ class UserMethods:
             else state_data.get("authorised_at")
         )
 
-        user.save()
+        # NOTE баланс не пишем: его меняют условные UPDATE и флашер игр
+        user.save(
+            update_fields=[
+                "_role",
+                "gender",
+                "_age",
+                "name",
+                "supername",
+                "_nickname",
+                "phone",
+                "authorised",
+                "_authorised_at",
+                "updated_at",
+            ]
+        )
 
         raise RaisesResponse(data=UserSerializer(user).data, status=status.HTTP_200_OK)
 
@@ -147,7 +203,7 @@ class UserMethods:
     def update_telegram_username(cls, user: Users, username: str) -> Response:
         """Обновить Telegram username пользователя"""
         user.tg_username = username
-        user.save()
+        user.save(update_fields=["tg_username", "updated_at"])
         raise RaisesResponse(
             data={
                 "success": True,
@@ -162,8 +218,14 @@ class UserMethods:
         """Обновить баланс пользователя"""
         try:
             logger.debug(type(new_balance))
-            user.starcoins = float(new_balance)
-            user.save()
+            new_balance = float(new_balance)
+
+            # NOTE баланс задается целиком - сперва переносим заработанное
+            # в кликере, иначе флашер добавит его поверх нового значения
+            GameStateService().flush(user_pks=[user.pk])
+            user.refresh_from_db(fields=["_starcoins", "all_starcoins"])
+            user.starcoins = new_balance
+            user.save(update_fields=["_starcoins", "all_starcoins", "updated_at"])
 
             raise RaisesResponse(data=user.starcoins, status=status.HTTP_200_OK)
         except ValueError:
@@ -177,7 +239,7 @@ class UserMethods:
         """Баним или разбаним пользователя"""
         try:
             user.ban = ban
-            user.save()
+            user.save(update_fields=["ban", "updated_at"])
 
             raise RaisesResponse(data=True, status=status.HTTP_200_OK)
         except ValueError:
@@ -199,7 +261,7 @@ class UserMethods:
     def update_vk_id(cls, user: Users, vk_id: int) -> Response:
         """Обновить VK ID пользователя"""
         user.vk_id = vk_id
-        user.save()
+        user.save(update_fields=["vk_id", "updated_at"])
 
         raise RaisesResponse(data=True, status=status.HTTP_200_OK)
 
@@ -235,9 +297,8 @@ class UserMethods:
         use_quest = UseQuests.objects.filter(user=user, quest=quest).first()
 
         user.vk_id = None
-        user.all_starcoins -= quest.quest_data.reward_starcoins
-        user.starcoins -= quest.quest_data.reward_starcoins
-        user.save()
+        user.save(update_fields=["vk_id", "updated_at"])
+        BalanceService().revoke(user, quest.quest_data.reward_starcoins)
 
         use_quest.delete()
 
@@ -283,40 +344,15 @@ class UserMethods:
 
     @classmethod
     def delete_purch(cls, user: Users, cost: float) -> None:
-        user.purchases -= 1
-        
+        old_balance = user._starcoins
+        Users.objects.filter(pk=user.pk).update(purchases=F("purchases") - 1)
+        BalanceService().refund(user, cost)
+
         logger.info(
             "Change Balance: UserID:{0} |Old Balance:{1} |New Balance:{2} |Edit:{3}".format(
-                user.user_id, user._starcoins, user._starcoins + cost, cost
+                user.user_id, old_balance, user._starcoins, cost
             )
         )
-        user._starcoins += cost
-        
-        user.save()
-
-    @classmethod
-    def get_list_all_starcoins(cls) -> List[Dict[str, int]]:
-        """
-        Возвращает все Users для user:
-        [{'all_starcoins': 5, 'user_id': 123}, {'all_starcoins': 3, 'user_id': 456}, ...]
-        Сортировка: all_starcoins DESC, updated_at DESC
-        """
-        queryset = Users.objects.values(
-            'all_starcoins', 'user_id'
-        ).order_by('-all_starcoins', '-updated_at')
-        
-        return list(queryset)  # Пустой список [], если ничего не найдено
-
-    @classmethod
-    def get_users_referral_ids(cls) -> List[Dict[str,int]]:
-        """
-        Возвращаем все referral_user_id
-        """
-        data = Users.objects.filter(
-            referral_user_id__isnull=False,
-            authorised=True
-        ).values('referral_user_id')
-        return list(data)
 
 
 class ReferralConnectionsMethods:
@@ -331,7 +367,7 @@ class ReferralConnectionsMethods:
         if not referer_user:
             logger.error(f"{user.referral_user_id}")
             user.referral_user_id = None
-            user.save()
+            user.save(update_fields=["referral_user_id", "updated_at"])
             raise RaisesResponse(
                 data={"error": "User not found"}, status=status.HTTP_404_NOT_FOUND
             )
@@ -350,12 +386,8 @@ class ReferralConnectionsMethods:
             )
 
             # Update balances
-            referer_user.starcoins += reward_data.starcoins_for_referer
-            user.starcoins += reward_data.starcoins_for_referal
-
-            # Save changes
-            referer_user.save()
-            user.save()
+            BalanceService().credit(referer_user, reward_data.starcoins_for_referer)
+            BalanceService().credit(user, reward_data.starcoins_for_referal)
             new_ref_connection = True
 
         raise RaisesResponse(
@@ -405,7 +437,8 @@ class FamilyTiesMethods:
                 game.current_energy = boosts_data.energy_capacity_level.value_by_level(
                     0
                 )
-                game.save()
+                game.save(update_fields=GameStateService.ENERGY_FIELDS)
+                GameStateService().sync_game(game)
 
         return Family_Ties.objects.create(from_user=from_user, to_user=to_user)
 
@@ -425,8 +458,7 @@ class FamilyTiesMethods:
                 if not cls._tie_exists(relative, to_user):
                     cls._create_family_tie(from_user=relative, to_user=to_user)
         else:
-            from_user.starcoins += reward_data.starcoins_parent_bonus
-            from_user.save()
+            BalanceService().credit(from_user, reward_data.starcoins_parent_bonus)
 
         # Связываем всех родственников to_user с from_user
         to_user_ties = cls._get_direct_relatives(to_user)
@@ -435,8 +467,7 @@ class FamilyTiesMethods:
                 if not cls._tie_exists(from_user, relative):
                     cls._create_family_tie(from_user=from_user, to_user=relative)
         else:
-            to_user.starcoins += reward_data.starcoins_parent_bonus
-            to_user.save()
+            BalanceService().credit(to_user, reward_data.starcoins_parent_bonus)
 
         tie = cls._create_family_tie(from_user=from_user, to_user=to_user)
 
@@ -500,11 +531,11 @@ class WorkKeysMethods:
 
 class RangsMethods:
     @classmethod
-    def role(cls, role: str) -> Response:
+    def role(cls, role: str) -> List[Dict[str, Any]]:
+        """Ранги роли и общие (кэширует CatalogCache)"""
         rangs = (
             Rangs.objects.filter(Q(_role=role) | Q(_role__isnull=True))
             .order_by("all_starcoins")
             .all()
         )
-        serializer = RangsSerializer(rangs, many=True)
-        raise RaisesResponse(data=serializer.data, status=status.HTTP_200_OK)
+        return RangsSerializer(rangs, many=True).data
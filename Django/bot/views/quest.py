@@ -2,7 +2,20 @@ from datetime import timedelta
 from typing import Any, Dict, List, Optional, Union
 
 import pytz
-from django.db.models import Q, Sum
+from bot.service.balance import BalanceService
+from bot.service.quest_cache import ActiveQuestsCache
+from django.db.models import (
+    Case,
+    Count,
+    F,
+    IntegerField,
+    OuterRef,
+    Q,
+    Subquery,
+    Sum,
+    When,
+)
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 from loguru import logger
 from rest_framework import status
@@ -10,6 +23,7 @@ from rest_framework.response import Response
 
 from ..models import (
     DailyQuests,
+    IdeaQuests,
     QuestModerationAttempt,
     Quests,
     Rangs,
@@ -149,64 +163,107 @@ class QuestMethods:
 
     @classmethod
     def active(cls, user: Users, rang: Rangs) -> Response:
-        quests = []
+        """
+        Доступные пользователю квесты (кэш ActiveQuestsCache)
+        """
+        cache = ActiveQuestsCache()
+        field = cache.field(user, rang)
+        data = cache.get(user, field) if field else None
+        if data is None:
+            data = QuestsSerializer(cls.available(user, rang), many=True).data
+            if field:
+                cache.set(user, field, data)
+
+        raise RaisesResponse(data=data, status=status.HTTP_200_OK)
+
+    @classmethod
+    def available(cls, user: Users, rang: Rangs) -> List[Quests]:
+        """
+        Одним запросом: выполнение пользователя и попытки на модерации -
+        подзапросами, лимит и награда квеста - подзапросами по типу квеста,
+        сортировка - в SQL (подписки, daily, идеи; награда по убыванию)
+        """
+        use_quests = UseQuests.objects.filter(user=user, quest=OuterRef("pk")).order_by(
+            "pk"
+        )
+        pending = (
+            QuestModerationAttempt.objects.filter(
+                use_quest=OuterRef("use_id"), moderation_status="pending"
+            )
+            .order_by()
+            .values("use_quest")
+            .annotate(count=Count("pk"))
+            .values("count")
+        )
+        # NOTE daily открывается заново с началом суток по UTC
+        today = timezone.now().replace(hour=0, minute=0, second=0, microsecond=0)
 
-        # Сначала получаем все подходящие квесты
-        filtered_quests = (
+        quests = (
             Quests.objects.filter(
                 active=True,
                 min_rang_level__lte=rang.level,
                 max_rang_level__gte=rang.level,
             )
             .filter(Q(role=user._role) | Q(role__isnull=True))
+            .annotate(
+                use_id=Subquery(use_quests.values("pk")[:1]),
+                use_updated=Subquery(use_quests.values("updated_at")[:1]),
+                used=Coalesce(Subquery(use_quests.values("count_use")[:1]), 0)
+                + Coalesce(Subquery(pending, output_field=IntegerField()), 0),
+                limit=Case(
+                    When(
+                        type_quest="idea",
+                        then=cls._quest_data(IdeaQuests, "count_use"),
+                    ),
+                    When(
+                        type_quest="daily",
+                        then=cls._quest_data(DailyQuests, "count_use"),
+                    ),
+                ),
+                reward=Coalesce(
+                    Case(
+                        When(
+                            type_quest="subscribe",
+                            then=cls._quest_data(SubscribeQuest, "_reward_starcoins"),
+                        ),
+                        When(
+                            type_quest="idea",
+                            then=cls._quest_data(IdeaQuests, "_reward_starcoins"),
+                        ),
+                        When(
+                            type_quest="daily",
+                            then=cls._quest_data(DailyQuests, "_reward_starcoins"),
+                        ),
+                    ),
+                    0.0,
+                ),
+                type_order=Case(
+                    When(type_quest="subscribe", then=1),
+                    When(type_quest="daily", then=2),
+                    When(type_quest="idea", then=3),
+                    default=4,
+                ),
+            )
+            .filter(
+                Q(use_id__isnull=True)
+                | (
+                    Q(type_quest__in=["idea", "daily"])
+                    & (Q(limit__isnull=True) | Q(limit=0) | Q(limit__gt=F("used")))
+                    & (Q(type_quest="idea") | Q(use_updated__lt=today))
+                )
+            )
+            .order_by("type_order", "-reward", "pk")
             .select_related("content_type")
+            .prefetch_related("quest_data")
         )
+        return list(quests)
 
-        # Сортируем в Python после получения всех данных
-        sorted_quests = sorted(
-            filtered_quests,
-            key=lambda x: (
-                {"subscribe": 1, "daily": 2, "idea": 3}.get(x.type_quest, 4),
-                (
-                    -getattr(getattr(x, "quest_data", None), "reward_starcoins", 0)
-                    if hasattr(x, "quest_data") and x.quest_data
-                    else 0
-                ),
-            ),
+    @staticmethod
+    def _quest_data(model: Any, field: str) -> Subquery:
+        return Subquery(
+            model.objects.filter(pk=OuterRef("object_id")).values(field)[:1]
         )
 
-        for quest in sorted_quests:
-            user_quests = UseQuests.objects.filter(user=user, quest=quest).first()
-            if not user_quests:
-                quests.append(quest)
-
-            elif quest.type_quest in ["idea", "daily"]:
-                count_use: Optional[int] = quest.quest_data.count_use
-
-                if count_use:
-                    attempt = QuestModerationAttempt.objects.filter(
-                        use_quest=user_quests, moderation_status="pending"
-                    ).all()
-                    if attempt:
-                        user_quests.count_use += len(attempt)
-
-                    if count_use <= user_quests.count_use:
-                        continue
-
-                if quest.type_quest == "daily":
-                    # moscow_tz = pytz.timezone('Europe/Moscow')
-                    last_update_date = (
-                        user_quests.updated_at.date()
-                    )  # .astimezone(moscow_tz)
-                    current_date = timezone.now().date()  # .astimezone(moscow_tz)
-                    if current_date <= last_update_date:
-                        continue
-
-                quests.append(quest)
-
-        serializer = QuestsSerializer(quests, many=True)
-        raise RaisesResponse(data=serializer.data, status=status.HTTP_200_OK)
-
 
 class UseQuestMethods:
     @classmethod
@@ -260,8 +317,7 @@ class UseQuestMethods:
 
         dop_quest = quest.quest_data
         reward = dop_quest.reward_starcoins
-        user.starcoins += reward
-        user.save()
+        BalanceService().credit(user, reward)
 
         if quest.type_quest == "idea":
             serializer = IdeaQuestsSerializer(dop_quest)
@@ -338,8 +394,7 @@ class UseQuestMethods:
             else:
                 add_starcoins = quest.quest_data.reward_starcoins
 
-            user.starcoins += add_starcoins
-            user.save()
+            BalanceService().credit(user, add_starcoins)
             result = add_starcoins
         else:
             QuestModerationAttempt.objects.create(
@@ -374,9 +429,7 @@ class UseQuestMethods:
     def back_tg_quest(
         cls, user: Users, quest: Quests, use_quest: UseQuests
     ) -> Response:
-        user.all_starcoins -= quest.quest_data.reward_starcoins
-        user.starcoins -= quest.quest_data.reward_starcoins
-        user.save()
+        BalanceService().revoke(user, quest.quest_data.reward_starcoins)
 
         use_quest.delete()
 
@@ -384,34 +437,6 @@ class UseQuestMethods:
 
         raise RaisesResponse(data=True, status=status.HTTP_200_OK)
 
-    @classmethod
-    def get_all_daily_login(cls, quest: Quests) -> List[Dict[str, int]]:
-        """
-        Возвращает все UseQuests для quest:
-        [{'count_use': 5, 'user_id': 123}, {'count_use': 3, 'user_id': 456}, ...]
-        Сортировка: count_use DESC, updated_at DESC
-        """
-        queryset = UseQuests.objects.filter(quest=quest).select_related('user').values(
-            'count_use', 'user__user_id'
-        ).order_by('-count_use', '-updated_at')
-        
-        return list(queryset)  # Пустой список [], если ничего не найдено
-
-    @classmethod
-    def get_all_completed_quests(cls, exclude_quest: Quests) -> List[Dict[str, int]]:
-        """
-        Сумма count_use всех квестов кроме exclude_quest по каждому пользователю.
-        [{'user_id': 123, 'total_count': 25}, {'user_id': 456, 'total_count': 18}]
-        Сортировка: total_count DESC
-        """
-        queryset = UseQuests.objects.exclude(
-            quest=exclude_quest
-        ).values(
-            'user__user_id', 'count_use'
-        )
-
-        return list(queryset)
-
 
 class Quest_MA_Methods:
     @classmethod
@@ -442,8 +467,7 @@ class Quest_MA_Methods:
         else:
             add_starcoins = quest.quest_data.reward_starcoins
 
-        user.starcoins += add_starcoins
-        user.save()
+        BalanceService().credit(user, add_starcoins)
 
         logger.debug(f"success_idea_daily +{add_starcoins} -> {attempt=}")
         raise RaisesResponse(data=add_starcoins, status=status.HTTP_200_OK)
@@ -1,6 +1,11 @@
 from datetime import datetime
 from typing import List, Optional, Union
 
+from bot.service.balance import BalanceService
+from bot.service.catalog_cache import CatalogCache
+from conf.settings import DEBUG
+from django.db import transaction
+from django.db.models import F
 from rest_framework import status
 from rest_framework.response import Response
 
@@ -40,6 +45,7 @@ class PurchasesMethods:
     def create(
         cls,
         user: Users,
+        product: Pikmi_Shop,
         title: str,
         description: str,
         cost: int,
@@ -51,17 +57,24 @@ class PurchasesMethods:
                 status=status.HTTP_404_NOT_FOUND,
             )
 
-        purchase = Purchases.objects.create(
-            user=user,
-            title=title,
-            description=description,
-            cost=cost,
-            delivery_data=delivery_data
-        )
-
-        user.starcoins -= purchase.cost
-        user.purchases += 1
-        user.save()
+        # NOTE остаток и баланс - условными UPDATE,
+        # отказ любого из них откатывает покупку целиком
+        with transaction.atomic():
+            Pikmi_ShopMethods.buy(product)
+            if not BalanceService().debit(user, cost, overdraft=DEBUG):
+                raise RaisesResponse(
+                    data={"error": "not_enough_starcoins"},
+                    status=status.HTTP_404_NOT_FOUND,
+                )
+            Users.objects.filter(pk=user.pk).update(purchases=F("purchases") + 1)
+
+            purchase = Purchases.objects.create(
+                user=user,
+                title=title,
+                description=description,
+                cost=cost,
+                delivery_data=delivery_data
+            )
 
         # return PurchasesSerializer(purchase).data
 
@@ -167,6 +180,14 @@ class Pikmi_ShopMethods:
     def buy(
         cls,
         product: Pikmi_Shop
-    ) -> List[Pikmi_Shop]:
+    ) -> None:
+        """Списать единицу товара (UPDATE ... WHERE quantity > 0)"""
+        if not Pikmi_Shop.objects.filter(pk=product.pk, quantity__gt=0).update(
+            quantity=F("quantity") - 1
+        ):
+            raise RaisesResponse(
+                data={"error": "no_quantity"}, status=status.HTTP_404_NOT_FOUND
+            )
         product.quantity -= 1
-        product.save()
+        # NOTE остаток есть в каталоге, UPDATE мимо сигналов save()
+        CatalogCache().bump("pikmi_shop")
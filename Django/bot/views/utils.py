@@ -9,7 +9,10 @@ from loguru import logger
 from rest_framework import status
 from rest_framework.response import Response
 
-from bot.service.exceptions import DuplicateOperationException
+from bot.service.exceptions import (
+    DuplicateOperationException,
+    FlushLockTimeoutException,
+)
 from bot.service.idempotency import Idempotency
 
 from .error import RaisesResponse
@@ -150,6 +153,11 @@ def queue_request(func):
         except DuplicateOperationException as e:
             logger.error(e)
             return Response(data=e.detail, status=status.HTTP_409_CONFLICT)
+        except FlushLockTimeoutException as e:
+            logger.error(e)
+            return Response(
+                data={"error": e.detail}, status=status.HTTP_503_SERVICE_UNAVAILABLE
+            )
         except RaisesResponse as e:
             # NOTE почти всегда ответ возвращается через эту ошибку
             logger.error(e)
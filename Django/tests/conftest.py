@@ -4,6 +4,8 @@ from unittest.mock import MagicMock, Mock, patch
 
 import django
 import pytest
+from bot.models import GeoHunter, Lumberjack_Game, Sigma_Boosts, Users
+from bot.service.game_state import GameStateService
 from mimesis import Field, Locale, Schema
 
 # from bot.models import Users, Sigma_Boosts, Lumberjack_Game, GeoHunter, Bonuses
@@ -75,3 +77,22 @@ def fake_user_data():
     )
     base_data = schema.create()
     return {**base_data[0]}
+
+
+@pytest.fixture
+def player(db):
+    """Пользователь с бустами и обеими играми"""
+    user = Users.objects.create(user_id=100001, _starcoins=10.0, all_starcoins=10.0)
+    Sigma_Boosts.objects.create(user=user)
+    Lumberjack_Game.objects.create(user=user, current_energy=100, max_energy=100)
+    GeoHunter.objects.create(user=user, current_energy=100, max_energy=100)
+    return user
+
+
+@pytest.fixture
+def game_state(player):
+    """Состояние игр игрока в Redis, после теста удаляем"""
+    service = GameStateService()
+    service.drop([player.pk])
+    yield service
+    service.drop([player.pk])
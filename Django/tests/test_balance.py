@@ -0,0 +1,140 @@
+# tests/test_balance.py
+from datetime import timedelta
+
+import pytest
+from bot.models import Sigma_Boosts, Users
+from bot.service.balance import BalanceService
+from bot.views.error import RaisesResponse
+from bot.views.game import SigmaBoostsMethods
+from django.utils import timezone
+
+
+class TestBalanceService:
+    """Тесты атомарных изменений баланса"""
+
+    @pytest.mark.django_db
+    def test_credit(self, player):
+        """Начисление поднимает баланс и заработанное"""
+        BalanceService().credit(player, 5.5)
+
+        assert player._starcoins == 15.5
+        assert player.all_starcoins == 15.5
+        player.refresh_from_db()
+        assert player._starcoins == 15.5
+        assert player.all_starcoins == 15.5
+
+    @pytest.mark.django_db
+    def test_debit(self, player):
+        """Списание не трогает заработанное"""
+        assert BalanceService().debit(player, 4)
+
+        player.refresh_from_db()
+        assert player._starcoins == 6
+        assert player.all_starcoins == 10
+
+    @pytest.mark.django_db
+    def test_debit_refuses_overdraft(self, player):
+        """Списание больше баланса - отказ, баланс не меняется"""
+        assert not BalanceService().debit(player, 10.5)
+
+        player.refresh_from_db()
+        assert player._starcoins == 10
+
+    @pytest.mark.django_db
+    def test_debit_checks_database_balance(self, player):
+        """Условие проверяется по балансу в БД, а не в объекте"""
+        Users.objects.filter(pk=player.pk).update(_starcoins=3.0)
+
+        assert not BalanceService().debit(player, 5)
+        assert Users.objects.get(pk=player.pk)._starcoins == 3
+
+    @pytest.mark.django_db
+    def test_debit_overdraft(self, player):
+        """overdraft=True (DEBUG) разрешает уйти в минус"""
+        assert BalanceService().debit(player, 11, overdraft=True)
+
+        player.refresh_from_db()
+        assert player._starcoins == -1
+
+    @pytest.mark.django_db
+    def test_concurrent_credit_not_lost(self, player):
+        """Начисление по устаревшему объекту не затирает чужое"""
+        stale = Users.objects.get(pk=player.pk)
+        BalanceService().credit(player, 2)
+        BalanceService().credit(stale, 3)
+
+        player.refresh_from_db()
+        assert player._starcoins == 15
+        assert player.all_starcoins == 15
+
+    @pytest.mark.django_db
+    def test_refund(self, player):
+        """Возврат покупки не считается заработком"""
+        BalanceService().refund(player, 3)
+
+        player.refresh_from_db()
+        assert player._starcoins == 13
+        assert player.all_starcoins == 10
+
+    @pytest.mark.django_db
+    def test_revoke(self, player):
+        """Отмена награды снимает и баланс, и заработанное"""
+        BalanceService().revoke(player, 4)
+
+        player.refresh_from_db()
+        assert player._starcoins == 6
+        assert player.all_starcoins == 6
+
+
+class TestUpgradeBoost:
+    """Тесты условного повышения уровня буста"""
+
+    @pytest.mark.django_db
+    def test_upgrade(self, player):
+        """Уровень поднимается на один"""
+        boosts = Sigma_Boosts.objects.get(user=player)
+        SigmaBoostsMethods._upgrade_boost(boosts, "income_level", 0)
+
+        assert Sigma_Boosts.objects.get(pk=boosts.pk).income_level == 1
+
+    @pytest.mark.django_db
+    def test_upgrade_stale_level(self, player):
+        """Параллельный запрос уже поднял уровень - отказ"""
+        boosts = Sigma_Boosts.objects.get(user=player)
+        Sigma_Boosts.objects.filter(pk=boosts.pk).update(income_level=1)
+
+        with pytest.raises(RaisesResponse):
+            SigmaBoostsMethods._upgrade_boost(boosts, "income_level", 0)
+        assert Sigma_Boosts.objects.get(pk=boosts.pk).income_level == 1
+
+    @pytest.mark.django_db
+    def test_first_passive_level_sets_claim(self, player):
+        """Первый уровень пассивки - отсчет дохода с текущего момента"""
+        claim = timezone.now() - timedelta(days=3)
+        Sigma_Boosts.objects.filter(user=player).update(_last_passive_claim=claim)
+        boosts = Sigma_Boosts.objects.get(user=player)
+
+        SigmaBoostsMethods._upgrade_boost(boosts, "passive_income_level", 0)
+
+        boosts.refresh_from_db()
+        assert boosts.passive_income_level == 1
+        assert boosts._last_passive_claim > claim
+
+    @pytest.mark.django_db
+    @pytest.mark.parametrize(
+        "name, level",
+        [("passive_income_level", 1), ("income_level", 0)],
+    )
+    def test_upgrade_keeps_claim(self, player, name, level):
+        """Остальные повышения не трогают отметку зачисления"""
+        claim = timezone.now() - timedelta(hours=5)
+        Sigma_Boosts.objects.filter(user=player).update(
+            _last_passive_claim=claim, **{name: level}
+        )
+        boosts = Sigma_Boosts.objects.get(user=player)
+
+        SigmaBoostsMethods._upgrade_boost(boosts, name, level)
+
+        boosts.refresh_from_db()
+        assert getattr(boosts, name) == level + 1
+        assert boosts._last_passive_claim == claim
@@ -0,0 +1,80 @@
+# tests/test_catalog_cache.py
+import json
+from unittest.mock import Mock, patch
+
+import pytest
+from bot.service.catalog_cache import CatalogCache
+from Redis.main import RedisManager
+
+CATALOG = "test_catalog"
+
+
+@pytest.fixture
+def catalog():
+    """Каталог с чистой версией в Redis и без ответов в памяти"""
+    key = CatalogCache.VERSION_KEY.format(name=CATALOG)
+    RedisManager().get_redis().delete(key)
+    CatalogCache._payloads.clear()
+    yield CatalogCache()
+    RedisManager().get_redis().delete(key)
+    CatalogCache._payloads.clear()
+
+
+class TestCatalogCache:
+    """Тесты готовых ответов каталогов с ETag"""
+
+    def test_response_cached(self, catalog, rf):
+        """Ответ собирается один раз на версию"""
+        build = Mock(return_value=[{"id": 1}])
+
+        first = catalog.response(rf.get("/"), CATALOG, "child", build)
+        second = catalog.response(rf.get("/"), CATALOG, "child", build)
+
+        assert first.status_code == second.status_code == 200
+        assert first["ETag"] == f'"{CATALOG}:child:0"'
+        assert json.loads(second.content) == [{"id": 1}]
+        build.assert_called_once()
+
+    def test_response_by_key(self, catalog, rf):
+        """Разные параметры запроса - разные ответы"""
+        catalog.response(rf.get("/"), CATALOG, "child", lambda: ["child"])
+        response = catalog.response(rf.get("/"), CATALOG, "parent", lambda: ["parent"])
+
+        assert json.loads(response.content) == ["parent"]
+        assert response["ETag"] == f'"{CATALOG}:parent:0"'
+
+    def test_not_modified(self, catalog, rf):
+        """Клиент прислал актуальный ETag - 304 без сборки"""
+        build = Mock(return_value=[])
+        request = rf.get("/", HTTP_IF_NONE_MATCH=f'"{CATALOG}:child:0"')
+
+        response = catalog.response(request, CATALOG, "child", build)
+
+        assert response.status_code == 304
+        assert response["ETag"] == f'"{CATALOG}:child:0"'
+        build.assert_not_called()
+
+    @pytest.mark.django_db
+    def test_bump(self, catalog, rf, django_capture_on_commit_callbacks):
+        """Новая версия после коммита - старый ETag устарел, ответ пересобран"""
+        build = Mock(side_effect=[["old"], ["new"]])
+        catalog.response(rf.get("/"), CATALOG, "child", build)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            catalog.bump(CATALOG)
+
+        request = rf.get("/", HTTP_IF_NONE_MATCH=f'"{CATALOG}:child:0"')
+        response = catalog.response(request, CATALOG, "child", build)
+
+        assert response.status_code == 200
+        assert response["ETag"] == f'"{CATALOG}:child:1"'
+        assert json.loads(response.content) == ["new"]
+
+    def test_redis_unavailable(self, catalog, rf):
+        """Без Redis отдаем ответ из БД без ETag"""
+        with patch.object(CatalogCache, "version", side_effect=ConnectionError):
+            response = catalog.response(rf.get("/"), CATALOG, "child", lambda: [1])
+
+        assert response.status_code == 200
+        assert json.loads(response.content) == [1]
+        assert not response.has_header("ETag")
@@ -0,0 +1,53 @@
+# tests/test_context.py
+from datetime import timedelta
+
+import pytest
+from bot.models import GeoHunter, Lumberjack_Game, Sigma_Boosts, Users
+from bot.views.error import RaisesResponse
+from bot.views.personal import UserMethods
+from django.utils import timezone
+
+
+def context(user: Users) -> dict:
+    with pytest.raises(RaisesResponse) as response:
+        UserMethods.context(user.user_id)
+    return response.value.data
+
+
+class TestUserContext:
+    """Тесты ответа бота на апдейт"""
+
+    @pytest.mark.django_db
+    def test_context(self, player):
+        """Пользователь и авторизованные рефералы"""
+        Users.objects.create(user_id=2, referral_user_id=player.user_id, authorised=True)
+
+        data = context(player)
+
+        assert set(data) == {"user", "referral_count"}
+        assert data["user"]["starcoins"] == 10
+        assert data["referral_count"] == 1
+
+    @pytest.mark.django_db
+    def test_context_pending_once(self, player, game_state):
+        """Не записанные из кликера starcoins в балансе ровно один раз"""
+        jack = Lumberjack_Game.objects.get(user=player)
+        geo = GeoHunter.objects.get(user=player)
+        game_state.click_geohunter(jack, geo, 1.5, 10, 3600, user_choice=True)
+
+        assert context(player)["user"]["starcoins"] == 11.5
+
+        game_state.flush(user_pks=[player.pk])
+        assert context(player)["user"]["starcoins"] == 11.5
+
+    @pytest.mark.django_db
+    def test_context_settles_passive_income(self, player):
+        """Накопившийся пассивный доход зачисляется при чтении"""
+        Sigma_Boosts.objects.filter(user=player).update(
+            passive_income_level=1,
+            _last_passive_claim=timezone.now() - timedelta(hours=1, minutes=5),
+        )
+
+        assert context(player)["user"]["starcoins"] == 10.2
+        player.refresh_from_db()
+        assert player._starcoins == 10.2
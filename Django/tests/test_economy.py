@@ -0,0 +1,75 @@
+# tests/test_economy.py
+from datetime import timedelta
+
+import pytest
+from bot.models import GeoHunter, Lumberjack_Game, Sigma_Boosts, Users
+from bot.schemas import boosts_data
+
+# NOTE сервис загружается через bot.views (иначе циклический импорт)
+from bot.views.error import RaisesResponse
+from bot.service.economy import EconomyService  # isort: skip
+from django.utils import timezone
+
+
+class TestEconomyService:
+    """Тесты загрузки экономики игрока одним запросом"""
+
+    @pytest.mark.django_db
+    def test_load_one_query(self, player, django_assert_num_queries):
+        """Пользователь, бусты и обе игры - один запрос"""
+        with django_assert_num_queries(1):
+            economy = EconomyService().load(pk=player.pk)
+
+        assert economy.user.pk == player.pk
+        assert economy.boosts.user_id == player.pk
+        assert economy.jack.current_energy == 100
+        assert economy.geo.current_energy == 100
+        assert economy.jack.user is economy.user
+
+    @pytest.mark.django_db
+    def test_load_referrals(self, player, django_assert_num_queries):
+        """Приглашенные считаются в том же запросе, только авторизованные"""
+        Users.objects.create(user_id=2, referral_user_id=player.user_id, authorised=True)
+        Users.objects.create(user_id=3, referral_user_id=player.user_id, authorised=False)
+
+        with django_assert_num_queries(1):
+            economy = EconomyService().load(user_id=player.user_id, referrals=True)
+
+        assert economy.user.referral_count == 1
+
+    @pytest.mark.django_db
+    def test_load_creates_missing(self):
+        """Недостающие бусты и игры создаются"""
+        user = Users.objects.create(user_id=1)
+
+        economy = EconomyService().load(pk=user.pk)
+
+        assert Sigma_Boosts.objects.filter(user=user).exists()
+        assert Lumberjack_Game.objects.filter(user=user).exists()
+        assert GeoHunter.objects.filter(user=user).exists()
+        assert economy.geo.max_energy == 100
+
+    @pytest.mark.django_db
+    def test_load_not_found(self):
+        """Нет пользователя - 404"""
+        with pytest.raises(RaisesResponse) as error:
+            EconomyService().load(user_id=1)
+
+        assert error.value.status == 404
+
+    @pytest.mark.django_db
+    def test_pending_passive_income(self, player):
+        """В записи экономики - доход за полные часы, еще не зачисленный"""
+        Sigma_Boosts.objects.filter(user=player).update(
+            passive_income_level=2,
+            _last_passive_claim=timezone.now() - timedelta(hours=3, minutes=10),
+        )
+
+        data = EconomyService().load(pk=player.pk).as_dict()
+
+        assert data["passive_income_level"] == 2
+        assert data["pending_passive_income"] == (
+            3 * boosts_data.passive_income_level.value_by_level(2)
+        )
+        assert data["lumberjack_energy"] == 100
+        assert data["starcoins"] == 10
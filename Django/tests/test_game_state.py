@@ -0,0 +1,144 @@
+# tests/test_game_state.py
+from datetime import timedelta
+
+import pytest
+from bot.models import GeoHunter, Lumberjack_Game, Users
+from bot.service.balance import BalanceService
+from bot.service.game_state import ClickStatus
+from django.utils import timezone
+
+RECOVERY_SECONDS = 3600
+
+
+def games(user: Users):
+    """Обе игры игрока, как их получают эндпоинты"""
+    jack = Lumberjack_Game.objects.get(user=user)
+    geo = GeoHunter.objects.get(user=user)
+    jack.user = geo.user = user
+    return jack, geo
+
+
+class TestGameStateClick:
+    """Тесты атомарного клика в Redis"""
+
+    @pytest.mark.django_db
+    def test_click_spends_energy(self, player, game_state):
+        """Клик списывает энергию обеих игр и копит дельты"""
+        jack, geo = games(player)
+
+        result = game_state.click_geohunter(
+            jack, geo, 1.5, 10, RECOVERY_SECONDS, user_choice=True
+        )
+
+        assert result == {
+            "status": ClickStatus.SUCCESS,
+            "energy": 90,
+            "other_energy": 90,
+        }
+        state = game_state.get(player.pk)
+        assert int(state["geo_true_delta"]) == 1
+        assert float(state["starcoins_delta"]) == 1.5
+        assert float(state["geo_currency_delta"]) == 1.5
+
+    @pytest.mark.django_db
+    def test_wrong_answer_no_income(self, player, game_state):
+        """Неверный ответ тратит энергию, но не приносит дохода"""
+        jack, geo = games(player)
+
+        result = game_state.click_geohunter(
+            jack, geo, 1.5, 10, RECOVERY_SECONDS, user_choice=False
+        )
+
+        assert result["status"] == ClickStatus.SUCCESS
+        state = game_state.get(player.pk)
+        assert int(state["geo_false_delta"]) == 1
+        assert float(state["starcoins_delta"]) == 0
+
+    @pytest.mark.django_db
+    @pytest.mark.parametrize("energy", [0, 5])
+    def test_click_no_energy(self, player, game_state, energy):
+        """Энергии меньше стоимости клика - отказ без изменений"""
+        GeoHunter.objects.filter(user=player).update(current_energy=energy)
+        jack, geo = games(player)
+
+        result = game_state.click_geohunter(
+            jack, geo, 1.5, 10, RECOVERY_SECONDS, user_choice=True
+        )
+
+        assert result["status"] == ClickStatus.NO_ENERGY
+        assert result["energy"] == energy
+        state = game_state.get(player.pk)
+        assert int(state["geo_energy"]) == energy
+        assert int(state["lj_energy"]) == 100
+        assert float(state["starcoins_delta"]) == 0
+
+    @pytest.mark.django_db
+    def test_click_restores_energy(self, player, game_state):
+        """Время восстановления прошло - энергия полная до клика"""
+        GeoHunter.objects.filter(user=player).update(
+            current_energy=0,
+            _last_energy_update=timezone.now() - timedelta(seconds=RECOVERY_SECONDS + 1),
+        )
+        jack, geo = games(player)
+
+        result = game_state.click_geohunter(
+            jack, geo, 1.5, 10, RECOVERY_SECONDS, user_choice=True
+        )
+
+        assert result["status"] == ClickStatus.SUCCESS
+        assert result["energy"] == 90
+
+
+class TestGameStateFlush:
+    """Тесты отложенной записи в Postgres и подстановки состояния"""
+
+    @pytest.mark.django_db
+    def test_overlay_counters_once(self, player, game_state):
+        """Несохраненные starcoins добавляются к балансу один раз"""
+        jack, geo = games(player)
+        game_state.click_geohunter(jack, geo, 1.5, 10, RECOVERY_SECONDS, True)
+
+        jack, geo = games(Users.objects.get(pk=player.pk))
+        game_state.overlay(geo, counters=True)
+
+        assert geo.user._starcoins == 11.5
+        assert geo.total_true == 1
+        assert geo.total_currency == 1.5
+        assert geo.current_energy == 90
+
+    @pytest.mark.django_db
+    def test_overlay_after_flush(self, player, game_state):
+        """После сброса дельты в Redis обнулены и не считаются повторно"""
+        jack, geo = games(player)
+        game_state.click_geohunter(jack, geo, 1.5, 10, RECOVERY_SECONDS, True)
+
+        assert game_state.flush(user_pks=[player.pk]) == 1
+        assert game_state.pending_starcoins(player.pk) == 0
+
+        jack, geo = games(Users.objects.get(pk=player.pk))
+        game_state.overlay(geo, counters=True)
+
+        assert geo.user._starcoins == 11.5
+        assert geo.total_true == 1
+        assert geo.current_energy == 90
+
+    @pytest.mark.django_db
+    def test_flush_keeps_concurrent_credit(self, player, game_state):
+        """Сброс прибавляет дельту к балансу, а не перезаписывает его"""
+        jack, geo = games(player)
+        game_state.click_geohunter(jack, geo, 1.5, 10, RECOVERY_SECONDS, True)
+        BalanceService().credit(player, 2)
+
+        game_state.flush(user_pks=[player.pk])
+
+        player.refresh_from_db()
+        assert player._starcoins == 13.5
+        assert player.all_starcoins == 13.5
+        geo.refresh_from_db()
+        assert geo.total_true == 1
+        assert geo.current_energy == 90
+
+    @pytest.mark.django_db
+    def test_flush_without_changes(self, player, game_state):
+        """Нечего сбрасывать - ничего не пишем"""
+        assert game_state.flush(user_pks=[player.pk]) == 0
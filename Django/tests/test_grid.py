@@ -0,0 +1,131 @@
+# tests/test_grid.py
+import pytest
+from bot.models import GeoHunter, Lumberjack_Game
+from bot.service import grid
+from bot.service.game_state import ClickStatus
+from django.core.management import call_command
+
+RECOVERY_SECONDS = 3600
+
+
+class TestGrid:
+    """Тесты битовой маски поля кликера"""
+
+    @pytest.mark.parametrize(
+        "row, col, cell",
+        [(0, 0, 0), (1, 2, 7), (3, 4, 19), (4, 0, 20), (0, 5, 20), (-1, 0, 20)],
+    )
+    def test_cell_index(self, row, col, cell):
+        """Вне поля - несуществующий бит"""
+        assert grid.cell_index(row, col) == cell
+
+    @pytest.mark.parametrize(
+        "mask, valid",
+        [
+            (0b11, True),
+            (0b11111, True),
+            (1 << 19 | 1, True),
+            (0b1, False),
+            (0b111111, False),
+            (1 << 20 | 1, False),
+            (-3, False),
+            (True, False),
+            ("3", False),
+        ],
+    )
+    def test_is_valid_mask(self, mask, valid):
+        """От 2 до 5 звезд внутри поля 4x5"""
+        assert grid.is_valid_mask(mask) is valid
+
+    def test_generate_mask(self):
+        """Сгенерированное поле всегда корректно"""
+        for _ in range(100):
+            assert grid.is_valid_mask(grid.generate_mask())
+
+    def test_from_matrix(self):
+        """Старая матрица: 1 - звезда, строка - открытый доход"""
+        matrix = [
+            [0, 1, 0, 0, "2.5"],
+            [0, 0, 0, 0, 0],
+            [0, 0, 1, 0, 0],
+            [0, 0, 0, 0, 1],
+        ]
+
+        assert grid.from_matrix(matrix) == (
+            1 << 1 | 1 << 12 | 1 << 19,
+            [[4, "2.5"]],
+        )
+
+
+class TestGridClick:
+    """Тесты клика по полю в Redis"""
+
+    @pytest.mark.django_db
+    def test_click_star(self, player, game_state):
+        """Клик по звезде снимает бит и открывает доход"""
+        mask = 1 << grid.cell_index(1, 2) | 1 << grid.cell_index(3, 4)
+        Lumberjack_Game.objects.filter(user=player).update(grid_mask=mask)
+        jack = Lumberjack_Game.objects.get(user=player)
+        geo = GeoHunter.objects.get(user=player)
+
+        result = game_state.click_lumberjack(jack, geo, 1.5, 10, RECOVERY_SECONDS, 1, 2)
+
+        assert result["status"] == ClickStatus.SUCCESS
+        assert result["energy"] == 90
+        state = game_state.get(player.pk)
+        assert int(state["lj_grid_mask"]) == 1 << grid.cell_index(3, 4)
+        assert game_state.overlay(jack).grid_revealed == [[7, "1.5"]]
+        assert int(state["lj_clicks_delta"]) == 1
+        assert float(state["starcoins_delta"]) == 1.5
+
+    @pytest.mark.django_db
+    @pytest.mark.parametrize("row, col", [(0, 0), (1, 2), (4, 0)])
+    def test_click_miss(self, player, game_state, row, col):
+        """Пустая, уже открытая или несуществующая ячейка - промах без списаний"""
+        Lumberjack_Game.objects.filter(user=player).update(
+            grid_mask=1 << grid.cell_index(3, 4), grid_revealed=[[7, "1.5"]]
+        )
+        jack = Lumberjack_Game.objects.get(user=player)
+        geo = GeoHunter.objects.get(user=player)
+
+        result = game_state.click_lumberjack(
+            jack, geo, 1.5, 10, RECOVERY_SECONDS, row, col
+        )
+
+        assert result["status"] == ClickStatus.MISS
+        assert result["energy"] == 100
+        state = game_state.get(player.pk)
+        assert int(state["lj_grid_mask"]) == 1 << grid.cell_index(3, 4)
+        assert int(state["lj_clicks_delta"]) == 0
+        assert float(state["starcoins_delta"]) == 0
+
+
+class TestConvertLumberjackGrids:
+    """Тесты переноса старых полей в маску"""
+
+    @pytest.mark.django_db
+    def test_convert(self, player):
+        """Старое поле переносится, current_grid очищается"""
+        Lumberjack_Game.objects.filter(user=player).update(
+            current_grid=[[1, 0, 0, 0, 0], [0, "3"], [], [0, 0, 0, 0, 1]]
+        )
+
+        call_command("convert_lumberjack_grids")
+
+        jack = Lumberjack_Game.objects.get(user=player)
+        assert jack.grid_mask == 1 | 1 << 19
+        assert jack.grid_revealed == [[6, "3"]]
+        assert jack.current_grid == []
+
+    @pytest.mark.django_db
+    def test_keep_new_grid(self, player):
+        """Поле уже в новом формате - не перезаписываем"""
+        Lumberjack_Game.objects.filter(user=player).update(
+            grid_mask=0b11, current_grid=[[0, 0, 0, 0, 1]]
+        )
+
+        call_command("convert_lumberjack_grids")
+
+        jack = Lumberjack_Game.objects.get(user=player)
+        assert jack.grid_mask == 0b11
+        assert jack.current_grid == []
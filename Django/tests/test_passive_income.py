@@ -0,0 +1,61 @@
+# tests/test_passive_income.py
+from datetime import timedelta
+
+import pytest
+from bot.models import Sigma_Boosts
+from bot.schemas import boosts_data
+from bot.service.passive_income import PassiveIncomeService
+from django.utils import timezone
+
+
+class TestPassiveIncomeService:
+    """Тесты ленивого начисления пассивного дохода"""
+
+    @pytest.mark.django_db
+    def test_settle_full_hours(self, player):
+        """Зачисляем только полные часы, отметку сдвигаем на них же"""
+        claim = timezone.now() - timedelta(hours=2, minutes=30)
+        Sigma_Boosts.objects.filter(user=player).update(
+            passive_income_level=1, _last_passive_claim=claim
+        )
+        income = 2 * boosts_data.passive_income_level.value_by_level(1)
+
+        assert PassiveIncomeService().settle(player) == income
+        assert player._starcoins == 10 + income
+
+        player.refresh_from_db()
+        assert player._starcoins == 10 + income
+        assert player.all_starcoins == 10 + income
+        boosts = Sigma_Boosts.objects.get(user=player)
+        assert boosts._last_passive_claim == claim + timedelta(hours=2)
+
+    @pytest.mark.django_db
+    def test_settle_idempotent(self, player):
+        """Повторный вызов в тот же час ничего не зачисляет"""
+        Sigma_Boosts.objects.filter(user=player).update(
+            passive_income_level=1,
+            _last_passive_claim=timezone.now() - timedelta(hours=2, minutes=30),
+        )
+        service = PassiveIncomeService()
+        income = service.settle(player)
+
+        assert service.settle(player) == 0
+        player.refresh_from_db()
+        assert player._starcoins == 10 + income
+
+    @pytest.mark.django_db
+    @pytest.mark.parametrize(
+        "level, elapsed",
+        [(0, timedelta(hours=5)), (1, timedelta(minutes=59))],
+    )
+    def test_settle_nothing_due(self, player, level, elapsed):
+        """Без пассивки или меньше часа - ничего не зачисляем"""
+        claim = timezone.now() - elapsed
+        Sigma_Boosts.objects.filter(user=player).update(
+            passive_income_level=level, _last_passive_claim=claim
+        )
+
+        assert PassiveIncomeService().settle(player) == 0
+        player.refresh_from_db()
+        assert player._starcoins == 10
+        assert Sigma_Boosts.objects.get(user=player)._last_passive_claim == claim
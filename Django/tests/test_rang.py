@@ -0,0 +1,92 @@
+# tests/test_rang.py
+from unittest.mock import patch
+
+import pytest
+from bot.models import RangProgress, Rangs, Users
+from bot.service.rang import RangService
+from bot.service.rang_cache import RangLadderCache
+
+
+@pytest.fixture
+def rangs(db):
+    """Общая лестница рангов и ранг только для родителей"""
+    RangLadderCache().invalidate()
+    yield {
+        rang.level: rang
+        for rang in [
+            Rangs.objects.create(level=1, all_starcoins=0),
+            Rangs.objects.create(level=2, all_starcoins=100),
+            Rangs.objects.create(level=3, all_starcoins=500),
+            Rangs.objects.create(level=4, all_starcoins=300, _role="parent"),
+        ]
+    }
+    RangLadderCache().invalidate()
+
+
+class TestRangLadderCache:
+    """Тесты лестницы рангов в памяти процесса"""
+
+    @pytest.mark.django_db
+    @pytest.mark.parametrize(
+        "role, all_starcoins, level",
+        [
+            (None, 0, 1),
+            (None, 99.9, 1),
+            ("child", 100, 2),
+            ("child", 350, 2),
+            ("parent", 350, 4),
+            ("parent", 600, 4),
+            ("child", 600, 3),
+        ],
+    )
+    def test_get(self, rangs, role, all_starcoins, level):
+        """Лучший ранг роли с порогом не выше all_starcoins"""
+        assert RangLadderCache().get(role, all_starcoins).level == level
+
+    @pytest.mark.django_db
+    def test_get_below_ladder(self, rangs):
+        """Ниже первого порога ранга нет"""
+        assert RangLadderCache().get(None, -1) is None
+
+    @pytest.mark.django_db
+    def test_rises(self, rangs):
+        """Уровень родителя не растет на пороге обычного третьего ранга"""
+        assert RangLadderCache().rises("parent") == [(0, 1), (100, 2), (300, 4)]
+
+
+class TestProcessRangUps:
+    """Тесты фоновой проверки повышений ранга"""
+
+    @pytest.mark.django_db
+    def test_new_user_without_notification(self, rangs, player):
+        """Новому пользователю запоминаем текущий уровень без уведомления"""
+        Users.objects.filter(pk=player.pk).update(all_starcoins=150)
+
+        with patch.object(Users, "send_rang_notification") as notify:
+            assert RangService().process_rang_ups() == 1
+
+        notify.assert_not_called()
+        assert RangProgress.objects.get(user=player).level == 2
+
+    @pytest.mark.django_db
+    def test_rang_up_notified_once(self, rangs, player):
+        """Пересечение порога - одно уведомление, повторный проход молчит"""
+        RangProgress.objects.create(user=player, level=1)
+        Users.objects.filter(pk=player.pk).update(all_starcoins=600)
+
+        with patch.object(Users, "send_rang_notification") as notify:
+            RangService().process_rang_ups()
+            RangService().process_rang_ups()
+
+        notify.assert_called_once_with(1, rangs[3])
+        assert RangProgress.objects.get(user=player).level == 3
+
+    @pytest.mark.django_db
+    def test_no_rang_up(self, rangs, player):
+        """Уровень не вырос - уведомления нет"""
+        RangProgress.objects.create(user=player, level=1)
+
+        with patch.object(Users, "send_rang_notification") as notify:
+            assert RangService().process_rang_ups() == 0
+
+        notify.assert_not_called()
@@ -0,0 +1,126 @@
+# tests/test_rating.py
+from unittest.mock import patch
+
+import pytest
+from bot.models import Users
+from bot.service.balance import BalanceService
+from bot.service.rating import RatingService
+from Redis.main import RedisManager
+
+CATEGORY = "collect_starcoins"
+
+
+@pytest.fixture
+def rating(db):
+    """Рейтинг starcoins и приглашений с чистыми ключами в Redis"""
+    service = RatingService()
+    keys = [*service._keys(CATEGORY), *service._keys("invited_friends")]
+    RedisManager().get_redis().delete(*keys)
+    yield service
+    RedisManager().get_redis().delete(*keys)
+
+
+def score(user_id: int, category: str = CATEGORY):
+    return RedisManager().get_redis().zscore(
+        RatingService.KEY.format(category=category), user_id
+    )
+
+
+class TestRatingService:
+    """Тесты рейтингов в Redis ZSET"""
+
+    @pytest.mark.django_db
+    def test_rebuild(self, rating, player):
+        """Рейтинг строится из Postgres"""
+        Users.objects.create(user_id=2, all_starcoins=50)
+
+        assert rating.rebuild([CATEGORY]) == {CATEGORY: 2}
+        assert score(player.user_id) == 10
+        assert score(2) == 50
+
+    @pytest.mark.django_db
+    def test_update_after_commit(
+        self, rating, player, django_capture_on_commit_callbacks
+    ):
+        """Начисление попадает в построенный рейтинг после коммита"""
+        rating.rebuild([CATEGORY])
+
+        with django_capture_on_commit_callbacks(execute=True):
+            BalanceService().credit(player, 5)
+            assert score(player.user_id) == 10
+
+        assert score(player.user_id) == 15
+
+    @pytest.mark.django_db
+    def test_update_not_built(
+        self, rating, player, django_capture_on_commit_callbacks
+    ):
+        """В непостроенный рейтинг изменения не пишем"""
+        with django_capture_on_commit_callbacks(execute=True):
+            BalanceService().credit(player, 5)
+
+        assert score(player.user_id) is None
+
+    @pytest.mark.django_db
+    def test_rebuild_replays_journal(self, rating, player):
+        """Изменения во время пересборки не теряются при подмене"""
+        load = RatingService._load
+
+        def load_and_update(service, category):
+            rows = load(service, category)
+            # NOTE начисление закоммичено после чтения из Postgres
+            service._apply(CATEGORY, "incr", player.user_id, 5)
+            return rows
+
+        with patch.object(RatingService, "_load", load_and_update):
+            rating.rebuild([CATEGORY])
+
+        assert score(player.user_id) == 15
+        assert not RedisManager().get_redis().exists(rating._keys(CATEGORY)[3])
+
+    @pytest.mark.django_db
+    def test_rebuild_locked(self, rating):
+        """Пересборка уже идет в другом процессе"""
+        RedisManager().get_redis().set(rating._keys(CATEGORY)[2], "other")
+
+        assert rating.rebuild([CATEGORY]) == {CATEGORY: None}
+
+    @pytest.mark.django_db
+    def test_invited_friends(
+        self, rating, player, django_capture_on_commit_callbacks
+    ):
+        """Засчитываем только авторизованных рефералов"""
+        rating.rebuild(["invited_friends"])
+
+        with django_capture_on_commit_callbacks(execute=True):
+            Users.objects.create(user_id=2, referral_user_id=player.user_id)
+        assert score(player.user_id, "invited_friends") is None
+
+        with django_capture_on_commit_callbacks(execute=True):
+            referral = Users.objects.get(user_id=2)
+            referral.authorised = True
+            referral.save(update_fields=["authorised"])
+        assert score(player.user_id, "invited_friends") == 1
+
+    @pytest.mark.django_db
+    def test_board(self, rating, player):
+        """Топ и место пользователя вне топа с разницей до места выше"""
+        for user_id, all_starcoins in [(2, 100), (3, 50), (4, 30), (5, 20)]:
+            Users.objects.create(
+                user_id=user_id,
+                all_starcoins=all_starcoins,
+                name="Имя",
+                supername="Фамилия",
+            )
+
+        board = rating.board(CATEGORY, player.user_id)
+
+        assert [(row["place"], row["value"], row["my"]) for row in board] == [
+            (1, 100, False),
+            (2, 50, False),
+            (3, 30, False),
+            (5, 10, True),
+        ]
+        assert board[0]["nickname"] == "Фамилия Имя"
+        assert board[-1]["next_place"] == 4
+        assert board[-1]["difference"] == 10
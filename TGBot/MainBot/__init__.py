@@ -6,11 +6,20 @@ async def start_bot():
     await set_commands(bot)
 
     from MainBot.handlers import router
+    from MainBot.middlewares.game import CallbackAnswerGuard, GameCallbackQueue
     from MainBot.middlewares.user import UserDataSession
 
     dp.include_routers(router)
 
+    from MainBot.utils.Games.GeoHunt.main import FlagCatalog
+
+    await FlagCatalog.reload()  # NOTE каталог флагов GeoHunt в память
+
+    # NOTE GameCallbackQueue первым: игровые callback уходят в очередь
+    # пользователя до запроса данных пользователя
+    dp.update.outer_middleware(GameCallbackQueue())
     dp.update.outer_middleware(UserDataSession())
+    bot.session.middleware(CallbackAnswerGuard())
 
     await bot.delete_webhook(drop_pending_updates=True)
 
@@ -1,6 +1,6 @@
 import json
 import os
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Tuple
 
 import aiohttp
 import requests
@@ -9,6 +9,8 @@ from MainBot.utils.errors import DuplicateOperationError, InternalServerErrorCla
 
 
 class DjangoAPI:
+    # NOTE копии каталогов по ETag: url -> (etag, данные)
+    _catalog_copies: Dict[str, Tuple[str, Any]] = {}
 
     def __init__(self):
         self.base_url = "http://{}/api/v1".format(os.getenv("DJANGO_API_LINK"))
@@ -19,12 +21,21 @@ class DjangoAPI:
         endpoint: str,
         data: Optional[Dict] = None,
         params: Optional[Dict] = None,
-        idempotency_key: Optional[str] = None
+        idempotency_key: Optional[str] = None,
+        revalidate: bool = False
     ) -> Any:
+        """
+        revalidate - каталог: храним копию ответа и переспрашиваем
+        с If-None-Match, на 304 отдаем копию
+        """
         try:
             headers = {"Content-Type": "application/json"}
             if idempotency_key:
                 headers["Idempotency-Key"] = idempotency_key
+            copy_key = f"{endpoint}?{sorted((params or {}).items())}"
+            copy = self._catalog_copies.get(copy_key) if revalidate else None
+            if copy:
+                headers["If-None-Match"] = copy[0]
             async with aiohttp.ClientSession() as session:
                 async with session.request(
                     method,
@@ -43,7 +54,11 @@ class DjangoAPI:
 
                             # Пробуем декодировать JSON
                             try:
-                                return json.loads(content)
+                                result = json.loads(content)
+                                etag = response.headers.get("ETag")
+                                if revalidate and etag:
+                                    self._catalog_copies[copy_key] = (etag, result)
+                                return result
                             except json.JSONDecodeError:
                                 # Если не JSON, возвращаем как текст или буфер
                                 return content.decode("utf-8")
@@ -55,6 +70,7 @@ class DjangoAPI:
                             )
                             # NOTE тут нужно вызывать какую-то ошибку для отлавливания в rabbitmq для повторного запроса
                             return None
+                    elif response.status == 304 and copy: return copy[1]
                     elif response.status == 404: return None
                     elif response.status == 409: raise DuplicateOperationError()
                     elif response.status == 500:
@@ -130,6 +146,13 @@ class UsersRequests(DjangoAPI):
     async def get_by_user_id(self, user_id: int) -> Optional[Dict]:
         return await self._make_request("GET", f"/users/{user_id}/")
 
+    async def get_context(self, user_id: int, username: Optional[str]) -> Optional[Dict]:
+        return await self._make_request(
+            "GET",
+            f"/users/{user_id}/context/",
+            params={"username": username} if username else None,
+        )
+
     async def create_user(self, user_data: Dict, idempotency_key: str) -> Optional[Dict]:
         return await self._make_request("POST", "/users/", user_data, idempotency_key=idempotency_key)
 
@@ -257,10 +280,10 @@ class PurchasesRequests(DjangoAPI):
 class Pikmi_ShopRequests(DjangoAPI):
 
     async def get_all_products(self) -> Optional[Dict]:
-        return await self._make_request("GET", "/pikmi-shop/")
+        return await self._make_request("GET", "/pikmi-shop/", revalidate=True)
 
     async def get_by_id(self, id: int) -> Optional[Dict]:
-        return await self._make_request("GET", f"/pikmi-shop/{id}/")
+        return await self._make_request("GET", f"/pikmi-shop/{id}/", revalidate=True)
 
 
 class Sigma_BoostsRequests(DjangoAPI):
@@ -280,11 +303,6 @@ class Sigma_BoostsRequests(DjangoAPI):
             "GET", "/sigma-boosts/get_by_user/", params={"user_id": user_id}
         )
 
-    async def add_passive_income(self, user_id) -> Optional[Dict]:
-        return await self._make_request(
-            "PATCH", f"/sigma-boosts/{user_id}/add_passive_income/"
-        )
-
     async def upgrade_boost(self, user_data: Dict) -> Optional[Dict]:
         return await self._make_request(
             "PATCH", "/sigma-boosts/upgrade_boost/", user_data
@@ -304,6 +322,13 @@ class Lumberjack_GameRequests(DjangoAPI):
     async def get_active_games(self) -> Optional[Dict]:
         return await self._make_request("GET", "/lumberjack-games/active_games/")
 
+    async def get_pending_energy(self, cursor: int, limit: int) -> Optional[Dict]:
+        return await self._make_request(
+            "GET",
+            "/lumberjack-games/pending_energy/",
+            params={"cursor": cursor, "limit": limit},
+        )
+
     async def update_grid(self, game_user_id, user_data: Dict) -> Optional[Dict]:
         return await self._make_request(
             "PATCH", f"/lumberjack-games/{game_user_id}/update_grid/", user_data
@@ -314,6 +339,11 @@ class Lumberjack_GameRequests(DjangoAPI):
             "PATCH", "/lumberjack-games/process_click/", user_data
         )
 
+    async def click(self, user_data: Dict) -> Optional[Dict]:
+        return await self._make_request(
+            "PATCH", "/lumberjack-games/click/", user_data
+        )
+
     async def restore_energy(self, game_user_id) -> Optional[Dict]:
         return await self._make_request(
             "PATCH", f"/lumberjack-games/{game_user_id}/restore_energy/"
@@ -333,11 +363,23 @@ class GeoHunter_GameRequests(DjangoAPI):
     async def get_active_games(self) -> Optional[Dict]:
         return await self._make_request("GET", "/geo-hunter/active_games/")
 
+    async def get_pending_energy(self, cursor: int, limit: int) -> Optional[Dict]:
+        return await self._make_request(
+            "GET",
+            "/geo-hunter/pending_energy/",
+            params={"cursor": cursor, "limit": limit},
+        )
+
     async def process_click(self, user_data: Dict) -> Optional[Dict]:
         return await self._make_request(
             "PATCH", "/geo-hunter/process_click/", user_data
         )
 
+    async def answer(self, user_data: Dict) -> Optional[Dict]:
+        return await self._make_request(
+            "PATCH", "/geo-hunter/answer/", user_data
+        )
+
     async def restore_energy(self, game_user_id) -> Optional[Dict]:
         return await self._make_request(
             "PATCH", f"/geo-hunter/{game_user_id}/restore_energy/"
@@ -369,7 +411,7 @@ class BonusesRequests(DjangoAPI):
         return await self._make_request("POST", "/bonuses/", user_data, idempotency_key=idempotency_key)
 
     async def get_by_id(self, id: int) -> Optional[Dict]:
-        return await self._make_request("GET", f"/bonuses/{id}/")
+        return await self._make_request("GET", f"/bonuses/{id}/", revalidate=True)
 
     async def claim_bonus(self, user_data: Dict, idempotency_key: str) -> Optional[Dict]:
         return await self._make_request("POST", "/bonuses/claim_bonus/", user_data, idempotency_key=idempotency_key)
@@ -399,7 +441,7 @@ class QuestsRequests(DjangoAPI):
         )
 
     async def get_quests(self) -> Optional[Dict]:
-        return await self._make_request("GET", "/quests/")
+        return await self._make_request("GET", "/quests/", revalidate=True)
 
     async def get_active_quests(self, user_id: int) -> Optional[Dict]:
         return await self._make_request(
@@ -460,7 +502,9 @@ class CopyBaseRequests(DjangoAPI):
 class RangsRequests(DjangoAPI):
 
     async def get_by_role(self, role: str) -> Optional[Dict]:
-        return await self._make_request("GET", "/rangs/role/", params={"role": role})
+        return await self._make_request(
+            "GET", "/rangs/role/", params={"role": role}, revalidate=True
+        )
 
 
 class PromocodesRequests(DjangoAPI):
@@ -1,5 +1,5 @@
 import random
-from typing import Optional
+from typing import Dict, List, Optional
 
 from loguru import logger
 
@@ -9,17 +9,6 @@ from .orm_requests import Lumberjack_GameMethods, Sigma_BoostsMethods, UserMetho
 
 class Sigma_BoostsForms:
 
-    async def add_passive_income(self, user: Users) -> Users:
-        """
-        Начисляет пассивный доход только за полные часы
-        Возвращает количество начисленных монет
-        """
-        new_user = await Sigma_BoostsMethods().add_passive_income(user=user)
-        if new_user:
-            return new_user
-        else:
-            return user
-
     async def upgrade(self, user: Users, name: str) -> Optional[dict]:
         """
         Делаем прокачку буста
@@ -45,49 +34,45 @@ class Lumberjack_GameForms:
         """
         Генерация нового игрового поля с фиксированным количеством положительных ячеек (от 2 до 5)
         """
-        # Определяем количество положительных ячеек (от 2 до 5)
-        target_cells = random.randint(2, 5)
-
-        # Создаем пустое поле
-        grid = [[0 for _ in range(cols)] for _ in range(rows)]
-
-        # Заполняем случайные ячейки единицами
-        cells_placed = 0
-        while cells_placed < target_cells:
-            row = random.randint(0, rows - 1)
-            col = random.randint(0, cols - 1)
+        target_cells = random.randint(self.min_stars, self.max_stars)
 
-            if grid[row][col] == 0:  # Если ячейка еще не занята
-                grid[row][col] = 1
-                cells_placed += 1
+        # Звезда - бит ячейки (row * cols + col)
+        grid_mask = sum(
+            1 << cell for cell in random.sample(range(rows * cols), target_cells)
+        )
 
         # Сохраняем новое поле
-        return await Lumberjack_GameMethods().update_grid(game_user.id, grid)
+        return await Lumberjack_GameMethods().update_grid(game_user.id, grid_mask)
 
-    async def click_cell(
-        self, user: Users, game_user: Lumberjack_Game, row: str, col: str
-    ) -> Optional[bool]:
+    async def click(
+        self, user: Users, row: int, col: int
+    ) -> Optional[Dict]:
         """
-        Обработка клика по ячейке
-        Делаем необходимые изменения в базах:
-        Lumberjack_Game, Sigma_Boosts, Users
+        Клик по ячейке: энергия, доход и новое
+        состояние поля за один запрос
         """
-        if (
-            isinstance(game_user.current_grid[row][col], int)
-            and game_user.current_grid[row][col] == 1
-        ):
-            return await Lumberjack_GameMethods().process_click(
-                user.user_id, self.energy_in_click, row, col
-            )
-
-    async def restore_energy(
-        self,
-        game_user: Lumberjack_Game,
-    ) -> None:
+        return await Lumberjack_GameMethods().click(
+            user, self.energy_in_click, row, col
+        )
+
+    async def click_many(
+        self, user: Users, cells: List[List[int]]
+    ) -> Optional[Dict]:
+        """
+        Пачка кликов по ячейкам за один запрос,
+        в results - статус каждого клика
+        """
+        return await Lumberjack_GameMethods().click(
+            user, self.energy_in_click, cells=cells
+        )
+
+    async def refresh(self, user: Users) -> Optional[Dict]:
         """
-        Восстановление энергии со временем
+        Новое поле за один запрос
         """
-        await Lumberjack_GameMethods().restore_energy(game_user.id)
+        return await Lumberjack_GameMethods().click(
+            user, self.energy_in_click, refresh=True
+        )
 
 
 class UsersForms:
@@ -252,10 +252,30 @@ class Lumberjack_Game(PydanticBase):
     last_energy_update: Optional[datetime] = Field(None)
     total_clicks: int = Field(0, ge=0, description="Общее количество кликов")
     total_currency: float = Field(0.0, description="Заработанная валюта")
-    current_grid: List[Any] = Field(
-        default_factory=list, description="Текущее состояние поля 4x5"
+    grid_mask: int = Field(0, ge=0, description="Звезды поля 4x5 (биты ячеек)")
+    grid_revealed: List[List[Any]] = Field(
+        default_factory=list, description="Открытые ячейки [[ячейка, доход], ...]"
     )
 
+    @property
+    def has_grid(self) -> bool:
+        return bool(self.grid_mask or self.grid_revealed)
+
+    def decode_grid(self, rows: int = 4, cols: int = 5) -> List[List[Any]]:
+        """
+        Поле 4x5: 1 - звезда, str - открытый доход, 0 - пусто
+        """
+        revealed = {cell: income for cell, income in self.grid_revealed}
+        return [
+            [
+                1
+                if self.grid_mask >> (row * cols + col) & 1
+                else revealed.get(row * cols + col, 0)
+                for col in range(cols)
+            ]
+            for row in range(rows)
+        ]
+
     @field_validator("game_date", "last_energy_update", mode="before")
     def parse_datetime(cls, value: Optional[str | datetime]) -> Optional[datetime]:
         if value is None:
@@ -771,3 +791,10 @@ class InteractiveGameAllInfo(BaseModel):
     game_datas: Optional[List[InteractiveGameData]] = Field(
         None, description="Данные Играков"
     )
+
+
+class UserContext(BaseModel):
+    """Все данные пользователя на апдейт (GET /users/{user_id}/context/)"""
+
+    user: Users = Field(..., description="Пользователь")
+    referral_count: int = Field(0, description="Кол-во рефералов")
@@ -1,6 +1,7 @@
+from contextvars import ContextVar
 from datetime import datetime, timedelta
 import hashlib
-from typing import Any, Dict, List, Optional, Tuple, Union
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple, Union
 
 from aiogram import types
 
@@ -42,10 +43,16 @@ from .models import (
     StarcoinsPromo,
     SubscribeQuest,
     # UseBonuses,
+    UserContext,
     Users,
     Work_Keys,
 )
 
+# NOTE контекст пользователя текущего апдейта (ставит middleware)
+current_context: ContextVar[Optional[UserContext]] = ContextVar(
+    "current_context", default=None
+)
+
 
 class IdempotencyKeyMethods:
     @classmethod
@@ -89,6 +96,18 @@ class UserMethods:
         data = await self.api.get_by_user_id(user_id)
         return Users(**data) if data else None
 
+    async def get_context(
+        self, user_id: int, username: Optional[str] = None
+    ) -> Optional[UserContext]:
+        """
+        Пользователь и кол-во рефералов одним запросом,
+        контекст доступен обработчикам текущего апдейта
+        """
+        data = await self.api.get_context(user_id, username)
+        context = UserContext(**data) if data else None
+        current_context.set(context)
+        return context
+
     async def create(
         self, user_data: types.User, referral_user_id: Optional[int], idempotency_key: str
     ) -> Optional[Users]:
@@ -113,6 +132,9 @@ class UserMethods:
         return [Users(**data) for data in datas]
 
     async def get_referral_count(self, user_id: int) -> int:
+        context = current_context.get()
+        if context and context.user.user_id == user_id:
+            return context.referral_count
         return await self.api.get_referral_count(user_id)
 
     async def check_phone(self, phone: str) -> Optional[Users]:
@@ -319,10 +341,6 @@ class Sigma_BoostsMethods:
         data = await self.api.get_by_user(user.user_id)
         return Sigma_Boosts(**data) if data else None
 
-    async def add_passive_income(self, user: Users) -> Optional[Users]:
-        data = await self.api.add_passive_income(user_id=user.id)
-        return Users(**data["user"]) if data else None
-
     async def upgrade_boost(self, user: Users, name: str) -> Optional[Dict]:
         return await self.api.upgrade_boost(
             user_data={"user_id": user.id, "name": name}
@@ -350,11 +368,25 @@ class Lumberjack_GameMethods:
         datas = await self.api.get_active_games()
         return [Lumberjack_Game(**data) for data in datas]
 
+    async def get_pending_energy(
+        self, cursor: int = 0, limit: int = 1000
+    ) -> AsyncIterator[List[Dict]]:
+        """
+        Постранично отдает игры, где энергия еще восстанавливается
+        [{"user_id": ..., "due_at": epoch}, ...]
+        """
+        while cursor is not None:
+            data = await self.api.get_pending_energy(cursor, limit)
+            if not data:
+                return
+            yield data["results"]
+            cursor = data["next_cursor"]
+
     async def update_grid(
-        self, game_user_id: int, grid: List
+        self, game_user_id: int, grid_mask: int
     ) -> Optional[Lumberjack_Game]:
         data = await self.api.update_grid(
-            game_user_id=game_user_id, user_data={"grid": grid}
+            game_user_id=game_user_id, user_data={"grid_mask": grid_mask}
         )
         return Lumberjack_Game(**data) if data else None
 
@@ -370,6 +402,30 @@ class Lumberjack_GameMethods:
             }
         )
 
+    async def click(
+        self,
+        user: Users,
+        energy_in_click: int,
+        row: Optional[int] = None,
+        col: Optional[int] = None,
+        refresh: bool = False,
+        cells: Optional[List[List[int]]] = None,
+    ) -> Optional[Dict]:
+        user_data = {
+            "user_id": user.id,
+            "energy_in_click": energy_in_click,
+            "refresh": refresh,
+        }
+        if cells:
+            user_data["cells"] = cells
+        elif not refresh:
+            user_data.update({"row": row, "col": col})
+
+        data = await self.api.click(user_data=user_data)
+        if data:
+            data["game_user"] = Lumberjack_Game(**data["game_user"])
+            return data
+
     async def restore_energy(self, game_user_id: int) -> Dict:
         return await self.api.restore_energy(game_user_id=game_user_id)
 
@@ -393,6 +449,20 @@ class GeoHunter_GameMethods:
         datas = await self.api.get_active_games()
         return [GeoHunter(**data) for data in datas]
 
+    async def get_pending_energy(
+        self, cursor: int = 0, limit: int = 1000
+    ) -> AsyncIterator[List[Dict]]:
+        """
+        Постранично отдает игры, где энергия еще восстанавливается
+        [{"user_id": ..., "due_at": epoch}, ...]
+        """
+        while cursor is not None:
+            data = await self.api.get_pending_energy(cursor, limit)
+            if not data:
+                return
+            yield data["results"]
+            cursor = data["next_cursor"]
+
     async def process_click(
         self, user: Users, user_choice: bool, energy_in_click: int = 1
     ) -> GeoHunter:
@@ -405,6 +475,20 @@ class GeoHunter_GameMethods:
         )
         return GeoHunter(**data) if data else None
 
+    async def answer(
+        self, user: Users, user_choice: bool, energy_in_click: int = 1
+    ) -> Optional[Dict]:
+        data = await self.api.answer(
+            user_data={
+                "user_id": user.id,
+                "user_choice": user_choice,
+                "energy_in_click": energy_in_click,
+            }
+        )
+        if data:
+            data["game_user"] = GeoHunter(**data["game_user"])
+            return data
+
     async def restore_energy(self, game_user: GeoHunter) -> Dict:
         return await self.api.restore_energy(game_user_id=game_user.id)
 
@@ -1,5 +1,4 @@
 from aiogram import F, Router, types
-from MainBot.base.forms import Sigma_BoostsForms
 from MainBot.base.models import Users
 from MainBot.filters.chat_types import ChatTypeFilter
 from MainBot.utils.Forms import (
@@ -24,7 +23,6 @@ async def boosts(call: types.CallbackQuery, user: Users):
 async def get_boost(call: types.CallbackQuery, user: Users):
     name = call.data.split("|")[1]
     if name == "back":
-        user = await Sigma_BoostsForms().add_passive_income(user)
         await LumberjackManager().schedule_energy_update(user)
         await GeoHuntManager().schedule_energy_update(user)
         await LumberjackGame.msg_before_game(user, call)
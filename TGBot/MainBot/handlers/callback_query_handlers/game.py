@@ -3,13 +3,13 @@ from aiogram import F, Router, types
 from aiogram.fsm.context import FSMContext
 from loguru import logger
 from config import bot_name, entry_threshold_geo_hunt
-from MainBot.base.forms import Sigma_BoostsForms
 from MainBot.base.models import Users
 from MainBot.filters.chat_types import ChatTypeFilter
 from MainBot.utils.Forms import (
     FamilyTies,
 )
 from MainBot.utils.Games import (
+    ClickCoalescer,
     GeoHunt,
     GeoHuntManager,
     LumberjackGame,
@@ -19,6 +19,7 @@ from MainBot.keyboards import inline
 from MainBot.utils.Games.Interactive import InteractiveGame
 from MainBot.utils.MyModule.message import MessageManager
 from MainBot.utils.MyModule import Func
+from Redis.limiter import ClickRateLimiter
 
 game_router = Router(name=__name__)
 game_router.message.filter(ChatTypeFilter(["private"]))
@@ -36,8 +37,6 @@ async def game(call: types.CallbackQuery, user: Users):
             await familyTies.info_parent(user, call)
             return
 
-    user = await Sigma_BoostsForms().add_passive_income(user)
-
     await LumberjackManager().schedule_energy_update(user)
     await GeoHuntManager().schedule_energy_update(user)
     game_type: str = call.data.split("|")[1]
@@ -77,14 +76,14 @@ async def game(call: types.CallbackQuery, user: Users):
 
 @game_router.callback_query(F.data.startswith("lumberjack_click"))
 async def lumberjack_click(call: types.CallbackQuery, user: Users):
-    user = await Sigma_BoostsForms().add_passive_income(user)
-    await LumberjackManager().schedule_energy_update(user)
-    await LumberjackGame.handle_click(call, user)
+    # NOTE клики не отбрасываются лимитером, а копятся в пачку
+    await ClickCoalescer().add(call, user)
 
 
 @game_router.callback_query(F.data == "lumberjack_refresh")
 async def lumberjack_refresh(call: types.CallbackQuery, user: Users):
-    user = await Sigma_BoostsForms().add_passive_income(user)
+    if not await ClickRateLimiter().allow(call, "lumberjack"):
+        return
     await LumberjackManager().schedule_energy_update(user)
     await LumberjackGame.handle_refresh(call, user)
 
@@ -119,6 +118,8 @@ async def verif_interactive_game(call: types.CallbackQuery, user: Users):
 async def refresh_interactive_game(
     call: types.CallbackQuery, user: Users, state: FSMContext
 ):
+    if not await ClickRateLimiter().allow(call, "interactive"):
+        return
     game_id = int(call.data.split("|")[1])
     await InteractiveGame().refresh_ready_info(user, call, game_id)
 
@@ -127,6 +128,8 @@ async def refresh_interactive_game(
 async def login_interactive_game(
     call: types.CallbackQuery, user: Users, state: FSMContext
 ):
+    if not await ClickRateLimiter().allow(call, "interactive"):
+        return
     game_id = int(call.data.split("|")[1])
     await InteractiveGame().invite_game(user, call, game_id)
 
@@ -141,6 +144,8 @@ async def delete_interactive_game(
 
 @game_router.callback_query(F.data.startswith("refresh_info_game|"))
 async def refresh_info_game(call: types.CallbackQuery, user: Users, state: FSMContext):
+    if not await ClickRateLimiter().allow(call, "interactive"):
+        return
     game_id = int(call.data.split("|")[1])
     await InteractiveGame().refresh_info(user, call, game_id)
     # NOTE если прошло больше 10 минут, столько скольно надо для принятия приглашения, то удаляется сообщение и игра
@@ -150,6 +155,8 @@ async def refresh_info_game(call: types.CallbackQuery, user: Users, state: FSMCo
 async def start_interactive_game(
     call: types.CallbackQuery, user: Users, state: FSMContext
 ):
+    if not await ClickRateLimiter().allow(call, "interactive"):
+        return
     game_id = int(call.data.split("|")[1])
     await InteractiveGame().start_game(user, call, game_id)
 
@@ -171,6 +178,8 @@ async def s_player_end_game(call: types.CallbackQuery, user: Users, state: FSMCo
 
 @game_router.callback_query(F.data.startswith("end_game|"))
 async def end_game(call: types.CallbackQuery, user: Users, state: FSMContext):
+    if not await ClickRateLimiter().allow(call, "interactive"):
+        return
     game_id = int(call.data.split("|")[1])
     await InteractiveGame().end_game(user, call, game_id)
 
@@ -2,7 +2,6 @@ import texts
 from aiogram import F, Router, types
 from aiogram.fsm.context import FSMContext
 from loguru import logger
-from MainBot.base.forms import Sigma_BoostsForms
 from MainBot.base.models import Users
 from MainBot.base.orm_requests import Lumberjack_GameMethods
 from MainBot.filters.chat_types import ChatTypeFilter
@@ -33,7 +32,6 @@ async def main_menu(call: types.CallbackQuery, state: FSMContext, user: Users):
         await state.clear()
         match chapter:
             case "profile":
-                user = await Sigma_BoostsForms().add_passive_income(user)
                 await Profile().user_info_msg(
                     call,
                     user
@@ -47,7 +45,6 @@ async def main_menu(call: types.CallbackQuery, state: FSMContext, user: Users):
                         return
 
                 if await Lumberjack_GameMethods().get_max_energy(user):
-                    user = await Sigma_BoostsForms().add_passive_income(user)
                     await LumberjackManager().schedule_energy_update(user)
                     await GeoHuntManager().schedule_energy_update(user)
                     await LumberjackGame.msg_before_game(user, call)
@@ -57,15 +54,12 @@ async def main_menu(call: types.CallbackQuery, state: FSMContext, user: Users):
                         await familyTies.info_parent(user, call)
                         return
                 
-                user = await Sigma_BoostsForms().add_passive_income(user)
                 await Quests().viue_all(user, call=call)
             case "rating":
-                user = await Sigma_BoostsForms().add_passive_income(user)
                 await RatingForms().main(user, call)
             case "help":
                 await Profile().user_help_msg(user, call.message)
             case "shop":
-                user = await Sigma_BoostsForms().add_passive_income(user)                
                 await Shop().catalog(user, call=call)
             case "invite_friend":
                 await Profile().invite_friend_info(
@@ -1,7 +1,6 @@
 from aiogram import F, Router, types
 from aiogram.fsm.context import FSMContext
 from loguru import logger
-from MainBot.base.forms import Sigma_BoostsForms
 from MainBot.base.models import Users
 from MainBot.filters.chat_types import ChatTypeFilter
 from MainBot.state.state import Offer
@@ -44,7 +43,6 @@ async def buy_product(call: types.CallbackQuery, user: Users, state: FSMContext)
                 call, state, user, product_id
             )
         else:
-            user = await Sigma_BoostsForms().add_passive_income(user)
             status, error_msg_or_product = await Shop().check_possibility_purchase(
                 user, product_id
             )
@@ -90,7 +88,6 @@ async def confirm_buy(call: types.CallbackQuery, user: Users, state: FSMContext)
     
     match solution:
         case "yes":
-            user = await Sigma_BoostsForms().add_passive_income(user)
             status, error_msg_or_product = await Shop().check_possibility_purchase(
                 user, data["product_id"]
             )
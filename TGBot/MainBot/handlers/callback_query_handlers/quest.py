@@ -1,7 +1,6 @@
 from aiogram import F, Router, types
 from aiogram.fsm.context import FSMContext
 from loguru import logger
-from MainBot.base.forms import Sigma_BoostsForms
 from MainBot.base.models import Users
 from MainBot.filters.chat_types import ChatTypeFilter
 from MainBot.utils.Forms import (
@@ -57,7 +56,6 @@ async def daily_quest(call: types.CallbackQuery, state: FSMContext, user: Users)
 @quest_router.callback_query(F.data.startswith("check_sub|"))
 async def check_sub(call: types.CallbackQuery, state: FSMContext, user: Users):
     quest_id = call.data.split("|")[1]
-    user = await Sigma_BoostsForms().add_passive_income(user)
     status, error_msg_or_quest = await Quests().check_subscribe_quest(
         call, state, user, int(quest_id)
     )
@@ -4,7 +4,6 @@ from aiogram import F, Router, types
 from aiogram.filters import Command, CommandStart
 from aiogram.fsm.context import FSMContext
 from loguru import logger
-from MainBot.base.forms import Sigma_BoostsForms
 from MainBot.base.models import Users
 from MainBot.base.orm_requests import Lumberjack_GameMethods
 from MainBot.filters.chat_types import ChatTypeFilter
@@ -30,7 +29,6 @@ command_router.message.filter(ChatTypeFilter(["private"]))
 async def profile(message: types.Message, state: FSMContext, user: Users):
     if user.authorised:
         await state.clear()
-        user = await Sigma_BoostsForms().add_passive_income(user)
         await Profile().user_info_msg(message, user)
 
 
@@ -70,7 +68,6 @@ async def quests(message: types.Message, state: FSMContext, user: Users):
                 await familyTies.info_parent(user, message)
                 return
         
-        user = await Sigma_BoostsForms().add_passive_income(user)
         await Quests().viue_all(user, message=message)
 
 
@@ -84,7 +81,6 @@ async def game(message: types.Message, state: FSMContext, user: Users):
                 return
         
         if await Lumberjack_GameMethods().get_max_energy(user):
-            user = await Sigma_BoostsForms().add_passive_income(user)
             await LumberjackManager().schedule_energy_update(user)
             await GeoHuntManager().schedule_energy_update(user)
             await LumberjackGame.msg_before_game(user, message)
@@ -96,7 +92,6 @@ async def game(message: types.Message, state: FSMContext, user: Users):
 async def shop(message: types.Message, state: FSMContext, user: Users):
     if user.authorised:
         await state.clear()
-        user = await Sigma_BoostsForms().add_passive_income(user)
         await Shop().catalog(user, message=message)
 
 
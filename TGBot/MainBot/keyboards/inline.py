@@ -4,142 +4,240 @@ import texts
 from aiogram import types
 
 
+# NOTE статичные клавиатуры собираются один раз при импорте,
+# методы IKB отдают готовые объекты - их нельзя изменять на месте
+
+_MAIN_MENU = types.InlineKeyboardMarkup(
+    inline_keyboard=[
+        [
+            types.InlineKeyboardButton(
+                text=texts.Btns.profile,
+                callback_data="main_menu|profile"
+            )
+        ],
+        [
+            types.InlineKeyboardButton(
+                text=texts.Btns.game,
+                callback_data="main_menu|game"
+            ),
+            types.InlineKeyboardButton(
+                text=texts.Btns.quests,
+                callback_data="main_menu|quests"
+            )
+        ],
+        [
+            types.InlineKeyboardButton(
+                text=texts.Btns.invite_friend,
+                callback_data="main_menu|invite_friend"
+            )
+        ],
+        [
+            types.InlineKeyboardButton(
+                text=texts.Btns.shop,
+                callback_data="main_menu|shop"
+            )
+        ],
+        [
+            types.InlineKeyboardButton(
+                text=texts.Btns.rang,
+                callback_data="main_menu|rang"
+            ),
+            types.InlineKeyboardButton(
+                text=texts.Btns.rating,
+                callback_data="main_menu|rating"
+            )
+        ],
+        [
+            types.InlineKeyboardButton(
+                text=texts.Btns.help,
+                callback_data="main_menu|help"
+            )
+        ],
+        [
+            types.InlineKeyboardButton(
+                text=texts.Btns.who_are_we,
+                url="https://t.me/happiness34vlz/102"
+            )
+        ],
+    ]
+)
+
+_RATING_MENU = types.InlineKeyboardMarkup(
+    inline_keyboard=[
+        [
+            types.InlineKeyboardButton(
+                text=texts.Rating.Btns.daily_login,
+                callback_data="rating_menu|daily_login"
+            ),
+        ],
+        [
+            types.InlineKeyboardButton(
+                text=texts.Rating.Btns.collect_starcoins,
+                callback_data="rating_menu|collect_starcoins"
+            )
+        ],
+        [
+            types.InlineKeyboardButton(
+                text=texts.Rating.Btns.guess_country,
+                callback_data="rating_menu|guess_country"
+            ),
+        ],
+        [
+            types.InlineKeyboardButton(
+                text=texts.Rating.Btns.make_clicks,
+                callback_data="rating_menu|make_clicks"
+            )
+        ],
+        [
+            types.InlineKeyboardButton(
+                text=texts.Rating.Btns.completed_quests,
+                callback_data="rating_menu|completed_quests"
+            ),
+        ],
+        [
+            types.InlineKeyboardButton(
+                text=texts.Rating.Btns.invited_friends,
+                callback_data="rating_menu|invited_friends"
+            )
+        ],
+        [
+            types.InlineKeyboardButton(
+                text=texts.Btns.back,
+                callback_data="main_menu|back"
+            )
+        ],
+    ]
+)
+
+_RATING_BACK = types.InlineKeyboardMarkup(
+    inline_keyboard=[
+        [
+            types.InlineKeyboardButton(
+                text=texts.Btns.back,
+                callback_data="main_menu|rating"
+            )
+        ]
+    ]
+)
+
+_BACK_TO_MAIN = types.InlineKeyboardMarkup(
+    inline_keyboard=[
+        [
+            types.InlineKeyboardButton(
+                text=texts.Btns.back,
+                callback_data="main_menu|back"
+            )
+        ]
+    ]
+)
+
+_START_HELLO = types.InlineKeyboardMarkup(
+    inline_keyboard=[
+        [
+            types.InlineKeyboardButton(
+                text=texts.Start.Btns.ready_low, callback_data="start_hello"
+            )
+        ]
+    ]
+)
+
+_READY_REGISTER = types.InlineKeyboardMarkup(
+    inline_keyboard=[
+        [
+            types.InlineKeyboardButton(
+                text=texts.Start.Btns.create, callback_data="ready_register"
+            )
+        ]
+    ]
+)
+
+_AGE = types.InlineKeyboardMarkup(
+    inline_keyboard=[
+        [
+            types.InlineKeyboardButton(
+                text=texts.Start.Btns.change_age, callback_data="edit_age|age"
+            )
+        ],
+        [
+            types.InlineKeyboardButton(
+                text=texts.Start.Btns.change_role, callback_data="edit_age|role"
+            )
+        ],
+    ]
+)
+
+_CONFIRM_BUY = types.InlineKeyboardMarkup(
+    inline_keyboard=[
+        [
+            types.InlineKeyboardButton(
+                text=texts.Btns.yes,
+                callback_data="confirm_buy|yes"
+            ),
+            types.InlineKeyboardButton(
+                text=texts.Btns.no,
+                callback_data="confirm_buy|no"
+            ),
+        ]
+    ]
+)
+
+_BACK_TO_PROFILE = types.InlineKeyboardMarkup(
+    inline_keyboard=[
+        [
+            types.InlineKeyboardButton(
+                text=texts.Btns.back, callback_data="back_to_profile"
+            )
+        ]
+    ]
+)
+
+_BEFORE_GAME = types.InlineKeyboardMarkup(
+    inline_keyboard=[
+        # [
+        #     types.InlineKeyboardButton(
+        #         text=texts.Game.Btns.create,
+        #         callback_data="game|create"
+        #     )
+        # ],
+        [
+            types.InlineKeyboardButton(
+                text=texts.Game.Btns.clicker, callback_data="game|clicker"
+            )
+        ],
+        [
+            types.InlineKeyboardButton(
+                text=texts.Game.Btns.geo_hunt, callback_data="game|geo_hunt"
+            )
+        ],
+        [
+            types.InlineKeyboardButton(
+                text=texts.Btns.exit, callback_data="main_menu|back"
+            )
+        ],
+    ]
+)
+
+
 class IKB:
     @classmethod
     async def main_menu(
         cls, *args, **kwargs
     ) -> types.InlineKeyboardMarkup:
-        keyboard = []
-        keyboard.extend((
-            [
-                types.InlineKeyboardButton(
-                    text=texts.Btns.profile,
-                    callback_data="main_menu|profile"
-                )
-            ],
-            [
-                types.InlineKeyboardButton(
-                    text=texts.Btns.game,
-                    callback_data="main_menu|game"
-                ),
-                types.InlineKeyboardButton(
-                    text=texts.Btns.quests,
-                    callback_data="main_menu|quests"
-                )
-            ],
-            [
-                types.InlineKeyboardButton(
-                    text=texts.Btns.invite_friend,
-                    callback_data="main_menu|invite_friend"
-                )
-            ],
-            [
-                types.InlineKeyboardButton(
-                    text=texts.Btns.shop,
-                    callback_data="main_menu|shop"
-                )
-            ],
-            [
-                types.InlineKeyboardButton(
-                    text=texts.Btns.rang,
-                    callback_data="main_menu|rang"
-                ),
-                types.InlineKeyboardButton(
-                    text=texts.Btns.rating,
-                    callback_data="main_menu|rating"
-                )
-            ],
-            [
-                types.InlineKeyboardButton(
-                    text=texts.Btns.help,
-                    callback_data="main_menu|help"
-                )
-            ],
-            [
-                types.InlineKeyboardButton(
-                    text=texts.Btns.who_are_we,
-                    url="https://t.me/happiness34vlz/102"
-                )
-            ]
-        ))
-        return types.InlineKeyboardMarkup(inline_keyboard=keyboard)
+        return _MAIN_MENU
 
     @classmethod
     async def rating_menu(
         cls
     ) -> types.InlineKeyboardMarkup:
-        keyboard = []
-        keyboard.extend((
-            [
-                types.InlineKeyboardButton(
-                    text=texts.Rating.Btns.daily_login,
-                    callback_data="rating_menu|daily_login"
-                ),
-            ],
-            [
-                types.InlineKeyboardButton(
-                    text=texts.Rating.Btns.collect_starcoins,
-                    callback_data="rating_menu|collect_starcoins"
-                )
-            ],
-            [
-                types.InlineKeyboardButton(
-                    text=texts.Rating.Btns.guess_country,
-                    callback_data="rating_menu|guess_country"
-                ),
-            ],
-            [
-                types.InlineKeyboardButton(
-                    text=texts.Rating.Btns.make_clicks,
-                    callback_data="rating_menu|make_clicks"
-                )
-            ],
-            [
-                types.InlineKeyboardButton(
-                    text=texts.Rating.Btns.completed_quests,
-                    callback_data="rating_menu|completed_quests"
-                ),
-            ],
-            [
-                types.InlineKeyboardButton(
-                    text=texts.Rating.Btns.invited_friends,
-                    callback_data="rating_menu|invited_friends"
-                )
-            ],
-            [
-                types.InlineKeyboardButton(
-                    text=texts.Btns.back,
-                    callback_data="main_menu|back"
-                )
-            ]
-        ))
-        return types.InlineKeyboardMarkup(inline_keyboard=keyboard)
+        return _RATING_MENU
 
     @classmethod
     async def rating_back(cls) -> types.InlineKeyboardMarkup:
-        return types.InlineKeyboardMarkup(
-            inline_keyboard=[
-                [
-                    types.InlineKeyboardButton(
-                        text=texts.Btns.back,
-                        callback_data="main_menu|rating"
-                    )
-                ]
-            ]
-        )
+        return _RATING_BACK
 
     @classmethod
     async def back_to_main(cls) -> types.InlineKeyboardMarkup:
-        return types.InlineKeyboardMarkup(
-            inline_keyboard=[
-                [
-                    types.InlineKeyboardButton(
-                        text=texts.Btns.back,
-                        callback_data="main_menu|back"
-                    )
-                ]
-            ]
-        )
+        return _BACK_TO_MAIN
 
     @classmethod
     async def sure_role(cls, role: str) -> types.InlineKeyboardMarkup:
@@ -161,27 +259,11 @@ class IKB:
 
     @classmethod
     async def start_hello(cls) -> types.InlineKeyboardMarkup:
-        return types.InlineKeyboardMarkup(
-            inline_keyboard=[
-                [
-                    types.InlineKeyboardButton(
-                        text=texts.Start.Btns.ready_low, callback_data="start_hello"
-                    )
-                ]
-            ]
-        )
+        return _START_HELLO
 
     @classmethod
     async def ready_register(cls) -> types.InlineKeyboardMarkup:
-        return types.InlineKeyboardMarkup(
-            inline_keyboard=[
-                [
-                    types.InlineKeyboardButton(
-                        text=texts.Start.Btns.create, callback_data="ready_register"
-                    )
-                ]
-            ]
-        )
+        return _READY_REGISTER
 
     @classmethod
     async def gender(
@@ -220,20 +302,7 @@ class IKB:
 
     @classmethod
     async def age(cls) -> types.InlineKeyboardMarkup:
-        return types.InlineKeyboardMarkup(
-            inline_keyboard=[
-                [
-                    types.InlineKeyboardButton(
-                        text=texts.Start.Btns.change_age, callback_data="edit_age|age"
-                    )
-                ],
-                [
-                    types.InlineKeyboardButton(
-                        text=texts.Start.Btns.change_role, callback_data="edit_age|role"
-                    )
-                ],
-            ]
-        )
+        return _AGE
 
     @classmethod
     async def data_validation(cls, role: str) -> types.InlineKeyboardMarkup:
@@ -260,37 +329,7 @@ class IKB:
 
     @classmethod
     async def before_game(cls) -> types.InlineKeyboardMarkup:
-        inline_keyboard = []
-        # inline_keyboard.append(
-        #     [
-        #         types.InlineKeyboardButton(
-        #             text=texts.Game.Btns.create,
-        #             callback_data="game|create"
-        #         )
-        #     ]
-        # )
-        inline_keyboard.extend(
-            [
-                [
-                    types.InlineKeyboardButton(
-                        text=texts.Game.Btns.clicker, callback_data="game|clicker"
-                    )
-                ],
-                [
-                    types.InlineKeyboardButton(
-                        text=texts.Game.Btns.geo_hunt, callback_data="game|geo_hunt"
-                    )
-                ],
-            ]
-        )
-        inline_keyboard.append(
-            [
-                types.InlineKeyboardButton(
-                    text=texts.Btns.exit, callback_data="main_menu|back"
-                )
-            ]
-        )
-        return types.InlineKeyboardMarkup(inline_keyboard=inline_keyboard)
+        return _BEFORE_GAME
 
     @classmethod
     async def catalog(cls, catalog: dict) -> types.InlineKeyboardMarkup:
@@ -373,20 +412,7 @@ class IKB:
     async def confirm_buy(
         cls
     ) -> types.InlineKeyboardMarkup:
-        return types.InlineKeyboardMarkup(
-            inline_keyboard=[
-                [
-                    types.InlineKeyboardButton(
-                        text=texts.Btns.yes,
-                        callback_data="confirm_buy|yes"
-                    ),
-                    types.InlineKeyboardButton(
-                        text=texts.Btns.no,
-                        callback_data="confirm_buy|no"
-                    ),
-                ]
-            ]
-        )
+        return _CONFIRM_BUY
 
     @classmethod
     async def rollback_buy(
@@ -453,15 +479,7 @@ class IKB:
     #         )
     @classmethod # NOTE DELETE
     async def back_to_profile(cls) -> types.InlineKeyboardMarkup:
-        return types.InlineKeyboardMarkup(
-            inline_keyboard=[
-                [
-                    types.InlineKeyboardButton(
-                        text=texts.Btns.back, callback_data="back_to_profile"
-                    )
-                ]
-            ]
-        )
+        return _BACK_TO_PROFILE
 
     # @classmethod
     # async def refresh_info(cls) -> types.InlineKeyboardMarkup:
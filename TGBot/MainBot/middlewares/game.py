@@ -0,0 +1,135 @@
+import asyncio
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Set, Tuple
+
+from aiogram import BaseMiddleware, Bot
+from aiogram.client.session.middlewares.base import (
+    BaseRequestMiddleware,
+    NextRequestMiddlewareType,
+)
+from aiogram.methods import AnswerCallbackQuery, TelegramMethod
+from aiogram.types import CallbackQuery, TelegramObject, Update
+from MainBot.utils.MyModule.queue import UserTaskQueue
+
+
+class CallbackAnswers:
+    """
+    Ответы на игровые callback: на каждый уходит не больше одного
+    (ранний пустой ответ или ответ обработчика - что раньше)
+    """
+    TTL = 60  # сек.
+
+    _answered: Dict[str, bool] = {}
+    _expiry: Deque[Tuple[float, str]] = deque()
+
+    @classmethod
+    def track(cls, call_id: str) -> None:
+        now = time.monotonic()
+        while cls._expiry and cls._expiry[0][0] < now:
+            cls._answered.pop(cls._expiry.popleft()[1], None)
+
+        cls._answered[call_id] = False
+        cls._expiry.append((now + cls.TTL, call_id))
+
+    @classmethod
+    def claim(cls, call_id: str) -> bool:
+        """
+        Можно ли отправить ответ (не отслеживаемые callback - всегда)
+        """
+        if cls._answered.get(call_id):
+            return False
+        if call_id in cls._answered:
+            cls._answered[call_id] = True
+        return True
+
+
+class CallbackAnswerGuard(BaseRequestMiddleware):
+    """
+    Middleware сессии бота: повторный ответ на уже отвеченный
+    игровой callback не отправляем (Telegram вернул бы ошибку)
+    """
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType,
+        bot: Bot,
+        method: TelegramMethod,
+    ) -> Any:
+        if isinstance(method, AnswerCallbackQuery) and not CallbackAnswers.claim(
+            method.callback_query_id
+        ):
+            return True
+        return await make_request(bot, method)
+
+
+class GameCallbackQueue(BaseMiddleware):
+    """
+    Игровые callback не ждут ответа API в обработчике апдейтов:
+    - ставятся в очередь пользователя (UserTaskQueue) и выполняются по порядку
+    - повторное нажатие, пока предыдущее в работе, отбрасывается
+    - если за ACK_TIMEOUT обработчик не ответил сам,
+      отвечаем пустым ответом, чтобы не крутился индикатор
+    """
+    ACK_TIMEOUT = 0.3  # сек.
+    # NOTE клики кликера копит ClickCoalescer - дубликатом считаем
+    # только нажатие той же кнопки, для остальных - любое по сообщению
+    GAME_CALLBACKS = {
+        "lumberjack_click": True,
+        "lumberjack_refresh": False,
+        "geo_hunt_click": False,
+    }
+
+    _in_flight: Set[Tuple[int, Any, str]] = set()
+    _acks: Set[asyncio.Task] = set()
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: Update,
+        data: Dict[str, Any],
+    ) -> Any:
+        call = event.callback_query
+        if not call or not call.data:
+            return await handler(event, data)
+
+        name = call.data.split("|")[0]
+        if name not in self.GAME_CALLBACKS:
+            return await handler(event, data)
+
+        key = (
+            call.from_user.id,
+            call.message.message_id if call.message else call.inline_message_id,
+            call.data if self.GAME_CALLBACKS[name] else name,
+        )
+        if key in self._in_flight:
+            await self._answer(call, "⌛️")
+            return
+
+        CallbackAnswers.track(call.id)
+
+        async def job() -> None:
+            try:
+                await handler(event, data)
+            finally:
+                self._in_flight.discard(key)
+
+        if not UserTaskQueue.submit(call.from_user.id, job):
+            await self._answer(call, "⌛️")
+            return
+
+        self._in_flight.add(key)
+        ack = asyncio.create_task(self._ack_later(call))
+        self._acks.add(ack)
+        ack.add_done_callback(self._acks.discard)
+
+    async def _ack_later(self, call: CallbackQuery) -> None:
+        await asyncio.sleep(self.ACK_TIMEOUT)
+        # NOTE если обработчик уже ответил, CallbackAnswerGuard не пропустит запрос
+        await self._answer(call)
+
+    @staticmethod
+    async def _answer(call: CallbackQuery, text: str = None) -> None:
+        try:
+            await call.answer(text)
+        except: # exceptions.TelegramBadRequest
+            pass
@@ -7,7 +7,7 @@ from aiogram.fsm.context import FSMContext
 from aiogram.types import TelegramObject, User, Message
 from config import admins
 from loguru import logger
-from MainBot.base.models import Users
+from MainBot.base.models import UserContext, Users
 from MainBot.base.orm_requests import IdempotencyKeyMethods, UserMethods
 from MainBot.utils.errors import (
     DuplicateOperationError, InternalServerError, ServerError, UndefinedError)
@@ -39,6 +39,7 @@ class CustomMiddleware:
         self.handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]] = handler
         self.event: TelegramObject = event
         self.data: Dict[str, Any] = data
+        self.context: Optional[UserContext] = None
         
         if self.event.event_type == "callback_query":
             self.message: Message = self.event.callback_query.message
@@ -153,9 +154,8 @@ class CustomMiddleware:
                 ref_str = ""
 
             return await self.registration_user(self.from_user, ref_str)
-        else:
-            await self.update_tg_username(user, self.from_user)
-            return user
+        # NOTE username обновлен вместе с получением контекста
+        return user
         
     async def add_family(self, user: Users) -> None:
         try:
@@ -165,18 +165,13 @@ class CustomMiddleware:
                     user=user,
                     parent_user_id=self.message.text[7:].replace("add_family_", ""),
                 )
-        except Exception as ex:
-            # logger.error(str(ex))
+        except Exception:
             pass
         
     async def utm(self, user: Users) -> None:
         if self.message.text and "/start" in self.message.text and self.message.text[7:]:
             await self.utm_activate(user, self.message.text[7:])
         
-    async def update_tg_username(self, user: Users, from_user: User) -> None:
-        if from_user.username and user.tg_username != from_user.username:
-            await UserMethods().update_username(user, from_user.username)
-
     async def utm_activate(self, user: Users, url_data: str) -> None:
         await UTMLinksForm().activate(
             user,
@@ -189,7 +184,13 @@ class CustomMiddleware:
             return True
 
     async def check_registration(self, user_id: int) -> Optional[Users]:
-        return await UserMethods().get_by_user_id(user_id=user_id)
+        """
+        Пользователь и кол-во рефералов одним запросом
+        """
+        self.context = await UserMethods().get_context(
+            user_id=user_id, username=self.from_user.username
+        )
+        return self.context.user if self.context else None
 
     async def registration_user(self, user_data: User, referral_user_id: str) -> Users:
         result_referral = None
@@ -250,8 +250,8 @@ class ActivateBonusBoosters:
                 and isinstance(result, dict)
                 and "success_energy_renewal" == result.get("text", "")
             ):
-                await LumberjackManager().force_update_energy(user)
-                await GeoHuntManager().force_update_energy(user)
+                await LumberjackManager().cancel_energy_update(user)
+                await GeoHuntManager().cancel_energy_update(user)
             try:
                 text_name: str = result["text"]
                 if text_name == "not_active":
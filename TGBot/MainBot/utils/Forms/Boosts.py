@@ -147,8 +147,8 @@ class Boosts:
                 return
 
         if upgrade_data:
-            await LumberjackManager().force_update_energy(user)
-            await GeoHuntManager().force_update_energy(user)
+            await LumberjackManager().cancel_energy_update(user)
+            await GeoHuntManager().cancel_energy_update(user)
             try:
                 await call.answer(
                     text=texts.Boosts.Texts.success.format(
@@ -1,50 +1,84 @@
 import asyncio
 import datetime
+import hashlib
 import json
 import os
 import random
-from contextlib import asynccontextmanager
+import time
 from functools import lru_cache
-from typing import Any, AsyncIterator, Dict, List, Optional, Tuple, Union
+from typing import (
+    Any,
+    Dict,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Union,
+)
 
 import pycountry
 import texts
-from aiogram import types
+from aiogram import exceptions, types
 from config import BASE_DIR
 from deep_translator import GoogleTranslator
 from loguru import logger
-from MainBot.base.forms import Sigma_BoostsForms
 from MainBot.base.models import GeoHunter, Users
-from MainBot.base.orm_requests import GeoHunter_GameMethods
+from MainBot.base.orm_requests import GeoHunter_GameMethods, UserMethods
 from MainBot.config import bot
-from MainBot.utils.MyModule import Func
 from MainBot.utils.Rabbitmq import RabbitMQ
 from redis import Redis
+from Redis.limiter import ClickRateLimiter
 from Redis.main import RedisManager
+from Redis.scheduler import GeoHuntTimeouts
 
 
 class FlagProcessor:
-    def __init__(self):
+    """
+    Обработка флагов: перевод названий и загрузка картинок в Telegram.
+    Флаги обрабатываются параллельно (semaphore + интервал между загрузками),
+    прогресс сохраняется после каждого флага в checkpoint_file
+    по ключу {bot_id}:{sha256 файла}, поэтому повторный запуск
+    загружает только новые/измененные флаги или все при смене токена
+    """
+
+    def __init__(self, concurrency: int = 5, upload_interval: float = 1.0):
         self.flags_path = BASE_DIR / "Data/Flags"
         self.output_file = "MainBot/utils/Games/GeoHunt/Data/geo.json"
-        self.cache_file = "message_ids.json"
+        self.checkpoint_file = "flags_checkpoint.json"
         self.translation_cache_file = "translations_cache.json"
-        self.message_ids_cache = self._load_cache(self.cache_file)
+        self.checkpoint = self._load_cache(self.checkpoint_file)
         self.translation_cache = self._load_cache(self.translation_cache_file)
         self.translator = GoogleTranslator(source="auto", target="ru")
 
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.upload_interval = upload_interval
+        self._upload_lock = asyncio.Lock()
+        self._cache_lock = asyncio.Lock()
+        self._last_upload = 0.0
+
     def _load_cache(self, file_path: str) -> Dict:
         """Загружаем кэш из файла"""
         try:
-            with open(file_path, "r") as f:
+            with open(file_path, "r", encoding="utf-8") as f:
                 return json.load(f)
         except (FileNotFoundError, json.JSONDecodeError):
             return {}
 
     def _save_cache(self, data: Dict, file_path: str):
-        """Сохраняем кэш в файл"""
-        with open(file_path, "w") as f:
+        """Сохраняем кэш в файл (через временный файл, чтобы не побить его)"""
+        tmp_path = f"{file_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
             json.dump(data, f, indent=4, ensure_ascii=False)
+        os.replace(tmp_path, file_path)
+
+    async def _checkpoint(self, data: Dict, file_path: str):
+        async with self._cache_lock:
+            await asyncio.to_thread(self._save_cache, data, file_path)
+
+    @staticmethod
+    def _file_hash(file_path: str) -> str:
+        with open(file_path, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()
 
     @lru_cache(maxsize=500)
     def _get_country_info_cached(
@@ -71,12 +105,17 @@ class FlagProcessor:
             return self.translation_cache[english_name]
 
         try:
-            translated = self.translator.translate(english_name)
+            # NOTE переводчик синхронный - не блокируем event loop
+            translated = await asyncio.to_thread(
+                self.translator.translate, english_name
+            )
             if len(translated) <= 14 and any(
                 "\u0400" <= c <= "\u04ff" for c in translated
             ):
                 self.translation_cache[english_name] = translated
-                self._save_cache(self.translation_cache, self.translation_cache_file)
+                await self._checkpoint(
+                    self.translation_cache, self.translation_cache_file
+                )
                 return translated
         except Exception as e: # Translation
             logger.error(f"Translation error for '{english_name}': {e}")
@@ -89,157 +128,346 @@ class FlagProcessor:
         :param flag_path: Путь к файлу флага
         :return: file_id изображения или None при ошибке
         """
-        if flag_path in self.message_ids_cache:
-            return self.message_ids_cache[flag_path]
-
         try:
-            # Отправляем фото в специальный чат (можно использовать свой ID)
             photo: types.PhotoSize = await self._upload_media(flag_path)
-
             if photo:
-                file_id = photo.file_id
-                self.message_ids_cache[flag_path] = file_id
-                self._save_cache(self.message_ids_cache, self.cache_file)
-                return file_id
+                return photo.file_id
         except Exception as e: # File
             logger.error(f"Error uploading media {flag_path}: {e}")
 
         return None
 
+    async def _wait_upload_slot(self) -> None:
+        """
+        Не чаще одной загрузки в upload_interval секунд на все корутины
+        """
+        async with self._upload_lock:
+            delay = self._last_upload + self.upload_interval - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self._last_upload = time.monotonic()
+
     async def _upload_media(self, file_path: str) -> Optional[types.PhotoSize]:
         """
         Внутренний метод для загрузки медиа
         :param file_path: Путь к файлу
         :return: Объект PhotoSize или None
         """
-        try:
-            await asyncio.sleep(2)
-            # Отправляем в специальный чат (можно использовать свой ID)
-            message = await bot.send_photo(
-                chat_id=1894909159, photo=types.FSInputFile(path=file_path)
-            )
-            # Возвращаем наибольшее доступное фото (последний элемент в списке)
-            return message.photo[-1] if message.photo else None
-        except Exception as e: # exceptions.TelegramBadRequest
-            logger.error(f"Error in _upload_media: {e}")
-            return None
+        for _ in range(3):
+            await self._wait_upload_slot()
+            try:
+                # Отправляем в специальный чат (можно использовать свой ID)
+                message = await bot.send_photo(
+                    chat_id=1894909159, photo=types.FSInputFile(path=file_path)
+                )
+                # Возвращаем наибольшее доступное фото (последний элемент в списке)
+                return message.photo[-1] if message.photo else None
+            except exceptions.TelegramRetryAfter as ex:
+                logger.warning(f"Лимит Telegram, ждем {ex.retry_after} сек.")
+                async with self._upload_lock:
+                    await asyncio.sleep(ex.retry_after)
+            except Exception as e: # exceptions.TelegramBadRequest
+                logger.error(f"Error in _upload_media: {e}")
+                return None
+        return None
 
-    async def process_all_flags(self):
-        """Обрабатываем все флаги и сохраняем результат"""
-        await asyncio.sleep(30)
-        flags_data = []
+    async def process_flag(self, flag_file: str) -> Optional[Dict]:
+        """Обрабатываем один флаг (или берем готовый из checkpoint)"""
+        flag_path = os.path.join(self.flags_path, flag_file)
+        file_hash = await asyncio.to_thread(self._file_hash, flag_path)
+        key = f"{bot.id}:{file_hash}"
 
-        for index, flag_file in enumerate(os.listdir(self.flags_path), start=1):
-            if not flag_file.endswith(".png"):
-                continue
+        done = self.checkpoint.get(key)
+        if done and done.get("media_id"):
+            return done
 
+        async with self.semaphore:
             country_code = flag_file[:-4]  # Удаляем .png
             emoji, english_name = await self.get_country_info(country_code)
 
             if not emoji or not english_name:
                 logger.error(f"Skipping {flag_file} - country info not found")
-                continue
+                return None
 
             russian_name = await self.get_localized_name(english_name)
             if not russian_name:
                 logger.error(f"Skipping {flag_file} - translation failed")
-                continue
+                return None
 
-            flag_path = os.path.join(self.flags_path, flag_file)
             message_id = await self.get_message_id(flag_path)
+            if not message_id:
+                return None
+
+        data = {
+            # NOTE id от содержимого файла - не меняется между запусками
+            "id": 1000000000 + int(file_hash, 16) % 9000000000,
+            "title": russian_name,
+            "emoji": emoji,
+            "correct": "",
+            "path": flag_path,
+            "media_id": message_id,
+        }
+        logger.debug(data)
+
+        self.checkpoint[key] = data
+        await self._checkpoint(self.checkpoint, self.checkpoint_file)
+        return data
 
-            data = {
-                "title": russian_name,
-                "emoji": emoji,
-                "correct": "",
-                "path": flag_path,
-                "media_id": message_id,
-            }
-            logger.debug(data)
-
-            flags_data.append(data)
+    async def process_all_flags(self):
+        """Обрабатываем все флаги и сохраняем результат"""
+        await asyncio.sleep(30)
+        started = time.monotonic()
+        uploaded_before = len(self.checkpoint)
 
-            # if index >= 20:
-            #     break
+        flag_files = sorted(
+            flag_file
+            for flag_file in os.listdir(self.flags_path)
+            if flag_file.endswith(".png")
+        )
+        results = await asyncio.gather(
+            *(self.process_flag(flag_file) for flag_file in flag_files)
+        )
+        flags_data = [data for data in results if data]
 
         # Сохраняем в файл
-        with open(BASE_DIR / self.output_file, "w", encoding="utf-8") as f:
-            json.dump(flags_data, f, ensure_ascii=False, indent=4)
+        await asyncio.to_thread(
+            self._save_cache, flags_data, BASE_DIR / self.output_file
+        )
 
-        logger.info(f"Processed {len(flags_data)} flags. Saved to {self.output_file}")
+        elapsed = time.monotonic() - started
+        uploaded = len(self.checkpoint) - uploaded_before
+        logger.info(
+            f"Processed {len(flags_data)}/{len(flag_files)} flags "
+            f"({uploaded} uploaded) in {elapsed:.1f}s, "
+            f"{len(flags_data) / max(elapsed, 0.001):.2f} flags/s. "
+            f"Saved to {self.output_file}"
+        )
+        await FlagCatalog.reload()
         return flags_data
 
 
-class Flag:
+class FlagData(NamedTuple):
+    id: int
+    title: str
+    emoji: str
+    media_id: Optional[str]
 
-    def __init__(self):
-        self.output_file = "MainBot/utils/Games/GeoHunt/Data/geo.json"
-        self.flags_path = "Data/Flags"
-        self.count_var_respons = 4
 
-    async def get_all_flags(self) -> list[str]:
-        """
-        Получаем все флаги
-        """
-        with open(BASE_DIR / self.output_file, "r", encoding="utf-8") as file:
-            # return json.loads(file.read())
-            datas = json.loads(file.read())
+class FlagCatalog:
+    """
+    Каталог флагов загружается из geo.json один раз
+    в неизменяемый индекс, на каждом раунде файл не читаем
+    """
+    output_file = "MainBot/utils/Games/GeoHunt/Data/geo.json"
+    _flags: Tuple[FlagData, ...] = ()
 
-        if not datas[0].get("id"):
-            ids: List[int] = []
-            for data in datas:
-                while True:
-                    _id = random.randint(1000000000, 9999999999)
-                    if _id not in ids:
-                        break
+    @classmethod
+    def _read(cls) -> List[Dict]:
+        with open(BASE_DIR / cls.output_file, "r", encoding="utf-8") as file:
+            datas = json.loads(file.read())
 
+        if datas and not datas[0].get("id"):
+            # NOTE id проставляем один раз и сохраняем,
+            # чтобы ответы не ломались после перезапуска
+            for data, _id in zip(
+                datas, random.sample(range(1000000000, 9999999999), len(datas))
+            ):
                 data["id"] = _id
-                ids.append(_id)
-            else:
-                del ids
 
-            with open(BASE_DIR / self.output_file, "w", encoding="utf-8") as file:
+            with open(BASE_DIR / cls.output_file, "w", encoding="utf-8") as file:
                 file.write(json.dumps(datas, indent=4, ensure_ascii=False))
 
-            return datas
-        else:
-            return datas
+        return datas
 
-    async def get_step_flags(self) -> list[str]:
+    @classmethod
+    def load(cls) -> Tuple[FlagData, ...]:
         """
-        Получаем все флаги
+        Загружаем (или перезагружаем) каталог флагов
         """
-        list_flags = await self.get_all_flags()
-        random.shuffle(list_flags)
-        return list_flags
+        try:
+            datas = cls._read()
+        except (FileNotFoundError, json.JSONDecodeError) as e:
+            logger.error(f"Flags catalog not loaded: {e}")
+            return cls._flags
+
+        cls._flags = tuple(
+            FlagData(
+                id=data["id"],
+                title=data["title"],
+                emoji=data["emoji"],
+                media_id=data.get("media_id"),
+            )
+            for data in datas
+        )
+        logger.info(f"Flags catalog loaded: {len(cls._flags)}")
+        return cls._flags
 
-    async def get_flag_data(self, user: Users, redis_client: Redis) -> Dict:
+    @classmethod
+    async def reload(cls) -> Tuple[FlagData, ...]:
         """
-        Получаем наименование флага
+        Хук перезагрузки каталога (после обработки флагов)
         """
-        data = []
-        true_var = random.randint(1, 4)
-        for index, step_flag_path in enumerate(await self.get_step_flags(), start=1):
-            if len(data) == self.count_var_respons:
-                break
+        return await asyncio.to_thread(cls.load)
 
-            if index == true_var:
-                step_flag_path["correct"] = "1"
-                true_emoji = step_flag_path["emoji"]
-                await redis_client.set(
-                    f"geo_hunt_true_var:{user.user_id}",
-                    json.dumps(
-                        {"id": step_flag_path["id"], "title": step_flag_path["title"]},
-                        ensure_ascii=False,
-                    ),
-                    ex=60,
-                )
-                photo_id = step_flag_path["media_id"]
+    @classmethod
+    def flags(cls) -> Tuple[FlagData, ...]:
+        if not cls._flags:
+            cls.load()
+        return cls._flags
 
-            # NOTE можно добавить pydantic модель
-            data.append(step_flag_path)
+    @classmethod
+    def sample(cls, k: int) -> List[FlagData]:
+        """
+        Случайные k флагов без перемешивания всего каталога
+        """
+        flags = cls.flags()
+        return [flags[index] for index in random.sample(range(len(flags)), k)]
+
+
+@lru_cache(maxsize=1024)
+def _flag_button(flag_id: str, title: str) -> types.InlineKeyboardButton:
+    """Кнопка варианта - одна на флаг"""
+    return types.InlineKeyboardButton(
+        text=title, callback_data=f"geo_hunt_click|{flag_id}"
+    )
+
+
+# NOTE кнопки управления одинаковы для всех полей
+_CONTROL_BUTTONS = (
+    types.InlineKeyboardButton(text=texts.Game.Btns.boosts, callback_data="boosts"),
+    types.InlineKeyboardButton(text=texts.Btns.back, callback_data="games"),
+)
+
+
+@lru_cache(maxsize=4096)
+def _field_keyboard(flags: Tuple[Tuple[str, str], ...]) -> types.InlineKeyboardMarkup:
+    """
+    Клавиатура по вариантам ответа (по 2 в ряд) + кнопки управления
+    """
+    buttons = [_flag_button(flag_id, title) for flag_id, title in flags]
+    inline_keyboard = [buttons[i:i + 2] for i in range(0, len(buttons), 2)]
+    inline_keyboard.extend([button] for button in _CONTROL_BUTTONS)
+
+    return types.InlineKeyboardMarkup(inline_keyboard=inline_keyboard)
+
+
+# NOTE один запрос: берем готовый раунд и сохраняем верный вариант
+# Ответ: {раунд или '', сколько раундов осталось}
+POP_ROUND_SCRIPT = """
+local round = redis.call('LPOP', KEYS[1])
+if not round then
+    return {'', 0}
+end
+redis.call('SET', KEYS[2], cjson.encode(cjson.decode(round)['true']), 'EX', ARGV[1])
+return {round, redis.call('LLEN', KEYS[1])}
+"""
+
+
+class RoundQueue:
+    """
+    Готовые раунды GeoHunt активного игрока в Redis-списке:
+    ответ сразу забирает следующий раунд, а очередь
+    пополняется в фоне, вне пути ответа
+    """
+    KEY = "geo_hunt_rounds:{user_id}"
+    SIZE = 3
+    TTL = 60 * 10  # сек. (очередь неактивного игрока истекает)
+    TRUE_VAR_TTL = 60
+
+    _script: Optional[Any] = None
+    # NOTE идущие пополнения: user_id -> задача
+    _refills: Dict[int, asyncio.Task] = {}
+
+    def __init__(self, count_var_respons: int = 4):
+        self.count_var_respons = count_var_respons
+
+    def generate(self) -> Dict:
+        """
+        Раунд: варианты ответа и верный флаг
+        """
+        step_flags = FlagCatalog.sample(self.count_var_respons)
+        true_flag = random.choice(step_flags)
+
+        # NOTE можно добавить pydantic модель
+        return {
+            "flags": [
+                {
+                    "id": flag.id,
+                    "title": flag.title,
+                    "emoji": flag.emoji,
+                    "media_id": flag.media_id,
+                    "correct": "1" if flag is true_flag else "",
+                }
+                for flag in step_flags
+            ],
+            "true": {"id": true_flag.id, "title": true_flag.title},
+            "media_id": true_flag.media_id,
+            "emoji": true_flag.emoji,
+        }
+
+    async def pop(self, user_id: int, redis_client: Redis) -> Dict:
+        """
+        Следующий раунд (верный вариант уже записан в geo_hunt_true_var)
+        """
+        if RoundQueue._script is None:
+            RoundQueue._script = redis_client.register_script(POP_ROUND_SCRIPT)
+
+        key = self.KEY.format(user_id=user_id)
+        round_raw, left = await RoundQueue._script(
+            keys=[key, f"geo_hunt_true_var:{user_id}"],
+            args=[self.TRUE_VAR_TTL],
+        )
+
+        if round_raw:
+            round_data = json.loads(round_raw)
+        else:
+            # NOTE очереди еще нет (первый раунд) - генерируем на месте
+            round_data = self.generate()
+            await redis_client.set(
+                f"geo_hunt_true_var:{user_id}",
+                json.dumps(round_data["true"], ensure_ascii=False),
+                ex=self.TRUE_VAR_TTL,
+            )
+
+        if left < self.SIZE and user_id not in RoundQueue._refills:
+            RoundQueue._refills[user_id] = asyncio.create_task(
+                self._refill(key, user_id, self.SIZE - left, redis_client)
+            )
+        return round_data
+
+    async def _refill(
+        self, key: str, user_id: int, count: int, redis_client: Redis
+    ) -> None:
+        try:
+            rounds = [
+                json.dumps(self.generate(), ensure_ascii=False) for _ in range(count)
+            ]
+            pipe = redis_client.pipeline(transaction=False)
+            pipe.rpush(key, *rounds)
+            pipe.ltrim(key, 0, self.SIZE - 1)
+            pipe.expire(key, self.TTL)
+            await pipe.execute()
+        except Exception as e: # Redis
+            logger.error(f"GeoHunt rounds refill failed {user_id}: {e}")
+        finally:
+            RoundQueue._refills.pop(user_id, None)
+
+
+class Flag:
+
+    def __init__(self):
+        self.count_var_respons = 4
 
-        return data, photo_id, true_emoji
+    async def get_flag_data(
+        self, user: Users, redis_client: Redis
+    ) -> Tuple[List[Dict], str, str]:
+        """
+        Получаем наименование флага (готовый раунд из RoundQueue)
+        """
+        round_data = await RoundQueue(self.count_var_respons).pop(
+            user.user_id, redis_client
+        )
+        return round_data["flags"], round_data["media_id"], round_data["emoji"]
 
 
 class Build(Flag):
@@ -258,38 +486,10 @@ class Build(Flag):
     async def keyboard(self, datas: list[dict]) -> types.InlineKeyboardMarkup:
         """
         Создаем клавиатуру для Игры
-        """
-        inline_keyboard = []
-        btns = []
-        for data in datas:
-            btns.append(
-                types.InlineKeyboardButton(
-                    text=data["title"],
-                    callback_data="geo_hunt_click|{}".format(data["id"]),
-                )
-            )
-            if len(btns) == 2:
-                inline_keyboard.append(btns.copy())
-                btns.clear()
-        else:
-            if btns:
-                inline_keyboard.append(btns.copy())
-            inline_keyboard.append(
-                [
-                    types.InlineKeyboardButton(
-                        text=texts.Game.Btns.boosts, callback_data="boosts"
-                    )
-                ]
-            )
-            inline_keyboard.append(
-                [
-                    types.InlineKeyboardButton(
-                        text=texts.Btns.back, callback_data="games"
-                    )
-                ]
-            )
 
-        return types.InlineKeyboardMarkup(inline_keyboard=inline_keyboard)
+        NOTE клавиатура кэшируется по набору вариантов
+        """
+        return _field_keyboard(tuple((data["id"], data["title"]) for data in datas))
 
     async def media(self, path: str) -> Any:
         """
@@ -342,7 +542,7 @@ class GeoHuntMain(Build):
 
     async def get_field(
         self,
-        call: types.CallbackQuery,
+        call: Union[types.CallbackQuery, types.Message],
         user: Users,
         redis_client: Redis,
         geo_hunter: Optional[GeoHunter] = None,
@@ -354,10 +554,12 @@ class GeoHuntMain(Build):
         if not geo_hunter:
             geo_hunter = await GeoHunter_GameMethods().get_by_user(user)
 
+        message = call.message if isinstance(call, types.CallbackQuery) else call
+
         data, photo_id, true_emoji = await super().get_flag_data(user, redis_client)
         text = await super().text(user.starcoins, geo_hunter.current_energy, true_emoji)
         keyboard = await super().keyboard(data)
-        return await super().send(user, call.message, text, photo_id, keyboard, new_msg)
+        return await super().send(user, message, text, photo_id, keyboard, new_msg)
 
     async def handle_click(
         self, call: types.CallbackQuery, user: Users, redis_client: Redis
@@ -374,48 +576,23 @@ class GeoHuntMain(Build):
         user_choice: bool = _id == str(true_var.get("id"))
         logger.debug(f"{call.from_user.id}: {_id} -> {user_choice}")
 
-        data: dict = await GeoHunter_GameMethods().game_state(user=user)
-        game_user = data["game_user"]
-
-        if data["force_update_energy"]:
-            from MainBot.utils.Games import GeoHuntManager
-
-            await GeoHuntManager().force_update_energy(user)
-            await Func.send_error_to_developer(
-                "В ГЕОХантере Энергия пользователя {user_id} {tg_username} не восстановилось после истечения времени".format(
-                    user_id=user.user_id,
-                    tg_username=(
-                        f"@{str(user.tg_username)}" if user.tg_username else "-"
-                    ),
-                )
-            )
+        # NOTE проверка энергии, ответ и новое состояние за один запрос
+        data: dict = await GeoHunter_GameMethods().answer(user, user_choice)
+        game_user: GeoHunter = data["game_user"]
 
         # Проверяем энергию
-        if game_user.current_energy <= 0:
+        if data["result"] == "no_energy":
             await call.answer(
                 texts.Game.Error.no_energy.format(left_time=data["time_str"]),
                 show_alert=True,
             )
             return
 
-        # Обрабатываем клик
-        game_user = await GeoHunter_GameMethods().process_click(user, user_choice)
-
-        if game_user:
-            await RabbitMQ().track_game(
-                user.user_id,
-                (
-                    round((game_user.user.starcoins - user.starcoins), 2)
-                    if user_choice
-                    else 0
-                ),
-                "geohunter",
-            )
+        await RabbitMQ().track_game(user.user_id, data["income"], "geohunter")
 
         if user_choice:
             try:
-                win_starcoins = round((game_user.user.starcoins - user.starcoins), 2)
-                await call.answer(texts.Game.GeoHunt.yes.format(win=win_starcoins))
+                await call.answer(texts.Game.GeoHunt.yes.format(win=data["income"]))
             except: # exceptions.TelegramBadRequest
                 pass
 
@@ -443,50 +620,57 @@ class GeoHuntMonitoring(GeoHuntMain):
         self.GEO_HUNT_TIMEOUT = 15
         self.MAX_TIMEOUT_COUNT = 3
 
-    async def _game_session_timeout(
-        self,
-        call: types.CallbackQuery,
-        user: Users,
-        geo_hunter: Optional[GeoHunter],
-        message_id: int,
-    ) -> None:
-        user_id = user.user_id
-        bot = call.bot
+    async def session_timeout(self, user_id: int) -> None:
+        """
+        Раунд истек: вызывается поллером handle_geo_hunt_timeouts
+        (в любом процессе бота, поэтому CallbackQuery тут нет)
+        """
         redis_client = await self.redis.get_redis()
 
-        await asyncio.sleep(self.GEO_HUNT_TIMEOUT)
-
         session_data = await redis_client.hgetall(f"geo_hunt_session:{user_id}")
-        if session_data:
-            timeout_counter = (
-                int(session_data.get(b"timeout_counter", b"0").decode()) + 1
-            )
+        if not session_data:
+            return  # Пользователь уже ушел из игры
 
-            await bot.delete_message(chat_id=user_id, message_id=message_id)
-            await bot.send_message(
-                chat_id=user_id, text=texts.Game.GeoHunt.time_over
-            )
+        expiry_time = datetime.datetime.fromisoformat(
+            session_data[b"expiry_time"].decode()
+        )
+        if datetime.datetime.now() < expiry_time:
+            return  # Уже начат новый раунд
 
-            await redis_client.delete(f"geo_hunt_session:{user_id}")
+        await redis_client.delete(f"geo_hunt_session:{user_id}")
 
-            # Проверяем, достигнут ли лимит
-            if timeout_counter >= self.MAX_TIMEOUT_COUNT:
-                from .. import LumberjackGame
+        timeout_counter = int(session_data.get(b"timeout_counter", b"0").decode()) + 1
+        message_id = int(session_data[b"message_id"].decode())
 
-                await LumberjackGame().msg_before_game(user, call)
-            else:
-                await self.get_field(
-                    call,
-                    user,
-                    geo_hunter,
-                    new_msg=True,
-                    timeout_counter=timeout_counter,
-                )  # передаем обновленный счетчик
+        try:
+            await bot.delete_message(chat_id=user_id, message_id=message_id)
+        except: # exceptions.TelegramBadRequest
+            pass
+        await bot.send_message(chat_id=user_id, text=texts.Game.GeoHunt.time_over)
+
+        user = await UserMethods().get_by_user_id(user_id)
+        message = types.Message(
+            message_id=message_id,
+            date=datetime.datetime.now(),
+            chat=types.Chat(id=user_id, type="private"),
+        ).as_(bot)
 
+        # Проверяем, достигнут ли лимит
+        if timeout_counter >= self.MAX_TIMEOUT_COUNT:
+            from .. import LumberjackGame
+
+            await LumberjackGame().msg_before_game(user, message)
+        else:
+            await self.get_field(
+                message,
+                user,
+                new_msg=True,
+                timeout_counter=timeout_counter,
+            )  # передаем обновленный счетчик
 
     async def get_field(
         self,
-        call: types.CallbackQuery,
+        call: Union[types.CallbackQuery, types.Message],
         user: Users,  # TODO должен быть обновленным после добавления старкоинов
         geo_hunter: Optional[
             GeoHunter
@@ -495,50 +679,24 @@ class GeoHuntMonitoring(GeoHuntMain):
         timeout_counter: int = 0,
     ) -> None:
         """
-        Удаляем существующую задачу если есть
-        и создаем новую
+        Показываем новый раунд и переставляем его таймаут
+        (ZADD перезаписывает время, старый раунд отменяется сам)
         """
         user_id = user.user_id
         redis_client = await self.redis.get_redis()
 
-        old_task_data = await redis_client.hgetall(f"geo_hunt_session:{user_id}")
-
-        # Отменяем старую сессию, если есть
-        if old_task_data and b"task_id" in old_task_data:
-            try:
-                # Получаем идентификатор задачи из Redis
-                task_id = int(old_task_data[b"task_id"].decode())
-
-                # Находим задачу среди текущих задач (это требует дополнительной реализации)
-                for task in asyncio.all_tasks():
-                    if id(task) == task_id:
-                        task.cancel()
-                        try:
-                            await task  # Ожидаем завершения отменённой задачи
-                        except asyncio.CancelledError:
-                            pass
-                        break
-
-            except Exception as e:
-                logger.error(f"Failed to cancel task {old_task_data[b'task_id']}: {e}")
-
         await redis_client.delete(f"geo_hunt_session:{user_id}")
 
         message_id = await super().get_field(
             call, user, redis_client, geo_hunter, new_msg
         )
 
-        # Создаём задачу с таймаутом
-        task = asyncio.create_task(
-            self._game_session_timeout(call, user, geo_hunter, message_id)
-        )
         expiry_time = datetime.datetime.now() + datetime.timedelta(
             seconds=self.GEO_HUNT_TIMEOUT
         )
         await redis_client.hset(
             f"geo_hunt_session:{user_id}",
             mapping={
-                "task_id": str(id(task)),  # Идентификатор задачи
                 "message_id": str(message_id),
                 "expiry_time": expiry_time.isoformat(),
                 "timeout_counter": str(timeout_counter),
@@ -547,6 +705,9 @@ class GeoHuntMonitoring(GeoHuntMain):
         await redis_client.expire(
             f"geo_hunt_session:{user_id}", self.GEO_HUNT_TIMEOUT + 10
         )
+        await GeoHuntTimeouts().schedule(
+            user_id, expiry_time.timestamp(), nx=False
+        )
 
     async def handle_click(self, call: types.CallbackQuery, user: Users) -> None:
         """
@@ -576,77 +737,20 @@ class GeoHuntMonitoring(GeoHuntMain):
 class LockManager(GeoHuntMonitoring):
     def __init__(self):
         super().__init__()
-        self.MIN_CLICK_INTERVAL = datetime.timedelta(seconds=1)
-        self.cleanup_interval = datetime.timedelta(minutes=5)
-
-    @asynccontextmanager
-    async def user_lock(self, user_id: int) -> AsyncIterator[None]:
-        """Контекстный менеджер для блокировки по user_id с использованием Redis"""
-        redis_client = await self.redis.get_redis()
-        lock_key = f"user_lock:{user_id}"
-        last_used_key = f"last_used:{user_id}"
-
-        try:
-            # Пытаемся получить блокировку
-            lock_acquired = await redis_client.set(
-                lock_key,
-                "locked",
-                nx=True,  # NOTE означет что создаем только если его уже нет
-                ex=int(self.cleanup_interval.total_seconds()),
-            )
-
-            if not lock_acquired:
-                raise asyncio.TimeoutError("User is already locked")
-
-            # Обновляем время последнего использования
-            await redis_client.set(
-                last_used_key,
-                datetime.datetime.now().isoformat(),
-                ex=int(self.cleanup_interval.total_seconds()),
-            )
-
-            yield
-        finally:
-            # Освобождаем блокировку
-            await redis_client.delete(lock_key)
 
     async def speed_lock(
         self, call: types.CallbackQuery, user: Users
     ) -> Optional[bool]:
-        user_id = user.user_id
-        redis_client = await self.redis.get_redis()
-        last_click_key = f"last_click:{user_id}"
-
-        try:
-            async with self.user_lock(user_id):
-                now = datetime.datetime.now()
-
-                # Проверяем последний клик
-                last_click_str = await redis_client.get(last_click_key)
-                if last_click_str:
-                    last_click = datetime.datetime.fromisoformat(
-                        last_click_str.decode()
-                    )
-                    if (now - last_click) < self.MIN_CLICK_INTERVAL:
-                        await call.answer("⌛️")
-                        return
-
-                # Обновляем время последнего клика
-                await redis_client.set(
-                    last_click_key,
-                    now.isoformat(),
-                    ex=int(self.MIN_CLICK_INTERVAL.total_seconds() * 2),
-                )
-
-                # Ваша бизнес-логика
-                user = await Sigma_BoostsForms().add_passive_income(user)
-                from MainBot.utils.Games import GeoHuntManager
+        """
+        Ответ не чаще раза в секунду (один Lua-запрос к Redis)
+        """
+        if not await ClickRateLimiter().allow(call, "geo_hunt"):
+            return
 
-                await GeoHuntManager().schedule_energy_update(user)
-                await super().handle_click(call, user)
+        from MainBot.utils.Games import GeoHuntManager
 
-        except asyncio.TimeoutError:
-            await call.answer("⌛️")
+        await GeoHuntManager().schedule_energy_update(user)
+        await super().handle_click(call, user)
 
 
 class GeoHunt(LockManager):
@@ -0,0 +1,59 @@
+import asyncio
+from typing import Dict, List, Set, Tuple
+
+from aiogram import types
+from loguru import logger
+from MainBot.base.models import Users
+from MainBot.utils.MyModule.queue import UserTaskQueue
+
+from .main import LumberjackGame
+
+
+class ClickCoalescer:
+    """
+    Копит быстрые клики пользователя по полю кликера в течение WINDOW
+    и применяет их одной пачкой: один запрос к API и одно
+    редактирование сообщения вместо запроса и правки на каждый клик
+    """
+    WINDOW = 0.15  # сек.
+    MAX_BATCH = 20  # ячеек в поле
+
+    _batches: Dict[int, List[Tuple[types.CallbackQuery, int, int]]] = {}
+    _timers: Set[asyncio.Task] = set()
+
+    async def add(self, call: types.CallbackQuery, user: Users) -> None:
+        _, row, col = call.data.split("|")
+        click = (call, int(row), int(col))
+
+        batch = self._batches.get(user.id)
+        if batch is not None:
+            if any(other[1:] == click[1:] for other in batch):
+                # NOTE повторный клик по той же ячейке - промах, не отправляем
+                # (ответ на callback отправит GameCallbackQueue)
+                return
+            if len(batch) < self.MAX_BATCH:
+                batch.append(click)
+            else:
+                try:
+                    await call.answer("⌛️")
+                except: # exceptions.TelegramBadRequest
+                    pass
+            return
+
+        # NOTE первый клик открывает окно, пачка применяется
+        # в очереди пользователя (по порядку с остальными играми)
+        self._batches[user.id] = [click]
+        timer = asyncio.create_task(self._flush_later(user))
+        self._timers.add(timer)
+        timer.add_done_callback(self._timers.discard)
+
+    async def _flush_later(self, user: Users) -> None:
+        await asyncio.sleep(self.WINDOW)
+        batch = self._batches.pop(user.id)
+
+        async def job() -> None:
+            # NOTE обновление энергии планирует handle_clicks (first_click)
+            await LumberjackGame.handle_clicks(batch, user)
+
+        if not UserTaskQueue.submit(user.user_id, job):
+            logger.warning(f"Click batch dropped {user.user_id}: {len(batch)}")
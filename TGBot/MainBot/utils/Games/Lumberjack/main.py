@@ -1,15 +1,63 @@
+import asyncio
+from functools import lru_cache
+from typing import List, Optional, Tuple
+
 import texts
 from aiogram import exceptions, types
-from aiogram.utils.keyboard import InlineKeyboardBuilder
 from MainBot.base.forms import Lumberjack_GameForms
 from MainBot.base.models import Lumberjack_Game, Users
 from MainBot.base.orm_requests import Lumberjack_GameMethods
 from MainBot.keyboards import inline
-from MainBot.utils.MyModule import Func
 from MainBot.utils.MyModule.message import MessageManager
 from MainBot.utils.Rabbitmq import RabbitMQ
 
 
+@lru_cache(maxsize=2048)
+def _cell_button(row: int, col: int, text: str) -> types.InlineKeyboardButton:
+    """Кнопка ячейки - одна на все поля с таким же состоянием ячейки"""
+    return types.InlineKeyboardButton(
+        text=text, callback_data=f"lumberjack_click|{row}|{col}"
+    )
+
+
+# NOTE кнопки управления одинаковы для всех полей
+_CONTROL_BUTTONS = (
+    types.InlineKeyboardButton(
+        text=texts.Game.Btns.refresh, callback_data="lumberjack_refresh"
+    ),
+    types.InlineKeyboardButton(text=texts.Game.Btns.boosts, callback_data="boosts"),
+    types.InlineKeyboardButton(text=texts.Btns.back, callback_data="games"),
+)
+
+
+@lru_cache(maxsize=4096)
+def _field_keyboard(
+    grid_mask: int, revealed: Tuple[Tuple[int, str], ...], rows: int, cols: int
+) -> types.InlineKeyboardMarkup:
+    """
+    Клавиатура поля по его состоянию: одинаковые поля
+    не собираются и не валидируются заново
+    """
+    incomes = dict(revealed)
+    inline_keyboard = []
+    for row in range(rows):
+        line = []
+        for col in range(cols):
+            cell = row * cols + col
+            if grid_mask >> cell & 1:
+                text = "⭐️"
+            elif cell in incomes:
+                text = f"+{incomes[cell]}"
+            else:
+                text = "🌑"
+            line.append(_cell_button(row, col, text))
+        inline_keyboard.append(line)
+    # 4 ряда по 5 кнопок + кнопки управления по одной в ряд
+    inline_keyboard.extend([button] for button in _CONTROL_BUTTONS)
+
+    return types.InlineKeyboardMarkup(inline_keyboard=inline_keyboard)
+
+
 class LumberjackGame:
 
     row = 4
@@ -53,53 +101,48 @@ class LumberjackGame:
 
     @classmethod
     async def create_game_keyboard(
-        cls, user: Users
-    ) -> tuple[InlineKeyboardBuilder, Lumberjack_Game]:
+        cls, user: Users, game_user: Optional[Lumberjack_Game] = None
+    ) -> tuple[types.InlineKeyboardMarkup, Lumberjack_Game]:
         """
         Создает игровое поле 4x5 с кнопками
+
+        NOTE клавиатура кэшируется по состоянию поля
+        (маска звезд + открытые ячейки)
         """
-        game_user: Lumberjack_Game = await Lumberjack_GameMethods().get_by_user(
-            user=user
-        )
+        if not game_user:
+            game_user: Lumberjack_Game = await Lumberjack_GameMethods().get_by_user(
+                user=user
+            )
 
         # Если нужно новое поле или оно пустое
-        if not game_user.current_grid:
+        if not game_user.has_grid:
             game_user: Lumberjack_Game = await Lumberjack_GameForms().generate_new_grid(
                 game_user, cls.row, cls.col
             )
 
-        builder = InlineKeyboardBuilder()
-
-        # Создаем кнопки поля
-        for row in range(cls.row):
-            for col in range(cls.col):
-                if game_user.current_grid[row][col] == 1:
-                    emoji = "⭐️"
-                elif isinstance(game_user.current_grid[row][col], str):
-                    emoji = f"+{game_user.current_grid[row][col]}"
-                else:
-                    emoji = "🌑"
-                builder.button(
-                    text=emoji, callback_data=f"lumberjack_click|{row}|{col}"
-                )
-
-        # Добавляем кнопки управления
-        builder.button(text=texts.Game.Btns.refresh, callback_data="lumberjack_refresh")
-        builder.button(text=texts.Game.Btns.boosts, callback_data="boosts")
-        builder.button(text=texts.Btns.back, callback_data="games")
-
-        builder.adjust(5, 5, 5, 5, 1, 1)  # 4 ряда по 5 кнопок + 2 кнопки управления
-
-        return builder.as_markup(), game_user
+        keyboard = _field_keyboard(
+            game_user.grid_mask,
+            tuple(sorted((cell, str(income)) for cell, income in game_user.grid_revealed)),
+            cls.row,
+            cls.col,
+        )
+        return keyboard, game_user
 
     @classmethod
     async def send_call_game(
-        cls, call: types.CallbackQuery, user: Users, success_or_income: float = 0
+        cls,
+        call: types.CallbackQuery,
+        user: Users,
+        success_or_income: float = 0,
+        game_user: Optional[Lumberjack_Game] = None,
     ) -> None:
         """
         Обрабатывает клик по ячейке
+
+        NOTE если game_user передан (ответ click),
+        баланс в game_user.user уже с учетом дохода
         """
-        keyboard, game_user = await cls.create_game_keyboard(user)
+        keyboard, game_user = await cls.create_game_keyboard(user, game_user)
         energy_text = await cls.create_game_text(user, game_user, success_or_income)
 
         await MessageManager(
@@ -130,56 +173,60 @@ class LumberjackGame:
     #     )
 
     @classmethod
-    async def handle_click(cls, call: types.CallbackQuery, user: Users) -> None:
+    async def handle_clicks(
+        cls, clicks: List[Tuple[types.CallbackQuery, int, int]], user: Users
+    ) -> None:
         """
-        Обрабатывает клик по ячейке
+        Обрабатывает пачку кликов по ячейкам (ClickCoalescer):
+        один запрос к API и одно редактирование сообщения
         """
-        _, row, col = call.data.split("|")
-        row, col = int(row), int(col)
-
-        data: dict = await Lumberjack_GameMethods().game_state(user)
-        game_user = data["game_user"]
-
-        if data["force_update_energy"]:
-            from MainBot.utils.Games import LumberjackManager
-
-            await LumberjackManager().force_update_energy(user)
-            await Func.send_error_to_developer(
-                "Энергия пользователя {user_id} {tg_username} не восстановилось после истечения времени".format(
-                    user_id=user.user_id,
-                    tg_username=(
-                        f"@{str(user.tg_username)}" if user.tg_username else "-"
-                    ),
-                )
-            )
-
-        # Проверяем энергию
-        if game_user.current_energy <= 0:
-            await call.answer(
-                texts.Game.Error.no_energy.format(left_time=data["time_str"]),
-                show_alert=True,
+        data: dict = await Lumberjack_GameForms().click_many(
+            user, [[row, col] for _, row, col in clicks]
+        )
+        if not data:
+            # NOTE API не ответил - отвечаем на все клики пачки, иначе
+            # у пользователя останутся крутящиеся кнопки
+            await asyncio.gather(
+                *(call.answer(texts.Error.Notif.server_error) for call, _, _ in clicks),
+                return_exceptions=True,
             )
             return
+        game_user: Lumberjack_Game = data["game_user"]
+        successes = data["results"].count("success")
+
+        answers = []
+        no_energy_shown = False
+        for (call, _, _), result in zip(clicks, data["results"]):
+            match result:
+                case "success":
+                    answers.append(
+                        call.answer(f"+{round(data['income'] / successes, 2)}")
+                    )
+                case "no_energy" if not no_energy_shown:
+                    no_energy_shown = True
+                    answers.append(
+                        call.answer(
+                            texts.Game.Error.no_energy.format(
+                                left_time=data["time_str"]
+                            ),
+                            show_alert=True,
+                        )
+                    )
+                case "no_energy":
+                    answers.append(call.answer())
+                case _:
+                    answers.append(call.answer(texts.Game.Error.miss))
+        # NOTE exceptions.TelegramBadRequest (устаревший callback) не важен
+        await asyncio.gather(*answers, return_exceptions=True)
+
+        if successes:
+            await cls.send_call_game(
+                clicks[-1][0], game_user.user or user, game_user=game_user
+            )
 
-        # Обрабатываем клик
-        success_or_income = await Lumberjack_GameForms().click_cell(
-            user, game_user, row, col
-        )
-        if success_or_income:
-            try:
-                await call.answer(f"+{success_or_income}")
-            except: # exceptions.TelegramBadRequest
-                pass
-
-            await cls.send_call_game(call, user, success_or_income)
-
-            if game_user:
-                await RabbitMQ().track_game(
-                    user.user_id, success_or_income, "lumberjack"
-                )
-
-        else:
-            await call.answer(texts.Game.Error.miss)
+            await RabbitMQ().track_game(
+                user.user_id, data["income"], "lumberjack"
+            )
 
         if data["first_click"]:
             from MainBot.utils.Games import LumberjackManager
@@ -191,28 +238,17 @@ class LumberjackGame:
         """
         Обновляет игровое поле
         """
-        data: dict = await Lumberjack_GameMethods().game_state(user)
-        game_user = data["game_user"]
-
-        if data["force_update_energy"]:
-            from MainBot.utils.Games import LumberjackManager
-
-            await LumberjackManager().force_update_energy(user)
-            await Func.send_error_to_developer(
-                "Энергия пользователя {user_id} {tg_username} не восстановилось после истечения времени".format(
-                    user_id=user.user_id,
-                    tg_username=(
-                        f"@{str(user.tg_username)}" if user.tg_username else "-"
-                    ),
-                )
-            )
+        data: dict = await Lumberjack_GameForms().refresh(user)
+        if not data:
+            await call.answer(texts.Error.Notif.server_error)
+            return
+        game_user: Lumberjack_Game = data["game_user"]
 
-        if game_user.current_energy <= 0:
+        if data["result"] == "no_energy":
             await call.answer(
                 texts.Game.Error.no_energy.format(left_time=data["time_str"]),
                 show_alert=True,
             )
             return
-        await Lumberjack_GameForms().generate_new_grid(game_user, cls.row, cls.col)
 
-        await cls.send_call_game(call, user)
+        await cls.send_call_game(call, game_user.user or user, game_user=game_user)
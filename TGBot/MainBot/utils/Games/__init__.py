@@ -1,6 +1,7 @@
 from .GeoHunt.main import GeoHunt
 from .GeoHunt.manager import EnergyUpdateManager as GeoHuntManager
+from .Lumberjack.coalescer import ClickCoalescer
 from .Lumberjack.main import LumberjackGame
 from .Lumberjack.manager import EnergyUpdateManager as LumberjackManager
 
-__all__ = ["GeoHunt", "GeoHuntManager", "LumberjackGame", "LumberjackManager"]
+__all__ = ["ClickCoalescer", "GeoHunt", "GeoHuntManager", "LumberjackGame", "LumberjackManager"]
@@ -0,0 +1,49 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Set
+
+from loguru import logger
+
+
+class UserTaskQueue:
+    """
+    Очередь задач пользователя: задачи одного пользователя выполняются
+    строго по очереди, задачи разных пользователей - параллельно.
+    Воркер живет, пока в очереди есть задачи
+    """
+    MAX_PENDING = 10
+
+    _queues: Dict[int, asyncio.Queue] = {}
+    _workers: Set[asyncio.Task] = set()
+
+    @classmethod
+    def submit(cls, user_id: int, job: Callable[[], Awaitable[Any]]) -> bool:
+        """
+        Ставим задачу в очередь, False - очередь пользователя переполнена
+        """
+        queue = cls._queues.get(user_id)
+        if queue is None:
+            queue = cls._queues[user_id] = asyncio.Queue(cls.MAX_PENDING)
+            worker = asyncio.create_task(cls._worker(user_id, queue))
+            cls._workers.add(worker)
+            worker.add_done_callback(cls._workers.discard)
+
+        try:
+            queue.put_nowait(job)
+        except asyncio.QueueFull:
+            return False
+        return True
+
+    @classmethod
+    async def _worker(cls, user_id: int, queue: asyncio.Queue) -> None:
+        while True:
+            try:
+                job = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                # NOTE между проверкой и удалением нет await - задача не потеряется
+                cls._queues.pop(user_id, None)
+                return
+
+            try:
+                await job()
+            except Exception as e:
+                logger.exception(f"User task failed {user_id}: {e}")
@@ -0,0 +1,55 @@
+from typing import Any, Optional, Tuple
+
+from aiogram import types
+
+from .main import RedisManager
+
+# NOTE один запрос: ставим метку на interval_ms, если ее нет,
+# иначе возвращаем сколько мс осталось ждать
+RATE_LIMIT_SCRIPT = """
+if redis.call('SET', KEYS[1], '1', 'NX', 'PX', ARGV[1]) then
+    return 0
+end
+return math.max(redis.call('PTTL', KEYS[1]), 1)
+"""
+
+
+class ClickRateLimiter:
+    """
+    Ограничение частоты кликов пользователя (общий для всех реплик бота)
+    """
+    INTERVALS = {
+        "lumberjack": 0.2,
+        "geo_hunt": 1.0,
+        "interactive": 1.0,
+    }
+
+    _script: Optional[Any] = None
+
+    async def hit(self, scope: str, user_id: int) -> Tuple[bool, float]:
+        """
+        Разрешен ли клик и сколько секунд осталось до следующего
+        """
+        redis_client = await RedisManager().get_redis()
+        if ClickRateLimiter._script is None:
+            ClickRateLimiter._script = redis_client.register_script(
+                RATE_LIMIT_SCRIPT
+            )
+
+        retry_after_ms = await ClickRateLimiter._script(
+            keys=[f"rate_limit:{scope}:{user_id}"],
+            args=[int(self.INTERVALS[scope] * 1000)],
+        )
+        return retry_after_ms == 0, retry_after_ms / 1000
+
+    async def allow(self, call: types.CallbackQuery, scope: str) -> bool:
+        """
+        Проверка клика, при отказе отвечаем на callback
+        """
+        allowed, _ = await self.hit(scope, call.from_user.id)
+        if not allowed:
+            try:
+                await call.answer("⌛️")
+            except: # exceptions.TelegramBadRequest
+                pass
+        return allowed
@@ -1,6 +1,7 @@
 # В вашем Telegram боте добавьте обработчик Redis
 import asyncio
 import json
+import time
 from typing import Any, Coroutine, Dict, List
 
 import texts
@@ -11,6 +12,7 @@ from MainBot.keyboards import inline
 from MainBot.utils.Rabbitmq import RabbitMQ
 from redis import Redis
 
+from .scheduler import EnergyNotificationScheduler, GeoHuntTimeouts
 from .main import RedisManager
 
 
@@ -183,3 +185,101 @@ async def auto_reject_old_quest_attempts(
         f"💡 РАССЫЛКА ВЫПОЛНЕНА 💡\nО просроченном кве получило: {number} /челбанов"
     )
 
+
+
+ENERGY_NOTIFY_BATCH = 100
+ENERGY_NOTIFY_RATE = 25  # сообщений в секунду (лимит Telegram ~30)
+
+
+async def resync_energy_notifications(*args, **kwargs) -> None:
+    """
+    При старте добавляет в очередь уведомления для игр,
+    где энергия еще восстанавливается (если запись потерялась)
+    """
+    from MainBot.base.orm_requests import (
+        GeoHunter_GameMethods,
+        Lumberjack_GameMethods,
+    )
+
+    scheduler = EnergyNotificationScheduler()
+    number = 0
+    try:
+        for methods in (Lumberjack_GameMethods(), GeoHunter_GameMethods()):
+            async for entries in methods.get_pending_energy():
+                await scheduler.schedule_many(entries)
+                number += len(entries)
+    except Exception as e: # Redis / Django
+        logger.error(f"Error in energy notification resync: {e}")
+
+    logger.info(f"Восстановлено уведомлений об энергии: {number}")
+
+
+async def handle_energy_notifications(*args, **kwargs) -> None:
+    """Фоновая задача для уведомлений о восстановлении энергии"""
+    scheduler = EnergyNotificationScheduler()
+    while True:
+        try:
+            user_ids = await scheduler.claim_due(ENERGY_NOTIFY_BATCH)
+
+            if user_ids:
+                await send_energy_notifications(scheduler, user_ids)
+            # NOTE если пачка заполнена - сразу берем следующую
+            if len(user_ids) < ENERGY_NOTIFY_BATCH:
+                await asyncio.sleep(1)
+
+        except Exception as e: # Redis
+            logger.error(f"Error in energy notification handler: {e}")
+            await asyncio.sleep(3)
+
+
+async def send_energy_notifications(
+    scheduler: EnergyNotificationScheduler,
+    user_ids: List[int],
+) -> None:
+    """
+    Отправить уведомления о восстановленной энергии
+    с ограничением скорости отправки
+    """
+    for number, user_id in enumerate(user_ids):
+        try:
+            await bot.send_message(chat_id=user_id, text=texts.Game.Texts.notif)
+        except exceptions.TelegramRetryAfter as ex:
+            logger.warning(f"Лимит Telegram, ждем {ex.retry_after} сек.")
+            # NOTE возвращаем неотправленные уведомления в очередь
+            due = time.time() + ex.retry_after
+            for pending_user_id in user_ids[number:]:
+                await scheduler.schedule(pending_user_id, due)
+            await asyncio.sleep(ex.retry_after)
+            return
+        except Exception as ex: # exceptions.TelegramBadRequest
+            logger.exception(f"Ошибка при отправке уведомления: {ex}")
+
+        await asyncio.sleep(1 / ENERGY_NOTIFY_RATE)
+
+
+GEO_HUNT_TIMEOUTS_BATCH = 100
+
+
+async def handle_geo_hunt_timeouts(*args, **kwargs) -> None:
+    """Фоновая задача для истекших раундов GeoHunt"""
+    from MainBot.utils.Games import GeoHunt
+
+    timeouts = GeoHuntTimeouts()
+    while True:
+        try:
+            user_ids = await timeouts.claim_due(GEO_HUNT_TIMEOUTS_BATCH)
+
+            results = await asyncio.gather(
+                *(GeoHunt().session_timeout(user_id) for user_id in user_ids),
+                return_exceptions=True,
+            )
+            for user_id, result in zip(user_ids, results):
+                if isinstance(result, Exception):
+                    logger.error(f"GeoHunt timeout for {user_id} failed: {result}")
+
+            if len(user_ids) < GEO_HUNT_TIMEOUTS_BATCH:
+                await asyncio.sleep(0.5)
+
+        except Exception as e: # Redis
+            logger.error(f"Error in geo hunt timeout handler: {e}")
+            await asyncio.sleep(3)
@@ -0,0 +1,78 @@
+import time
+from typing import Dict, List
+
+from .main import RedisManager
+
+ENERGY_NOTIFICATIONS_KEY = "energy_refill_notifications"
+GEO_HUNT_TIMEOUTS_KEY = "geo_hunt_timeouts"
+
+# NOTE забираем созревшие записи и удаляем их одной операцией,
+# чтобы несколько реплик бота не обработали одну запись дважды
+CLAIM_SCRIPT = """
+local due = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, ARGV[2])
+if #due > 0 then
+    redis.call('ZREM', KEYS[1], unpack(due))
+end
+return due
+"""
+
+
+class DelayedQueue:
+    """
+    Отложенные события в Redis
+    ZSET: member - telegram user_id, score - время срабатывания (epoch)
+    """
+    key: str
+
+    async def schedule(
+        self, user_id: int, due_timestamp: float, nx: bool = True
+    ) -> bool:
+        """
+        Ставит событие (nx - только если для пользователя его еще нет)
+        """
+        redis_client = await RedisManager().get_redis()
+        added = await redis_client.zadd(
+            self.key, {str(user_id): due_timestamp}, nx=nx
+        )
+        return bool(added)
+
+    async def schedule_many(self, entries: List[Dict]) -> None:
+        """
+        Пачкой ставит события [{"user_id": ..., "due_at": epoch}, ...]
+        """
+        if not entries:
+            return
+        redis_client = await RedisManager().get_redis()
+        await redis_client.zadd(
+            self.key,
+            {str(entry["user_id"]): entry["due_at"] for entry in entries},
+            nx=True,
+        )
+
+    async def cancel(self, user_id: int) -> None:
+        redis_client = await RedisManager().get_redis()
+        await redis_client.zrem(self.key, str(user_id))
+
+    async def claim_due(self, batch_size: int) -> List[int]:
+        """
+        Забирает пачку событий, время которых уже наступило
+        """
+        redis_client = await RedisManager().get_redis()
+        due = await redis_client.eval(
+            CLAIM_SCRIPT, 1, self.key, time.time(), batch_size
+        )
+        return [int(user_id) for user_id in due]
+
+
+class EnergyNotificationScheduler(DelayedQueue):
+    """
+    Очередь уведомлений о восстановлении энергии
+    """
+    key = ENERGY_NOTIFICATIONS_KEY
+
+
+class GeoHuntTimeouts(DelayedQueue):
+    """
+    Истечение раундов GeoHunt (одна запись на пользователя)
+    """
+    key = GEO_HUNT_TIMEOUTS_KEY
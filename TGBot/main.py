@@ -9,12 +9,13 @@ from loguru import logger
 load_dotenv()
 
 from MainBot import start_bot as start_main_bot
-from MainBot.utils.Games.GeoHunt.manager import EnergyUpdateManager as GeoHuntEUM
-from MainBot.utils.Games.Lumberjack.manager import EnergyUpdateManager as LumberjackEUM
 from Redis.notification import (
     handle_auto_reject_old_quest_attempts,
     handle_continue_registration_mailing,
+    handle_energy_notifications,
+    handle_geo_hunt_timeouts,
     handle_rang_notifications,
+    resync_energy_notifications,
 )
 from VKBot import task_check
 
@@ -48,15 +49,12 @@ async def run_bot():
     asyncio.create_task(handle_rang_notifications())
     asyncio.create_task(handle_continue_registration_mailing())
     asyncio.create_task(handle_auto_reject_old_quest_attempts())
+    asyncio.create_task(resync_energy_notifications())
+    asyncio.create_task(handle_energy_notifications())
+    asyncio.create_task(handle_geo_hunt_timeouts())
     asyncio.create_task(
         task_check()
     )  # NOTE проверяем не отписался ли пользователь от телеграмм и вк чатов
-    asyncio.create_task(
-        LumberjackEUM().check_pending_energy_updates()
-    )  # NOTE обновление энергии кликера
-    asyncio.create_task(
-        GeoHuntEUM().check_pending_energy_updates()
-    )  # NOTE обновление энергии геохантера
     # await test()
     await start_main_bot()
 